@@ -1,3 +1,4 @@
 """Conversations: A python library for analysis of conversations."""
 
 from ._conversations import Conversation, load_conversation
+from ._segments import SegmentTable
@@ -0,0 +1,212 @@
+"""Decode recordings once and share the decoded audio between local stages."""
+
+from pathlib import Path
+from typing import Any, Dict
+import hashlib
+import json
+import os
+import subprocess
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+"""Sample rate in Hz of the decoded audio, as expected by Whisper."""
+
+_WAV_HEADER_BYTES = 44
+
+
+def decoded_audio_file(recording: Path) -> Path:
+    """Return the path of the decoded audio of a recording, decoding if needed.
+
+    The recording is decoded with ffmpeg to 16 kHz mono 16-bit PCM and stored
+    as a WAV file next to the saved conversation file. A small JSON file
+    alongside it records the content hash and modification time of the
+    recording, so the decoded audio is reused until the recording changes.
+
+    Parameters
+    ----------
+    recording : pathlib.Path
+        Path to the conversation recording.
+
+    Returns
+    -------
+    pathlib.Path
+        Path to the decoded 16 kHz mono WAV file.
+    """
+    recording = Path(recording)
+    wav_file = _create_decoded_audio_filename(recording)
+    meta_file = wav_file.with_suffix(".json")
+    stat = recording.stat()
+
+    content_hash = None
+    if wav_file.is_file() and meta_file.is_file():
+        with open(meta_file, "r") as file:
+            meta = json.load(file)
+
+        if meta["mtime"] == stat.st_mtime and meta["size"] == stat.st_size:
+            return wav_file
+
+        # The modification time changed, reuse the audio if the content did not
+        content_hash = _file_content_hash(recording)
+        if meta["sha256"] == content_hash:
+            _write_meta(meta_file, content_hash, stat)
+            return wav_file
+
+    if content_hash is None:
+        content_hash = _file_content_hash(recording)
+
+    _decode_to_wav(recording, wav_file)
+    _write_meta(meta_file, content_hash, stat)
+
+    return wav_file
+
+
+def recording_content_hash(recording: Path) -> str:
+    """Return the SHA-256 hex digest of the contents of a recording.
+
+    The hash stored alongside the decoded audio is reused while the
+    recording's modification time and size are unchanged.
+
+    Parameters
+    ----------
+    recording : pathlib.Path
+        Path to the conversation recording.
+
+    Returns
+    -------
+    str
+        The SHA-256 hex digest of the recording.
+    """
+    recording = Path(recording)
+    meta_file = _create_decoded_audio_filename(recording).with_suffix(".json")
+    if meta_file.is_file():
+        stat = recording.stat()
+        with open(meta_file, "r") as file:
+            meta = json.load(file)
+        if meta["mtime"] == stat.st_mtime and meta["size"] == stat.st_size:
+            return meta["sha256"]
+
+    return _file_content_hash(recording)
+
+
+def load_pcm(recording: Path) -> np.ndarray:
+    """Memory map the decoded 16-bit PCM samples of a recording.
+
+    Parameters
+    ----------
+    recording : pathlib.Path
+        Path to the conversation recording.
+
+    Returns
+    -------
+    np.ndarray
+        Read-only memory mapped int16 samples at 16 kHz.
+    """
+    return _memmap_wav(decoded_audio_file(recording))
+
+
+def load_audio(recording: Path) -> np.ndarray:
+    """Load the decoded audio of a recording as floating point samples.
+
+    Parameters
+    ----------
+    recording : pathlib.Path
+        Path to the conversation recording.
+
+    Returns
+    -------
+    np.ndarray
+        float32 samples at 16 kHz in the range -1 to 1, as returned by
+        ``whisper.load_audio``.
+    """
+    return _pcm_to_float(load_pcm(recording))
+
+
+def _memmap_wav(wav_file: Path) -> np.ndarray:
+    """Memory map the samples of a WAV file written by ``_decode_to_wav``."""
+    return np.memmap(wav_file, dtype="<i2", mode="r", offset=_WAV_HEADER_BYTES)
+
+
+def _pcm_to_float(pcm: np.ndarray) -> np.ndarray:
+    """Convert 16-bit PCM samples to float32 samples in the range -1 to 1."""
+    return pcm.astype(np.float32) / 32768.0
+
+
+def _create_decoded_audio_filename(audio_file_path: Path) -> Path:
+    """
+    Create the filename of the decoded audio of a recording.
+
+    Parameters
+    ----------
+    audio_file_path : pathlib.Path
+        The path to the audio file.
+
+    Returns
+    -------
+    pathlib.Path
+        The filename of the decoded audio, next to the saved conversation.
+    """
+    return audio_file_path.with_name(audio_file_path.stem + ".16k.wav")
+
+
+def _file_content_hash(file_path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of the contents of a file."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_meta(meta_file: Path, content_hash: str, stat: os.stat_result):
+    meta: Dict[str, Any] = {
+        "sha256": content_hash,
+        "mtime": stat.st_mtime,
+        "size": stat.st_size,
+        "sample_rate": SAMPLE_RATE,
+    }
+    with open(meta_file, "w") as file:
+        json.dump(meta, file)
+
+
+def _decode_to_wav(recording: Path, wav_file: Path, chunk_size: int = 1 << 20):
+    """Decode a recording to a 16 kHz mono 16-bit WAV file using ffmpeg.
+
+    The decoded samples are streamed from ffmpeg to disk, so the full
+    recording is never held in memory.
+    """
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-loglevel",
+        "error",
+        "-threads",
+        "0",
+        "-i",
+        str(recording),
+        "-f",
+        "s16le",
+        "-ac",
+        "1",
+        "-acodec",
+        "pcm_s16le",
+        "-ar",
+        str(SAMPLE_RATE),
+        "-",
+    ]
+    tmp_file = wav_file.with_name(wav_file.name + ".tmp")
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+        with wave.open(str(tmp_file), "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(SAMPLE_RATE)
+            for chunk in iter(lambda: proc.stdout.read(chunk_size), b""):  # type: ignore
+                out.writeframesraw(chunk)
+        stderr = proc.stderr.read()  # type: ignore
+
+    if proc.returncode != 0:
+        tmp_file.unlink(missing_ok=True)
+        raise RuntimeError(f"Failed to load audio: {stderr.decode()}")
+
+    os.replace(tmp_file, wav_file)
@@ -0,0 +1,87 @@
+from pathlib import Path
+from typing import Any, Optional
+import os
+import threading
+
+
+class DirectoryCache:
+    """Cache of values stored as files in a local directory.
+
+    Each value is stored in its own file, named after its key. When the
+    files grow beyond ``max_bytes`` the least recently used values are
+    removed. Subclasses set the file suffix and how values are read and
+    written.
+
+    Parameters
+    ----------
+    directory : pathlib.Path
+        Directory in which cached values are stored.
+    max_bytes : int
+        Maximum combined size in bytes of the cached values.
+    """
+
+    suffix = ".cache"
+
+    def __init__(self, directory: Path, max_bytes: int):
+        """Initialise the cache."""
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached value, or None if it is not cached."""
+        file_path = self._file_path(key)
+        try:
+            value = self._read(file_path)
+        except FileNotFoundError:
+            return None
+        if value is None:
+            return None
+
+        # Mark as recently used
+        os.utime(file_path)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value in the cache, evicting old entries if needed."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        file_path = self._file_path(key)
+        # Values may be stored concurrently, so each thread writes its own file
+        tmp_path = file_path.with_suffix(f".{threading.get_ident()}.tmp")
+        self._write(tmp_path, value)
+        os.replace(tmp_path, file_path)
+        self._evict(keep=file_path)
+
+    def clear(self) -> None:
+        """Remove all cached values."""
+        for file_path in self.directory.glob(f"*{self.suffix}"):
+            file_path.unlink(missing_ok=True)
+
+    def _read(self, file_path: Path) -> Optional[Any]:
+        """Read a value from a file, or return None if it is not usable."""
+        raise NotImplementedError
+
+    def _write(self, file_path: Path, value: Any) -> None:
+        """Write a value to a file."""
+        raise NotImplementedError
+
+    def _file_path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def _evict(self, keep: Path):
+        """Remove least recently used values until the cache fits."""
+        entries = []
+        for file_path in self.directory.glob(f"*{self.suffix}"):
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file_path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, file_path in sorted(entries, key=lambda entry: entry[0]):
+            if total_bytes <= self.max_bytes:
+                break
+            if file_path == keep:
+                continue
+            file_path.unlink(missing_ok=True)
+            total_bytes -= size
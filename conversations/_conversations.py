@@ -1,5 +1,7 @@
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import hashlib
 import pickle
 from datetime import datetime, timezone
 import os
@@ -59,6 +61,10 @@ class Conversation:
         self._summary = summary
         self._summary_automated = summary_automated
         self._transcription_shortened = transcription_shortened
+        self._transcription_shortened_source: Optional[str] = None
+        self._transcription_shortened_levels: Optional[Tuple[tuple, list]] = None
+        self._retrieval_index: Optional[Tuple[str, Any]] = None
+        self._transcript_version = 0
 
         if meeting_datetime is not None:
             self._meeting_datetime = meeting_datetime
@@ -102,6 +108,21 @@ class Conversation:
                     "The number of speakers must match the number of attendees."
                 )
 
+    def __getstate__(self):
+        """Return the state to save, without the derived views."""
+        state = self.__dict__.copy()
+        # Derived views are recomputed when needed after loading
+        state.pop("_derived_views", None)
+        return state
+
+    def __setstate__(self, state):
+        """Restore a saved conversation, including ones saved by older versions."""
+        self._transcription_shortened_source = None
+        self._transcription_shortened_levels = None
+        self._retrieval_index = None
+        self._transcript_version = 0
+        self.__dict__.update(state)
+
     @staticmethod
     def _extract_datetime_from_file(file_path: Path) -> datetime:
         created_timestamp = os.path.getmtime(file_path)
@@ -114,6 +135,10 @@ class Conversation:
         prompt: str | None = " - How are you? - I'm fine, thank you.",
         language: str = "en",
         custom_terms: Optional[List[str]] = None,
+        num_workers: Optional[int] = 1,
+        use_cache: bool = True,
+        compress_upload: bool = False,
+        word_data: str = "full",
     ):
         """
         Transcribe a conversation using the specified method and model.
@@ -134,6 +159,23 @@ class Conversation:
         custom_terms : list[str], optional
             Custom terms passed to the transcription engine. Currently
             only supported when using the AssemblyAI ``"slam-1"`` model.
+        num_workers : int, None, optional
+            Number of worker processes used for local whisper models. Values
+            greater than one split the recording at pauses and transcribe the
+            pieces in parallel. If None, one worker per CPU core is used.
+            Defaults to 1.
+        use_cache : bool, optional
+            If True, reuse a cached transcription of a recording with the same
+            contents and the same method, model, language, prompt and custom
+            terms, and cache new transcriptions. Defaults to True.
+        compress_upload : bool, optional
+            If True, cloud services are sent low bitrate mono speech audio
+            instead of the original recording, which is split into pieces
+            below the upload size limit for OpenAI. Defaults to False.
+        word_data : str, optional
+            How word level data from AssemblyAI is stored, one of "compact",
+            "full" or "none". See ``conversations.transcribe.assembly.process``.
+            Defaults to "full".
 
         Returns
         -------
@@ -148,29 +190,23 @@ class Conversation:
         NotImplementedError
             If the method is not supported.
         """
-        if self._transcription is not None:
-            raise RuntimeError("The conversation has already been transcribed.")
+        self._check_can_transcribe(model)
 
-        available_models = [
-            "tiny",
-            "base",
-            "small",
-            "large",
-            "medium",
-            "tiny.en",
-            "base.en",
-            "small.en",
-            "medium.en",
-            "openai.en",
-            "nano",
-            "best",
-            "slam-1",
-            "universal",
-        ]
-        if model not in available_models:
-            raise ValueError(
-                f"Invalid model '{model}'. Must be one of {available_models}."
+        if use_cache:
+            from .transcribe._cache import _transcription_cache
+
+            cache = _transcription_cache()
+            cache_key = self._transcription_cache_key(
+                method, model, prompt, language, custom_terms
             )
+            cached = cache.get(cache_key)
+            if cached is not None:
+                print("Using cached transcription.")
+                self._transcription = cached
+                if method == "assembly":
+                    self._use_assembly_word_data(word_data)
+                    self._use_assembly_diarisation()
+                return
 
         if method == "whisper":
             from .transcribe import whisper
@@ -180,6 +216,8 @@ class Conversation:
                 model_name=model,
                 prompt=prompt,
                 language=language,
+                num_workers=num_workers,
+                compress_upload=compress_upload,
             )
         elif method == "assembly":
             from .transcribe import assembly
@@ -189,19 +227,209 @@ class Conversation:
                 model_name=model,
                 language=language,
                 custom_terms=custom_terms,
+                compress_upload=compress_upload,
+            )
+        else:
+            raise NotImplementedError(
+                f"Transcription method '{method}' is not supported."
             )
 
+        # The full word data is cached, so any form can be made from the cache
+        if use_cache:
+            cache.put(cache_key, self._transcription)
+
+        if method == "assembly":
+            self._use_assembly_word_data(word_data)
             # by default, we use assembly to diarise the conversation too
-            self._diarisation = [
-                {
-                    "note": "diairisation performed by assembly and transcript contains speaker labels"
-                }
-            ]
+            self._use_assembly_diarisation()
+
+    def transcribe_stream(
+        self,
+        method: str = "assembly",
+        model: str = "nano",
+        prompt: str | None = " - How are you? - I'm fine, thank you.",
+        language: str = "en",
+        custom_terms: Optional[List[str]] = None,
+        num_workers: Optional[int] = 1,
+        use_cache: bool = True,
+        compress_upload: bool = False,
+        word_data: str = "full",
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Transcribe a conversation, yielding segments as they become available.
+
+        The arguments are the same as for :meth:`transcribe`. Once every segment
+        has been yielded, the transcription is stored on the conversation
+        as if :meth:`transcribe` had been called.
+
+        Yields
+        ------
+        segment : dict
+            Transcript segment with the keys ``start``, ``end`` and ``text``,
+            and ``speaker`` when the transcription method labels speakers.
+
+        Raises
+        ------
+        RuntimeError
+            If the conversation has already been transcribed.
+        ValueError
+            If an invalid model name is provided.
+        NotImplementedError
+            If the method is not supported.
+
+        Examples
+        --------
+        >>> for segment in conversation.transcribe_stream(method="whisper", model="base.en"):
+        ...     print(segment["start"], segment["text"])
+        """
+        self._check_can_transcribe(model)
+
+        if use_cache:
+            from .transcribe._cache import _transcription_cache
+
+            cache = _transcription_cache()
+            cache_key = self._transcription_cache_key(
+                method, model, prompt, language, custom_terms
+            )
+            cached = cache.get(cache_key)
+            if cached is not None:
+                print("Using cached transcription.")
+                yield from cached["segments"]  # type: ignore
+                self._transcription = cached
+                if method == "assembly":
+                    self._use_assembly_word_data(word_data)
+                    self._use_assembly_diarisation()
+                return
+
+        if method == "whisper":
+            from .transcribe import whisper
+
+            stream = whisper.process_stream(
+                audio_file=self._recording,
+                model_name=model,
+                prompt=prompt,
+                language=language,
+                num_workers=num_workers,
+                compress_upload=compress_upload,
+            )
+        elif method == "assembly":
+            from .transcribe import assembly
+
+            stream = assembly.process_stream(
+                audio_file=self._recording,
+                model_name=model,
+                language=language,
+                custom_terms=custom_terms,
+                compress_upload=compress_upload,
+            )
         else:
             raise NotImplementedError(
                 f"Transcription method '{method}' is not supported."
             )
 
+        segments = []
+        for segment in stream:
+            segments.append(dict(segment))
+            yield segment
+
+        self._transcription = {
+            "text": " ".join(seg["text"].strip() for seg in segments),
+            "segments": segments,  # type: ignore
+        }
+
+        # The full word data is cached, so any form can be made from the cache
+        if use_cache:
+            cache.put(cache_key, self._transcription)
+
+        if method == "assembly":
+            self._use_assembly_word_data(word_data)
+            self._use_assembly_diarisation()
+
+    async def atranscribe_stream(
+        self, *args, **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Transcribe a conversation, asynchronously yielding segments.
+
+        This is the asynchronous version of :meth:`transcribe_stream` and
+        accepts the same arguments. Transcription runs in a worker thread so
+        the event loop is not blocked while segments are decoded.
+
+        Yields
+        ------
+        segment : dict
+            Transcript segment with the keys ``start``, ``end`` and ``text``,
+            and ``speaker`` when the transcription method labels speakers.
+        """
+        stream = self.transcribe_stream(*args, **kwargs)
+        while True:
+            # Segments are never None, so None marks the end of the stream
+            segment = await asyncio.to_thread(next, stream, None)
+            if segment is None:
+                break
+            yield segment
+
+    def _use_assembly_word_data(self, word_data: str):
+        """Store the word level data of an assembly transcript as requested."""
+        from .transcribe.assembly import set_word_data
+
+        set_word_data(self._transcription, word_data)  # type: ignore
+
+    def _use_assembly_diarisation(self):
+        """Mark the conversation as diarised by the assembly transcript."""
+        self._diarisation = [
+            {
+                "note": "diairisation performed by assembly and transcript contains speaker labels"
+            }
+        ]
+
+    def _transcription_cache_key(
+        self,
+        method: str,
+        model: str,
+        prompt: Optional[str],
+        language: str,
+        custom_terms: Optional[List[str]],
+    ) -> str:
+        """Create the transcription cache key of the recording and settings."""
+        from ._audio import recording_content_hash
+        from .transcribe._cache import TranscriptionCache
+
+        return TranscriptionCache.key(
+            recording_content_hash(self._recording),
+            method=method,
+            model=model,
+            language=language,
+            prompt=prompt,
+            custom_terms=custom_terms,
+        )
+
+    def _check_can_transcribe(self, model: str):
+        """Check that the conversation can be transcribed with a model."""
+        if self._transcription is not None:
+            raise RuntimeError("The conversation has already been transcribed.")
+
+        available_models = [
+            "tiny",
+            "base",
+            "small",
+            "large",
+            "medium",
+            "tiny.en",
+            "base.en",
+            "small.en",
+            "medium.en",
+            "openai.en",
+            "nano",
+            "best",
+            "slam-1",
+            "universal",
+        ]
+        if model not in available_models:
+            raise ValueError(
+                f"Invalid model '{model}'. Must be one of {available_models}."
+            )
+
     def diarise(self, method: str = "simple"):
         """Diarise a conversation."""
         if self._diarisation is not None:
@@ -214,32 +442,180 @@ class Conversation:
             audio_file=self._recording, num_speakers=self._num_speakers
         )
 
-    def report(self, audio_file=None):
-        """Generate a report of a conversation."""
-        from .report import generate
+    def report(
+        self,
+        audio_file=None,
+        alignment: str = "midpoint",
+        renderer: str = "dominate",
+        file=None,
+        data_file=None,
+    ):
+        """Generate a report of a conversation.
+
+        Parameters
+        ----------
+        audio_file : Path, optional
+            Audio to embed in the report, by default the recording.
+        alignment : str, optional
+            How transcript segments are assigned to diarised speakers, either
+            "midpoint" or "overlap", by default "midpoint".
+        renderer : str, optional
+            How the report is created. "dominate" builds a dominate document,
+            while "stream" formats the same html directly from templates,
+            which is much faster for long conversations. "virtual" embeds the
+            segments as data and renders only the visible part of the
+            conversation in the browser, with an in-page search, so that very
+            long conversations open instantly. By default "dominate".
+        file : str | Path | TextIO, optional
+            If provided, the html report is written to this path or file-like
+            object.
+        data_file : str | Path, optional
+            With the "virtual" renderer, write the segment data to this
+            sidecar script instead of embedding it in the page.
+
+        Returns
+        -------
+        report : dominate.document | str | None
+            With the "dominate" renderer, the report document. With the
+            "stream" and "virtual" renderers, the html of the report, or None
+            if it was written to ``file``.
+        """
+        from .report import (
+            generate,
+            iter_html,
+            iter_virtual_html,
+            write_html,
+            write_virtual_html,
+        )
 
         if audio_file is None:
             audio_file = self._recording
 
-        return generate(
-            transcript=self._transcription,
+        kwargs = dict(
+            transcript=self._grouped_transcription(alignment),
             audio_file=audio_file,
             diarisation=self._diarisation,
             speaker_mapping=self._speaker_mapping,
+            alignment=alignment,
         )
 
-    def export_text(self):
-        """Export the transcript and diarisation as text."""
+        if renderer == "dominate":
+            doc = generate(**kwargs)
+            if isinstance(file, (str, Path)):
+                Path(file).write_text(doc.render())
+            elif file is not None:
+                file.write(doc.render())
+            return doc
+        elif renderer == "stream":
+            if file is not None:
+                return write_html(file, **kwargs)
+            return "".join(iter_html(**kwargs))
+        elif renderer == "virtual":
+            if file is not None:
+                return write_virtual_html(file, data_file=data_file, **kwargs)
+            if data_file is not None:
+                raise ValueError("data_file requires the report to be written to file.")
+            return "".join(iter_virtual_html(**kwargs))
+        else:
+            raise ValueError(
+                "renderer must be 'dominate', 'stream' or 'virtual'. "
+                f"Received {renderer}."
+            )
+
+    def export_text(self, alignment: str = "midpoint"):
+        """Export the transcript and diarisation as text.
+
+        The text is reused by later calls until the transcript, diarisation,
+        speaker mapping, attendees or meeting time change. Call
+        ``mark_transcript_changed`` after editing the transcript or
+        diarisation in place.
+
+        Parameters
+        ----------
+        alignment : str, optional
+            How transcript segments are assigned to diarised speakers, either
+            "midpoint" or "overlap", by default "midpoint".
+        """
         from .report import export_text
 
-        return export_text(
+        return self._derived_view(
+            f"text_{alignment}",
+            self._text_inputs(),
+            lambda: export_text(
+                transcript=self._grouped_transcription(alignment),
+                diarisation=self._diarisation,
+                speaker_mapping=self._speaker_mapping,
+                datetimestr=self._meeting_datetime.strftime("%Y-%m-%d %H:%M:%S %Z"),
+                attendees=self._attendees,
+                alignment=alignment,
+            ),
+        )
+
+    def num_tokens(self, model: str = "gpt-4o") -> int:
+        """Count the tokens in the exported text of the conversation.
+
+        Parameters
+        ----------
+        model : str, optional
+            The model whose tokenizer is used, by default "gpt-4o".
+
+        Returns
+        -------
+        int
+            The number of tokens in the text returned by ``export_text``.
+        """
+        from .ai._chatgpt import _num_tokens
+
+        return self._derived_view(
+            f"num_tokens_{model}",
+            self._text_inputs(),
+            lambda: _num_tokens(self.export_text(), model=model),
+        )
+
+    def write_text(self, file, alignment: str = "midpoint") -> None:
+        """Write the transcript and diarisation as text to a file.
+
+        The text is the same as that returned by ``export_text``, but is
+        written as it is generated instead of being built in memory first.
+
+        Parameters
+        ----------
+        file : str | Path | TextIO
+            Path of the text file, or a file-like object opened for writing.
+        alignment : str, optional
+            How transcript segments are assigned to diarised speakers, either
+            "midpoint" or "overlap", by default "midpoint".
+
+        Raises
+        ------
+        RuntimeError
+            If the conversation has not been transcribed.
+        """
+        from .report import write_text
+
+        if self._transcription is None:
+            raise RuntimeError("The conversation has not been transcribed.")
+
+        write_text(
+            file,
             transcript=self._transcription,
             diarisation=self._diarisation,
             speaker_mapping=self._speaker_mapping,
             datetimestr=self._meeting_datetime.strftime("%Y-%m-%d %H:%M:%S %Z"),
             attendees=self._attendees,
+            alignment=alignment,
         )
 
+    def mark_transcript_changed(self) -> None:
+        """Mark the transcript or diarisation as edited in place.
+
+        Text, reports and token counts derived from the transcript are reused
+        until it changes. Replacing the transcript or diarisation is detected
+        automatically, but edits made to them in place, such as correcting
+        the text of a segment, must be marked with this method.
+        """
+        self._transcript_version += 1
+
     def save(self, file_path: Optional[str] = None) -> None:
         """Save the Conversation object to disk.
 
@@ -268,7 +644,8 @@ class Conversation:
         Parameters
         ----------
         force : bool
-            If True, generate a new summary even if one already exists.
+            If True, generate a new summary even if one already exists or the
+            same request was made before.
         print_summary : bool
             If True, print the summary to the console.
         system_prompt : str or None
@@ -293,6 +670,7 @@ class Conversation:
                 system_prompt,
                 summary_prompt,
                 append_prompt,
+                use_cache=not force,
             )
 
         if print_summary:
@@ -300,12 +678,70 @@ class Conversation:
 
         return self._summary_automated
 
+    def summarise_stream(
+        self,
+        force: bool = False,
+        system_prompt: Optional[str] = None,
+        summary_prompt: Optional[str] = None,
+        append_prompt: Optional[str] = None,
+    ):
+        """Generate a summary of the conversation, streaming it as it arrives.
+
+        The summary is stored once the stream is exhausted, as for
+        ``summarise``.
+
+        Parameters
+        ----------
+        force : bool
+            If True, generate a new summary even if one already exists or the
+            same request was made before.
+        system_prompt : str or None
+            The system prompt to use when generating the summary.
+        summary_prompt : str or None
+            The summary prompt to use when generating the summary.
+        append_prompt : str or None
+            The append prompt to use when generating the summary.
+
+        Returns
+        -------
+        stream : ResponseStream
+            The text deltas of the summary. An existing summary is yielded in
+            one piece. After iterating, ``time_to_first_token`` and
+            ``latency`` hold the timings of the response.
+
+        Examples
+        --------
+        >>> for delta in conversation.summarise_stream():  # doctest: +SKIP
+        ...     print(delta, end="", flush=True)
+        """
+        from .ai import ResponseStream, summarise_stream
+
+        if (self._summary_automated is not None) and not force:
+            return ResponseStream([self._summary_automated])
+
+        stream = summarise_stream(
+            self.shortened_transcript(),
+            system_prompt,
+            summary_prompt,
+            append_prompt,
+            use_cache=not force,
+        )
+        stream.on_complete = self._set_summary_automated
+        return stream
+
+    def _set_summary_automated(self, summary: str):
+        self._summary_automated = summary
+
     def query(
         self,
         query: str,
         print_summary: bool = True,
         system_prompt: Optional[str] = None,
         append_prompt: Optional[str] = None,
+        mode: str = "full",
+        top_k: int = 5,
+        neighbours: int = 1,
+        max_context_tokens: int = 8000,
     ):
         """Query the conversation.
 
@@ -319,6 +755,18 @@ class Conversation:
             The system prompt to use when generating the summary.
         append_prompt : str or None
             The append prompt to use when generating the summary.
+        mode : str
+            What is sent to the model. "full" sends the shortened transcript.
+            "retrieval" sends only the speaker turns that best match the
+            query, found with a search index that is built once and saved
+            with the conversation.
+        top_k : int
+            In retrieval mode, the number of best matching speaker turns.
+        neighbours : int
+            In retrieval mode, the number of speaker turns sent either side
+            of each best matching turn.
+        max_context_tokens : int
+            In retrieval mode, the maximum number of tokens of speaker turns.
 
         Returns
         -------
@@ -327,21 +775,112 @@ class Conversation:
         """
         from .ai import query as query_fn
 
-        short_transcript = self.shortened_transcript()
+        if mode == "full":
+            context = self.shortened_transcript()
+        elif mode == "retrieval":
+            context = self._retrieval().context(
+                query, top_k=top_k, neighbours=neighbours, max_tokens=max_context_tokens
+            )
+        else:
+            raise ValueError(
+                f"mode must be one of ['full', 'retrieval']. Received {mode}."
+            )
 
-        answer = query_fn(short_transcript, query, system_prompt, append_prompt)
+        answer = query_fn(context, query, system_prompt, append_prompt)
         if print_summary:
             print(answer)
         return answer
 
+    def query_stream(
+        self,
+        query: str,
+        system_prompt: Optional[str] = None,
+        append_prompt: Optional[str] = None,
+    ):
+        """Query the conversation, streaming the response as it arrives.
+
+        Parameters
+        ----------
+        query : str
+            The query to ask the conversation.
+        system_prompt : str or None
+            The system prompt to use when generating the response.
+        append_prompt : str or None
+            The append prompt to use when generating the response.
+
+        Returns
+        -------
+        stream : ResponseStream
+            The text deltas of the response. After iterating, the full
+            response is in ``text`` and the timings in
+            ``time_to_first_token`` and ``latency``.
+        """
+        from .ai import query_stream as query_stream_fn
+
+        short_transcript = self.shortened_transcript()
+
+        return query_stream_fn(short_transcript, query, system_prompt, append_prompt)
+
+    def query_many(
+        self,
+        questions: List[str],
+        print_summary: bool = True,
+        system_prompt: Optional[str] = None,
+        append_prompt: Optional[str] = None,
+        batch: str = "concurrent",
+        force: bool = False,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Ask several questions about the conversation.
+
+        Parameters
+        ----------
+        questions : list of str
+            The questions to ask the conversation.
+        print_summary : bool
+            If True, print the answers to the console.
+        system_prompt : str or None
+            The system prompt to use when answering.
+        append_prompt : str or None
+            The append prompt to use when answering.
+        batch : str
+            "concurrent" sends one request per question at the same time,
+            and "packed" sends all questions in a single request.
+        force : bool
+            If True, new answers are generated even if the same questions
+            were asked before.
+
+        Returns
+        -------
+        answers : dict
+            For each question, a dictionary with the ``answer`` and the
+            ``prompt_tokens`` and ``completion_tokens`` used for it.
+        """
+        from .ai import query_many as query_many_fn
+
+        short_transcript = self.shortened_transcript()
+
+        answers = query_many_fn(
+            short_transcript,
+            questions,
+            system_prompt,
+            append_prompt,
+            batch=batch,
+            use_cache=not force,
+        )
+        if print_summary:
+            for question, answer in answers.items():
+                print(f"{question}\n{answer['answer']}\n")
+        return answers
+
     def shortened_transcript(
         self, chunk_num_tokens: int = 128000, shorten_iterations: int = 2
     ) -> str:
         """
         Get the shortened transcript of the conversation.
 
-        This method returns the previously shortened transcript if available.
-        If not, it computes the shortened transcript first and then returns it.
+        This method returns the previously shortened transcript if it was
+        created from the current exported text. If not, it computes the
+        shortened transcript first and then returns it.
 
         Parameters
         ----------
@@ -356,15 +895,118 @@ class Conversation:
         str
             The shortened transcript of the conversation.
         """
-        if self._transcription_shortened is None:
+        text = self.export_text()
+        source = self._text_hash()
+
+        # A shortened transcript of unknown origin, such as one passed to the
+        # constructor, is kept. Otherwise it must match the current text.
+        stale = self._transcription_shortened_source not in (None, source)
+        if self._transcription_shortened is None or stale:
             from .ai._shorten_transcript import _shorten_transcript
 
+            # Levels completed by an earlier call, such as one that ran out of
+            # budget, are reused if they were made from the same text
+            key = (source, chunk_num_tokens, shorten_iterations)
+            levels = self._transcription_shortened_levels
+            if levels is None or levels[0] != key:
+                self._transcription_shortened_levels = levels = (key, [])
+
             self._transcription_shortened = _shorten_transcript(
-                self.export_text(), chunk_num_tokens, shorten_iterations
+                text, chunk_num_tokens, shorten_iterations, levels=levels[1]
             )
+            self._transcription_shortened_source = source
+            # The levels are only needed to resume an unfinished shortening
+            self._transcription_shortened_levels = None
 
         return self._transcription_shortened
 
+    def _retrieval(self):
+        """Return the search index of the exported text, building it if needed."""
+        source = self._text_hash()
+        index = self._retrieval_index
+        if index is None or index[0] != source:
+            from .ai._retrieval import RetrievalIndex
+
+            self._retrieval_index = index = (
+                source,
+                RetrievalIndex(self.export_text()),
+            )
+        return index[1]
+
+    def _text_hash(self) -> str:
+        """Return the hash of the exported text."""
+        return self._derived_view(
+            "text_hash",
+            self._text_inputs(),
+            lambda: hashlib.sha256(self.export_text().encode()).hexdigest(),
+        )
+
+    def _derived_view(self, name: str, inputs: tuple, compute: Callable[[], Any]):
+        """Return a view derived from the conversation, computing it if needed.
+
+        Views are cached with the inputs they were derived from, and are
+        recomputed when any of those inputs has changed.
+        """
+        views = self.__dict__.setdefault("_derived_views", {})
+        if name in views and views[name][0] == inputs:
+            return views[name][1]
+
+        value = compute()
+        views[name] = (inputs, value)
+        return value
+
+    def _transcript_inputs(self) -> tuple:
+        """Return the inputs of views derived from the transcript and diarisation.
+
+        The transcript and diarisation are compared by identity, so replacing
+        them invalidates the views. Edits made in place are counted by
+        ``mark_transcript_changed``.
+        """
+        return (
+            _Identity(self._transcription),
+            _Identity(self._diarisation),
+            self._transcript_version,
+        )
+
+    def _text_inputs(self) -> tuple:
+        """Return the inputs of views derived from the exported text."""
+        mapping = self._speaker_mapping
+        attendees = self._attendees
+        return self._transcript_inputs() + (
+            dict(mapping) if mapping is not None else None,
+            list(attendees) if attendees is not None else None,
+            self._meeting_datetime,
+        )
+
+    def _grouped_transcription(self, alignment: str = "midpoint"):
+        """Return the transcription grouped by speaker, if it is diarised."""
+        if self._transcription is None or self._diarisation is None:
+            return self._transcription
+
+        from .report._utils import _group_transcript_segements_by_speaker
+
+        return self._derived_view(
+            f"grouped_{alignment}",
+            self._transcript_inputs(),
+            lambda: _group_transcript_segements_by_speaker(
+                self._transcription, self._diarisation, alignment=alignment
+            ),
+        )
+
+
+class _Identity:
+    """Reference to an object that compares equal only to the same object."""
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: Any):
+        """Initialise the reference."""
+        self.obj = obj
+
+    def __eq__(self, other) -> bool:
+        """Return whether both references are to the same object."""
+        return isinstance(other, _Identity) and other.obj is self.obj
+
 
 def load_conversation(file_path: str) -> "Conversation":
     """Load a Conversation object from disk.
@@ -0,0 +1,185 @@
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+
+class SegmentTable:
+    """Columnar storage of transcript segments.
+
+    Segments are stored as parallel NumPy arrays of start and end times and
+    speaker ids, with speaker labels interned in a short list and the text of
+    every segment held in a single string. Remapping speakers and slicing by
+    time create views that share these arrays, rather than copying each
+    segment.
+
+    Report and export functions accept a segment table wherever they accept
+    a transcript dictionary.
+
+    Attributes
+    ----------
+    start : np.ndarray
+        Start time of each segment in seconds.
+    end : np.ndarray
+        End time of each segment in seconds.
+    speaker : np.ndarray
+        Index of the speaker of each segment into ``speakers``, or -1 if the
+        segment has no speaker.
+    speakers : list[str]
+        Speaker labels.
+    text : str
+        Text store holding the text of all segments.
+    offsets : np.ndarray
+        Offsets of each segment into ``text``, with one more entry than
+        segments.
+    """
+
+    __slots__ = ("start", "end", "speaker", "speakers", "text", "offsets")
+
+    def __init__(
+        self,
+        start: np.ndarray,
+        end: np.ndarray,
+        speaker: np.ndarray,
+        speakers: List[str],
+        text: str,
+        offsets: np.ndarray,
+    ):
+        """Initialise the segment table."""
+        self.start = start
+        self.end = end
+        self.speaker = speaker
+        self.speakers = speakers
+        self.text = text
+        self.offsets = offsets
+
+    @classmethod
+    def from_segments(cls, segments: Sequence[Dict[str, Any]]) -> "SegmentTable":
+        """Create a segment table from a list of segment dictionaries.
+
+        Only the ``start``, ``end``, ``text`` and ``speaker`` of each segment
+        are kept.
+        """
+        speakers: List[str] = []
+        speaker_ids: Dict[Any, int] = {}
+        speaker = np.full(len(segments), -1, dtype=np.int32)
+        for idx, seg in enumerate(segments):
+            if "speaker" not in seg:
+                continue
+            label = seg["speaker"]
+            if label not in speaker_ids:
+                speaker_ids[label] = len(speakers)
+                speakers.append(label)
+            speaker[idx] = speaker_ids[label]
+
+        lengths = np.fromiter((len(seg["text"]) for seg in segments), dtype=np.int64)
+        offsets = np.zeros(len(segments) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        return cls(
+            start=np.fromiter((seg["start"] for seg in segments), dtype=np.float64),
+            end=np.fromiter((seg["end"] for seg in segments), dtype=np.float64),
+            speaker=speaker,
+            speakers=speakers,
+            text="".join(seg["text"] for seg in segments),
+            offsets=offsets,
+        )
+
+    @classmethod
+    def from_transcript(cls, transcript: Dict[str, Any]) -> "SegmentTable":
+        """Create a segment table from a transcript in whisper format."""
+        return cls.from_segments(transcript["segments"])
+
+    def to_transcript(self) -> Dict[str, Any]:
+        """Convert the segment table to a transcript in whisper format."""
+        return {"segments": list(self)}
+
+    def __len__(self) -> int:
+        """Return the number of segments."""
+        return len(self.start)
+
+    def __getitem__(self, idx: int) -> Dict[str, Any]:
+        """Return a segment as a dictionary."""
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("segment index out of range")
+
+        seg = {
+            "start": float(self.start[idx]),
+            "end": float(self.end[idx]),
+            "text": self.segment_text(idx),
+        }
+        if self.speaker[idx] >= 0:
+            seg["speaker"] = self.speakers[self.speaker[idx]]
+        return seg
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the segments as dictionaries."""
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def segment_text(self, idx: int) -> str:
+        """Return the text of a segment."""
+        return self.text[self.offsets[idx] : self.offsets[idx + 1]]
+
+    def has_speakers(self) -> bool:
+        """Return True if the segments are labelled with speakers."""
+        return bool(len(self)) and self.speaker[0] >= 0
+
+    def map_speakers(self, speaker_mapping: Dict[str, str]) -> "SegmentTable":
+        """Return a view of the table with speakers renamed.
+
+        Parameters
+        ----------
+        speaker_mapping : dict
+            Mapping of old speaker names to new speaker names. Speakers that
+            are not in the mapping keep their name.
+
+        Returns
+        -------
+        table : SegmentTable
+            Segment table sharing the segment arrays and text of this table.
+        """
+        return SegmentTable(
+            start=self.start,
+            end=self.end,
+            speaker=self.speaker,
+            speakers=[speaker_mapping.get(s, s) for s in self.speakers],
+            text=self.text,
+            offsets=self.offsets,
+        )
+
+    def time_slice(
+        self, start: Optional[float] = None, stop: Optional[float] = None
+    ) -> "SegmentTable":
+        """Return a view of the segments starting within a time range.
+
+        Segments must be in time order.
+
+        Parameters
+        ----------
+        start : float, optional
+            Segments starting before this time in seconds are excluded. By
+            default no segments are excluded.
+        stop : float, optional
+            Segments starting at or after this time in seconds are excluded.
+            By default no segments are excluded.
+
+        Returns
+        -------
+        table : SegmentTable
+            Segment table sharing the segment arrays and text of this table.
+        """
+        first = 0 if start is None else int(np.searchsorted(self.start, start, "left"))
+        last = len(self)
+        if stop is not None:
+            last = max(first, int(np.searchsorted(self.start, stop, "left")))
+
+        return SegmentTable(
+            start=self.start[first:last],
+            end=self.end[first:last],
+            speaker=self.speaker[first:last],
+            speakers=self.speakers,
+            text=self.text,
+            offsets=self.offsets[first : last + 1],
+        )
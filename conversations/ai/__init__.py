@@ -1,3 +1,5 @@
 """AI support for conversations."""
 
-from ._chatgpt import summarise, query
+from ._chatgpt import summarise, query, query_many, summarise_stream, query_stream
+from ._stream import ResponseStream
+from ._usage import UsageStats, usage_stats
@@ -0,0 +1,88 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import time
+
+from conversations._cache import DirectoryCache
+from conversations.config import cache_settings
+
+
+class ResponseCache(DirectoryCache):
+    """Cache of language model responses.
+
+    Responses are stored as JSON files in a local directory, keyed on the
+    hash of the model, temperature and messages of the request. Repeating a
+    request, for example when re-running a notebook, is served from the
+    cache instead of the API. Responses older than ``ttl_seconds`` are
+    ignored, and when the cache grows beyond ``max_bytes`` the least
+    recently used responses are removed.
+
+    Parameters
+    ----------
+    directory : pathlib.Path
+        Directory in which cached responses are stored.
+    max_bytes : int
+        Maximum combined size in bytes of the cached responses.
+    ttl_seconds : float, optional
+        Time in seconds after which a cached response expires. By default
+        responses do not expire.
+    """
+
+    suffix = ".json"
+
+    def __init__(
+        self, directory: Path, max_bytes: int, ttl_seconds: Optional[float] = None
+    ):
+        """Initialise the response cache."""
+        super().__init__(directory, max_bytes)
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def key(model: str, temperature: float, messages: List[Dict[str, Any]]) -> str:
+        """Create the cache key of a chat completion request.
+
+        Parameters
+        ----------
+        model : str
+            The model.
+        temperature : float
+            The sampling temperature.
+        messages : list[dict]
+            The messages of the request.
+
+        Returns
+        -------
+        str
+            The cache key.
+        """
+        request = [model, temperature, messages]
+        return hashlib.sha256(json.dumps(request).encode()).hexdigest()
+
+    def _read(self, file_path: Path) -> Optional[str]:
+        """Read a response, or return None if it is corrupt or expired."""
+        with open(file_path) as file:
+            try:
+                entry = json.load(file)
+            except json.JSONDecodeError:
+                return None
+
+        if self.ttl_seconds is not None:
+            if time.time() - entry["created"] > self.ttl_seconds:
+                file_path.unlink(missing_ok=True)
+                return None
+        return entry["content"]
+
+    def _write(self, file_path: Path, content: str) -> None:
+        """Write a response with the time it was created."""
+        with open(file_path, "w") as file:
+            json.dump({"created": time.time(), "content": content}, file)
+
+
+def _response_cache() -> ResponseCache:
+    """Create the response cache configured in the cache settings."""
+    return ResponseCache(
+        directory=cache_settings.cache_dir / "responses",
+        max_bytes=cache_settings.response_cache_max_bytes,
+        ttl_seconds=cache_settings.response_cache_ttl_seconds,
+    )
@@ -1,9 +1,14 @@
 """ChatGPT based AI for conversations."""
 
-from typing import List, Optional
+from functools import lru_cache
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import tiktoken
 from openai import OpenAI
-from conversations.config import settings
+from conversations.config import cache_settings, settings
+from ._scheduler import RateLimiter, RequestBudget, _rate_limiter, map_concurrently
+from ._stream import ResponseStream
+from ._usage import usage_stats
 
 client = OpenAI()
 
@@ -14,6 +19,47 @@ class ChunkTooLongError(Exception):
     pass
 
 
+# Models that may change over time are counted as a fixed snapshot
+_TOKEN_MODEL_ALIASES = {
+    "gpt-3.5-turbo": "gpt-3.5-turbo-0301",
+    "gpt-4": "gpt-4-0314",
+    "gpt-4-1106-preview": "gpt-4-0314",
+}
+
+# Tokens added per message and per name by each model's chat format
+_MESSAGE_FORMAT_TOKENS = {
+    # every message follows <|start|>{role/name}\n{content}<|end|>\n,
+    # and if there's a name, the role is omitted
+    "gpt-3.5-turbo-0301": (4, -1),
+    "gpt-4-0314": (3, 1),
+    "gpt-4o": (3, 1),
+    "gpt-4.1-mini": (3, 1),
+}
+
+
+@lru_cache(maxsize=None)
+def _token_model(model: str) -> str:
+    """Return the model whose tokenizer and chat format are used for a model."""
+    if model in _TOKEN_MODEL_ALIASES:
+        snapshot = _TOKEN_MODEL_ALIASES[model]
+        print(
+            f"Warning: {model} may change over time. "
+            f"Returning num tokens assuming {snapshot}."
+        )
+        return snapshot
+    return model
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str) -> tiktoken.Encoding:
+    """Return the tokenizer of a model, loading it only once per model."""
+    try:
+        return tiktoken.encoding_for_model(_token_model(model))
+    except KeyError:
+        print("Warning: model not found. Using cl100k_base encoding.")
+        return tiktoken.get_encoding("cl100k_base")
+
+
 def _num_tokens_from_messages(messages, model="gpt-4-1106-preview"):
     """Return the number of tokens used by a list of messages.
 
@@ -29,41 +75,14 @@ def _num_tokens_from_messages(messages, model="gpt-4-1106-preview"):
     int
         The total number of tokens used by the messages.
     """
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        print("Warning: model not found. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    if model == "gpt-3.5-turbo":
-        print(
-            "Warning: gpt-3.5-turbo may change over time. Returning num tokens assuming gpt-3.5-turbo-0301."
-        )
-        return _num_tokens_from_messages(messages, model="gpt-3.5-turbo-0301")
-    elif model == "gpt-4":
-        print(
-            "Warning: gpt-4 may change over time. Returning num tokens assuming gpt-4-0314."
-        )
-        return _num_tokens_from_messages(messages, model="gpt-4-0314")
-    elif model == "gpt-4-1106-preview":
-        print(
-            "Warning: gpt-4 may change over time. Returning num tokens assuming gpt-4-0314."
-        )
-        return _num_tokens_from_messages(messages, model="gpt-4-0314")
-    elif model == "gpt-3.5-turbo-0301":
-        tokens_per_message = (
-            4  # every message follows <|start|>{role/name}\n{content}<|end|>\n
-        )
-        tokens_per_name = -1  # if there's a name, the role is omitted
-    elif model == "gpt-4-0314":
-        tokens_per_message = 3
-        tokens_per_name = 1
-    elif model == "gpt-4o" or model == "gpt-4.1-mini":
-        tokens_per_message = 3
-        tokens_per_name = 1
-    else:
+    token_model = _token_model(model)
+    if token_model not in _MESSAGE_FORMAT_TOKENS:
         raise NotImplementedError(
-            f"""num_tokens_from_messages() is not implemented for model {model}. See https://github.com/openai/openai-python/blob/main/chatml.md for information on how messages are converted to tokens."""
+            f"""num_tokens_from_messages() is not implemented for model {token_model}. See https://github.com/openai/openai-python/blob/main/chatml.md for information on how messages are converted to tokens."""
         )
+    tokens_per_message, tokens_per_name = _MESSAGE_FORMAT_TOKENS[token_model]
+    encoding = _encoding(model)
+
     num_tokens = 0
     for message in messages:
         num_tokens += tokens_per_message
@@ -75,15 +94,197 @@ def _num_tokens_from_messages(messages, model="gpt-4-1106-preview"):
     return num_tokens
 
 
-def _content_to_message(content: str):
-    messages = [
-        {"role": "system", "content": _system_prompt_summariser()},
-        {
-            "role": "user",
-            "content": f"Reduce the length of this transcript to approximately half the length of the original text but not to remove any important information.\n\n {content}",
-        },
-    ]
-    return messages
+def _num_tokens(text: str, model: str = "gpt-4o") -> int:
+    """Return the number of tokens in a text.
+
+    Parameters
+    ----------
+    text : str
+        The text to tokenize.
+    model : str, optional
+        The model to use for tokenization, defaults to "gpt-4o".
+
+    Returns
+    -------
+    int
+        The number of tokens in the text.
+    """
+    return len(_encoding(model).encode(text))
+
+
+def _create_chat_completion(
+    messages: List[Dict[str, Any]],
+    model: str,
+    temperature: float,
+    use_cache: bool = True,
+    openai_client: Optional[OpenAI] = None,
+    limiter: Optional[RateLimiter] = None,
+    budget: Optional[RequestBudget] = None,
+    validate: Optional[Callable[[Optional[str]], Any]] = None,
+) -> Tuple[Optional[str], Dict[str, int]]:
+    """Request a chat completion, serving repeated requests from the cache.
+
+    Parameters
+    ----------
+    messages : list[dict]
+        The messages of the request.
+    model : str
+        The model to use.
+    temperature : float
+        The temperature to use.
+    use_cache : bool, default=True
+        If False, the response cache is bypassed. The cache is also bypassed
+        when ``cache_settings.response_cache_enabled`` is False.
+    openai_client : OpenAI, optional
+        The client used for the request, by default the client of this module.
+    limiter : RateLimiter, optional
+        Rate limiter to wait on before the request, unless it is cached.
+    budget : RequestBudget, optional
+        Budget charged with the request, unless it is cached.
+    validate : Callable[[str or None], Any], optional
+        Called with the content of each new response before it is cached. If
+        it raises, the response is not cached and the error is raised. Empty
+        responses are never cached.
+
+    Returns
+    -------
+    content : str
+        The content of the response.
+    usage : dict
+        The ``prompt_tokens``, ``cached_prompt_tokens`` and
+        ``completion_tokens`` used by the request, which are zero for cached
+        responses. The usage is also added to ``usage_stats``.
+    """
+    if openai_client is None:
+        openai_client = client
+
+    cache = None
+    if use_cache and cache_settings.response_cache_enabled:
+        from ._cache import ResponseCache, _response_cache
+
+        cache = _response_cache()
+        key = ResponseCache.key(model, temperature, messages)
+        content = cache.get(key)
+        # Empty responses, which older versions cached, are requested again
+        if content:
+            usage_stats.record_cached_response()
+            return content, {
+                "prompt_tokens": 0,
+                "cached_prompt_tokens": 0,
+                "completion_tokens": 0,
+            }
+
+    if limiter is not None or budget is not None:
+        num_tokens = _num_tokens_from_messages(messages, model=model)
+        if budget is not None:
+            budget.charge(num_tokens)
+        if limiter is not None:
+            limiter.acquire(num_tokens)
+
+    response = openai_client.chat.completions.create(
+        model=model, temperature=temperature, messages=messages  # type: ignore
+    )
+    content = response.choices[0].message.content
+    usage = _usage(response)
+    usage_stats.record(usage)
+    if validate is not None:
+        validate(content)
+    if cache is not None and isinstance(content, str) and content:
+        cache.put(key, content)
+    return content, usage
+
+
+def _stream_chat_completion(
+    messages: List[Dict[str, Any]],
+    model: str,
+    temperature: float,
+    use_cache: bool = True,
+    openai_client: Optional[OpenAI] = None,
+) -> ResponseStream:
+    """Request a chat completion, streaming the text as it arrives.
+
+    Streamed and complete responses share the response cache, and a cached
+    response is yielded in one piece.
+
+    Parameters
+    ----------
+    messages : list[dict]
+        The messages of the request.
+    model : str
+        The model to use.
+    temperature : float
+        The temperature to use.
+    use_cache : bool, default=True
+        If False, the response cache is bypassed.
+    openai_client : OpenAI, optional
+        The client used for the request, by default the client of this module.
+
+    Returns
+    -------
+    ResponseStream
+        The stream of text deltas, which sends the request when iterated.
+    """
+    if openai_client is None:
+        openai_client = client
+
+    def deltas():
+        cache = None
+        if use_cache and cache_settings.response_cache_enabled:
+            from ._cache import ResponseCache, _response_cache
+
+            cache = _response_cache()
+            key = ResponseCache.key(model, temperature, messages)
+            content = cache.get(key)
+            if content:
+                usage_stats.record_cached_response()
+                stream.usage = {
+                    "prompt_tokens": 0,
+                    "cached_prompt_tokens": 0,
+                    "completion_tokens": 0,
+                }
+                yield content
+                return
+
+        response = openai_client.chat.completions.create(  # type: ignore
+            model=model,
+            temperature=temperature,
+            messages=messages,  # type: ignore
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        parts = []
+        try:
+            for chunk in response:
+                if chunk.usage is not None:
+                    stream.usage = _usage(chunk)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        finally:
+            response.close()
+
+        if cache is not None and parts:
+            cache.put(key, "".join(parts))
+        if stream.usage is not None:
+            usage_stats.record(stream.usage)
+
+    stream = ResponseStream(deltas())
+    return stream
+
+
+def _usage(response) -> Dict[str, int]:
+    """Return the prompt and completion tokens used by a response.
+
+    ``cached_prompt_tokens`` are the prompt tokens that the provider read from
+    its prompt cache, and are included in ``prompt_tokens``.
+    """
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": int(getattr(usage, "prompt_tokens", 0) or 0),
+        "cached_prompt_tokens": int(getattr(details, "cached_tokens", 0) or 0),
+        "completion_tokens": int(getattr(usage, "completion_tokens", 0) or 0),
+    }
 
 
 def _system_prompt_summariser():
@@ -123,25 +324,51 @@ def _system_prompt_query():
     return system_prompt
 
 
-def _user_prompt_summariser(transcript) -> str:
-    """Generate the summary prompt for the GPT model.
+def _transcript_prompt(transcript: str, instructions: str) -> str:
+    """Create a prompt with the transcript first and the instructions last.
+
+    Prompts about a transcript all start with the same text, so requests
+    about the same conversation share a prefix that the provider can cache,
+    and only the instructions at the end differ between tasks.
 
     Parameters
     ----------
     transcript : str
         The meeting transcript.
+    instructions : str
+        The instructions for the task.
 
     Returns
     -------
     str
-        The summary prompt text.
+        The prompt text.
     """
-    summary_prompt = f"""
+    prompt = f"""
+    Below is a transcript from conversation. Please read the transcript and then follow the instructions after it.
+
     Meeting transcript:
 
     {transcript}
 
-    First, write a 3 sentence summary of the meeting.
+    {instructions}
+    """
+    return prompt
+
+
+def _user_prompt_summariser(transcript) -> str:
+    """Generate the summary prompt for the GPT model.
+
+    Parameters
+    ----------
+    transcript : str
+        The meeting transcript.
+
+    Returns
+    -------
+    str
+        The summary prompt text.
+    """
+    instructions = """First, write a 3 sentence summary of the meeting.
 
     Then summarise the key points of this meeting and include a quote from the transcript for each point.
     Be verbose and extract as many key points as possible and ensure you adequately summarise the conversation.
@@ -161,9 +388,8 @@ def _user_prompt_summariser(transcript) -> str:
 
     Where any concepts or topics explained in the transcript? If so, list each concept and its definition as explained in the call. Highlight if the concept was incorrectly described in the call.
 
-    What was the tone of the conversation? List the tone of the conversation as a whole and the tone of each speaker.
-    """
-    return summary_prompt
+    What was the tone of the conversation? List the tone of the conversation as a whole and the tone of each speaker."""
+    return _transcript_prompt(transcript, instructions)
 
 
 def _user_prompt_query(transcript: str, query: str) -> str:
@@ -181,18 +407,36 @@ def _user_prompt_query(transcript: str, query: str) -> str:
     str
         The query prompt text.
     """
-    query_prompt = f"""
-    Below is a transcript from conversation. Please read the transcript and then answer the following question:
-    
-    Meeting transcript:
+    instructions = f"""Now, please answer the following question:
 
-    {transcript}
-    
-    Now, please answer the following question:
+    {query}"""
+    return _transcript_prompt(transcript, instructions)
+
+
+def _user_prompt_query_many(transcript: str, questions: List[str]) -> str:
+    """Create a prompt for asking several questions about a transcript.
+
+    Parameters
+    ----------
+    transcript : str
+        The meeting transcript.
+    questions : List[str]
+        The questions to ask the system.
 
-    {query}
+    Returns
+    -------
+    str
+        The query prompt text.
     """
-    return query_prompt
+    numbered = "\n".join(
+        f"    {idx}. {question}" for idx, question in enumerate(questions, 1)
+    )
+    instructions = f"""Now, please answer the following questions:
+
+{numbered}
+
+    Respond with a JSON object that maps the number of each question to its answer, for example {{"1": "First answer", "2": "Second answer"}}."""
+    return _transcript_prompt(transcript, instructions)
 
 
 def summarise(
@@ -202,6 +446,7 @@ def summarise(
     append_prompt: Optional[
         str
     ] = "Format your response as text and do not use markdown.",
+    use_cache: bool = True,
 ) -> str:
     """Generate a meeting summary using the GPT model based on the given meeting transcript.
 
@@ -215,30 +460,24 @@ def summarise(
         The summary prompt text. If not provided, it will be generated using the internal function _user_prompt_summariser(transcript).
     append_prompt : Optional[str]
         An additional prompt to append to the summary_prompt.
+    use_cache : bool, default=True
+        If False, a new summary is generated even if the same request was
+        made before.
 
     Returns
     -------
     str
         The generated meeting summary.
     """
-    if system_prompt is None:
-        system_prompt = _system_prompt_summariser()
-
     if summary_prompt is None:
         summary_prompt = _user_prompt_summariser(transcript)
 
-    if append_prompt is not None:
-        summary_prompt += append_prompt
+    messages = _messages(summary_prompt, system_prompt, append_prompt)
 
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": summary_prompt},
-    ]
-
-    response = client.chat.completions.create(
-        model=settings.openai_text_model, temperature=0.3, messages=messages  # type: ignore
+    content, _ = _create_chat_completion(
+        messages, settings.openai_text_model, temperature=0.3, use_cache=use_cache
     )
-    return str(response.choices[0].message.content)
+    return str(content)
 
 
 def query(
@@ -248,6 +487,7 @@ def query(
     append_prompt: Optional[
         str
     ] = "Format your response as text and do not use markdown.",
+    use_cache: bool = True,
 ) -> Optional[str]:
     """Generate a response to a query using the GPT model based on the given meeting transcript.
 
@@ -261,26 +501,234 @@ def query(
         The system prompt text. If not provided, it will be generated using the internal function _system_prompt_summariser().
     append_prompt : Optional[str]
         An additional prompt to append to the query_prompt.
+    use_cache : bool, default=True
+        If False, a new response is generated even if the same request was
+        made before.
 
     Returns
     -------
     answer : str
         The generated response to the query.
     """
+    messages = _messages(
+        _user_prompt_query(transcript, query), system_prompt, append_prompt
+    )
+    content, _ = _create_chat_completion(
+        messages, settings.openai_text_model, temperature=0.3, use_cache=use_cache
+    )
+    return content
+
+
+def summarise_stream(
+    transcript: str,
+    system_prompt: Optional[str] = None,
+    summary_prompt: Optional[str] = None,
+    append_prompt: Optional[
+        str
+    ] = "Format your response as text and do not use markdown.",
+    use_cache: bool = True,
+) -> ResponseStream:
+    """Stream a meeting summary as it is generated.
+
+    Takes the same parameters as ``summarise``.
+
+    Returns
+    -------
+    ResponseStream
+        The text deltas of the summary. After iterating, the full summary is
+        in ``text`` and the timings in ``time_to_first_token`` and
+        ``latency``.
+    """
+    if summary_prompt is None:
+        summary_prompt = _user_prompt_summariser(transcript)
+
+    messages = _messages(summary_prompt, system_prompt, append_prompt)
+    return _stream_chat_completion(
+        messages, settings.openai_text_model, temperature=0.3, use_cache=use_cache
+    )
+
+
+def query_stream(
+    transcript: str,
+    query: str,
+    system_prompt: Optional[str] = None,
+    append_prompt: Optional[
+        str
+    ] = "Format your response as text and do not use markdown.",
+    use_cache: bool = True,
+) -> ResponseStream:
+    """Stream the response to a query as it is generated.
+
+    Takes the same parameters as ``query``.
+
+    Returns
+    -------
+    ResponseStream
+        The text deltas of the response. After iterating, the full response
+        is in ``text`` and the timings in ``time_to_first_token`` and
+        ``latency``.
+    """
+    messages = _messages(
+        _user_prompt_query(transcript, query), system_prompt, append_prompt
+    )
+    return _stream_chat_completion(
+        messages, settings.openai_text_model, temperature=0.3, use_cache=use_cache
+    )
+
+
+def query_many(
+    transcript: str,
+    questions: List[str],
+    system_prompt: Optional[str] = None,
+    append_prompt: Optional[str] = None,
+    batch: str = "concurrent",
+    use_cache: bool = True,
+) -> Dict[str, Dict[str, Any]]:
+    """Answer several questions about the same meeting transcript.
+
+    Parameters
+    ----------
+    transcript : str
+        The meeting transcript.
+    questions : List[str]
+        The questions to answer.
+    system_prompt : Optional[str], default=None
+        The system prompt text. If not provided, it will be generated using the internal function _system_prompt_summariser().
+    append_prompt : Optional[str], default=None
+        An additional prompt to append to each prompt. By default concurrent
+        answers are asked for as text without markdown, and packed answers
+        only as the JSON object that the packed prompt asks for.
+    batch : str, default="concurrent"
+        How the questions are sent. "concurrent" sends one request per
+        question, with the transcript at the start of every prompt. The first
+        request is sent alone so that the provider caches the transcript, and
+        the rest are then sent at the same time. "packed" sends all questions
+        in one request, so the transcript is sent only once.
+    use_cache : bool, default=True
+        If False, new responses are generated even if the same requests were
+        made before.
+
+    Returns
+    -------
+    answers : dict
+        For each question, a dictionary with the ``answer`` and the
+        ``prompt_tokens``, ``cached_prompt_tokens`` and ``completion_tokens``
+        used for it. In packed mode the tokens of the single request are
+        shared among the questions, in proportion to the tokens of each
+        question and answer. Answers served from the cache used no tokens.
+    """
+    if batch not in ["concurrent", "packed"]:
+        raise ValueError(
+            f"batch must be one of ['concurrent', 'packed']. Received {batch}."
+        )
+    questions = list(dict.fromkeys(questions))
+    model = settings.openai_text_model
+
+    if batch == "concurrent":
+        if append_prompt is None:
+            append_prompt = "Format your response as text and do not use markdown."
+        limiter = _rate_limiter(
+            settings.openai_requests_per_minute, settings.openai_tokens_per_minute
+        )
+
+        def answer(question: str) -> Dict[str, Any]:
+            messages = _messages(
+                _user_prompt_query(transcript, question), system_prompt, append_prompt
+            )
+            content, usage = _create_chat_completion(
+                messages, model, temperature=0.3, use_cache=use_cache, limiter=limiter
+            )
+            return {"answer": content, **usage}
+
+        # The first request puts the shared prefix in the provider's prompt
+        # cache, so the others are sent once it is done and can read it
+        results = [answer(question) for question in questions[:1]]
+        results += map_concurrently(
+            answer, questions[1:], max_concurrency=settings.openai_max_concurrency
+        )
+        return dict(zip(questions, results))
+
+    messages = _messages(
+        _user_prompt_query_many(transcript, questions), system_prompt, append_prompt
+    )
+    # Replies that cannot be read are not cached, so that they are asked again
+    content, usage = _create_chat_completion(
+        messages,
+        model,
+        temperature=0.3,
+        use_cache=use_cache,
+        validate=lambda content: _parse_packed_answers(str(content), len(questions)),
+    )
+    answers = _parse_packed_answers(str(content), len(questions))
+
+    # Responses served from the cache used no tokens
+    if not usage["prompt_tokens"]:
+        return {
+            question: {"answer": answer, **usage}
+            for question, answer in zip(questions, answers)
+        }
+
+    # Tokens of the transcript are shared equally, and the rest by question
+    question_tokens = [_num_tokens(question, model) for question in questions]
+    shared_tokens = max(usage["prompt_tokens"] - sum(question_tokens), 0)
+    answer_tokens = [_num_tokens(answer or "", model) for answer in answers]
+    total_answer_tokens = max(sum(answer_tokens), 1)
+    return {
+        question: {
+            "answer": answer,
+            "prompt_tokens": round(
+                question_tokens[idx] + shared_tokens / len(questions)
+            ),
+            "cached_prompt_tokens": round(
+                usage["cached_prompt_tokens"] / len(questions)
+            ),
+            "completion_tokens": round(
+                usage["completion_tokens"] * answer_tokens[idx] / total_answer_tokens
+            ),
+        }
+        for idx, (question, answer) in enumerate(zip(questions, answers))
+    }
+
+
+def _messages(
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    append_prompt: Optional[str] = None,
+) -> List[Dict[str, str]]:
+    """Create the messages of a request from its user prompt.
+
+    All tasks use the same system prompt by default, so that their prompts
+    share a prefix. The append prompt goes at the end of the user prompt.
+    """
     if system_prompt is None:
         system_prompt = _system_prompt_summariser()
 
-    query_prompt = _user_prompt_query(transcript, query)
-
     if append_prompt is not None:
-        query_prompt += append_prompt
+        prompt += append_prompt
 
-    messages = [
+    return [
         {"role": "system", "content": system_prompt},
-        {"role": "user", "content": query_prompt},
+        {"role": "user", "content": prompt},
     ]
 
-    response = client.chat.completions.create(
-        model=settings.openai_text_model, temperature=0.3, messages=messages  # type: ignore
-    )
-    return response.choices[0].message.content
+
+def _parse_packed_answers(content: str, num_questions: int) -> List[Optional[str]]:
+    """Return the answers of a packed query response, in question order.
+
+    Raises
+    ------
+    ValueError
+        If the response does not hold a JSON object of answers.
+    """
+    # The object may be wrapped in text or a markdown code block
+    first, last = content.find("{"), content.rfind("}")
+    try:
+        answers = json.loads(content[first : last + 1])
+    except json.JSONDecodeError:
+        answers = None
+    if first == -1 or not isinstance(answers, dict):
+        raise ValueError(f"Could not read the answers from the response: {content}")
+    return [
+        None if answers.get(str(idx)) is None else str(answers[str(idx)])
+        for idx in range(1, num_questions + 1)
+    ]
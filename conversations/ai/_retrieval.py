@@ -0,0 +1,184 @@
+"""Retrieval of the parts of a transcript relevant to a query."""
+
+from collections import Counter
+from typing import Dict, List, Tuple
+import re
+
+import numpy as np
+
+from ._tokens import TokenIndex
+
+
+class RetrievalIndex:
+    """BM25 index over the speaker turns of a transcript.
+
+    The transcript is split into passages, one per speaker turn with long
+    turns split further, and an inverted index of the words in each passage
+    is built once. Queries are then scored against the index without reading
+    the transcript again, and only the best passages are sent to the model.
+
+    Parameters
+    ----------
+    transcript : str
+        The exported transcript.
+    model : str, optional
+        The model to use for token counts, by default "gpt-4o".
+    words_per_passage : int, optional
+        Maximum number of words in a passage, by default 200.
+    k1 : float, optional
+        BM25 term frequency saturation, by default 1.5.
+    b : float, optional
+        BM25 passage length normalisation, by default 0.75.
+
+    Attributes
+    ----------
+    tokens : TokenIndex
+        Token index of the passages, which joined give back the transcript.
+    postings : dict
+        For each word, the indices of the passages that contain it and the
+        number of times it occurs in each.
+    lengths : np.ndarray
+        Number of words in each passage.
+    """
+
+    __slots__ = ("tokens", "postings", "lengths", "k1", "b")
+
+    def __init__(
+        self,
+        transcript: str,
+        model: str = "gpt-4o",
+        words_per_passage: int = 200,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        """Initialise the retrieval index."""
+        passages = _split_passages(transcript, words_per_passage)
+        self.tokens = TokenIndex(passages, model=model)
+        self.k1 = k1
+        self.b = b
+
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        lengths = np.zeros(len(passages), dtype=np.int64)
+        for idx, passage in enumerate(passages):
+            words = _words(passage)
+            lengths[idx] = len(words)
+            for word, count in Counter(words).items():
+                ids, counts = postings.setdefault(word, ([], []))
+                ids.append(idx)
+                counts.append(count)
+        self.postings = {
+            word: (np.array(ids, dtype=np.int64), np.array(counts, dtype=np.int64))
+            for word, (ids, counts) in postings.items()
+        }
+        self.lengths = lengths
+
+    def __len__(self) -> int:
+        """Return the number of passages."""
+        return len(self.tokens)
+
+    def scores(self, query: str) -> np.ndarray:
+        """Return the BM25 score of each passage for a query."""
+        scores = np.zeros(len(self), dtype=np.float64)
+        if not len(self):
+            return scores
+        norm = self.k1 * (1 - self.b + self.b * self.lengths / self.lengths.mean())
+        for word in set(_words(query)):
+            if word not in self.postings:
+                continue
+            ids, counts = self.postings[word]
+            idf = np.log(1 + (len(self) - len(ids) + 0.5) / (len(ids) + 0.5))
+            scores[ids] += idf * counts * (self.k1 + 1) / (counts + norm[ids])
+        return scores
+
+    def search(self, query: str, top_k: int = 5) -> List[int]:
+        """Return the indices of the best passages for a query, best first.
+
+        Passages that share no words with the query are not returned.
+        """
+        scores = self.scores(query)
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [int(idx) for idx in order if scores[idx] > 0]
+
+    def context(
+        self,
+        query: str,
+        top_k: int = 5,
+        neighbours: int = 1,
+        max_tokens: int = 8000,
+    ) -> str:
+        """Return the parts of the transcript relevant to a query.
+
+        The best passages are added first, each followed by its neighbours
+        nearest first, as long as they fit in the token budget. The selected
+        passages are returned in transcript order, with skipped parts of the
+        transcript marked by "[...]". If no passage matches the query, the
+        start of the transcript is returned.
+
+        Parameters
+        ----------
+        query : str
+            The query.
+        top_k : int, optional
+            Number of best passages, by default 5.
+        neighbours : int, optional
+            Number of passages either side of each best passage, by default 1.
+        max_tokens : int, optional
+            Maximum number of tokens of the selected passages, by default 8000.
+
+        Returns
+        -------
+        str
+            The selected passages of the transcript.
+        """
+        hits = self.search(query, top_k)
+        if hits:
+            candidates = []
+            for hit in hits:
+                candidates.append(hit)
+                for distance in range(1, neighbours + 1):
+                    candidates.extend([hit - distance, hit + distance])
+        else:
+            candidates = list(range(len(self)))
+
+        selected = set()
+        num_tokens = 0
+        for idx in candidates:
+            if not 0 <= idx < len(self) or idx in selected:
+                continue
+            count = int(self.tokens.counts[idx])
+            if num_tokens + count > max_tokens:
+                continue
+            selected.add(idx)
+            num_tokens += count
+
+        parts = []
+        previous = -1
+        for idx in sorted(selected):
+            if idx != previous + 1:
+                parts.append("\n\n[...]")
+            parts.append(self.tokens.pieces[idx])
+            previous = idx
+        if previous != len(self) - 1 and parts:
+            parts.append("\n\n[...]")
+        return "".join(parts).lstrip("\n")
+
+
+def _words(text: str) -> List[str]:
+    """Split a text into lower case words for indexing."""
+    return re.findall(r"\w+", text.lower())
+
+
+def _split_passages(transcript: str, words_per_passage: int = 200) -> List[str]:
+    """Split a transcript into passages of speaker turns.
+
+    Turns longer than ``words_per_passage`` words are split into several
+    passages. Joining the passages gives back the transcript.
+    """
+    passages = []
+    for turn in re.split(r"(?=\n\n)", transcript):
+        words = re.split(r"(?<=\S)(?=\s)", turn)
+        for first in range(0, len(words), words_per_passage):
+            passage = "".join(words[first : first + words_per_passage])
+            if passage:
+                passages.append(passage)
+    return passages
@@ -0,0 +1,172 @@
+"""Concurrent, rate limited scheduling of language model requests."""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from threading import Lock
+from typing import Callable, List, Sequence, TypeVar
+import time
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class RateLimiter:
+    """Requests per minute and tokens per minute limits on API requests.
+
+    Both limits are enforced with token buckets that refill continuously, so
+    short bursts up to the per minute limits are allowed. The limiter is
+    thread safe and may be shared by all threads making requests.
+
+    Parameters
+    ----------
+    requests_per_minute : int
+        Maximum number of requests per minute.
+    tokens_per_minute : int
+        Maximum number of tokens per minute.
+    clock : Callable[[], float], optional
+        Monotonic clock in seconds, by default ``time.monotonic``.
+    sleep : Callable[[float], None], optional
+        Function that waits a number of seconds, by default ``time.sleep``.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Initialise the rate limiter."""
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._sleep = sleep
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = clock()
+        self._lock = Lock()
+
+    def acquire(self, num_tokens: int = 0) -> None:
+        """Wait until a request using ``num_tokens`` tokens is allowed.
+
+        A request using more tokens than the per minute limit waits until
+        the full per minute budget is available.
+        """
+        num_tokens = min(num_tokens, self.tokens_per_minute)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= num_tokens:
+                    self._requests -= 1
+                    self._tokens -= num_tokens
+                    return
+                wait = max(
+                    (1 - self._requests) * 60 / self.requests_per_minute,
+                    (num_tokens - self._tokens) * 60 / self.tokens_per_minute,
+                )
+            self._sleep(wait)
+
+    def _refill(self):
+        now = self._clock()
+        minutes = (now - self._updated) / 60
+        self._updated = now
+        self._requests = min(
+            self.requests_per_minute,
+            self._requests + minutes * self.requests_per_minute,
+        )
+        self._tokens = min(
+            self.tokens_per_minute, self._tokens + minutes * self.tokens_per_minute
+        )
+
+
+class BudgetExceededError(Exception):
+    """Raised when a request would exceed a request budget."""
+
+
+class RequestBudget:
+    """Hard caps on the total number of requests and prompt tokens.
+
+    Unlike a rate limiter, a budget does not refill. It bounds the cost of a
+    job made of many requests, such as shortening a long transcript. The
+    budget is thread safe and may be shared by all threads making requests.
+
+    Parameters
+    ----------
+    max_requests : int
+        Maximum number of requests.
+    max_tokens : int
+        Maximum number of prompt tokens, summed over all requests.
+
+    Attributes
+    ----------
+    requests : int
+        Number of requests charged so far.
+    tokens : int
+        Number of prompt tokens charged so far.
+    """
+
+    def __init__(self, max_requests: int, max_tokens: int):
+        """Initialise the request budget."""
+        self.max_requests = max_requests
+        self.max_tokens = max_tokens
+        self.requests = 0
+        self.tokens = 0
+        self._lock = Lock()
+
+    def charge(self, num_tokens: int = 0) -> None:
+        """Charge a request using ``num_tokens`` prompt tokens to the budget.
+
+        Raises
+        ------
+        BudgetExceededError
+            If the request would exceed the budget. Nothing is charged.
+        """
+        with self._lock:
+            if self.requests + 1 > self.max_requests:
+                raise BudgetExceededError(
+                    f"The request budget of {self.max_requests} requests is used up."
+                )
+            if self.tokens + num_tokens > self.max_tokens:
+                raise BudgetExceededError(
+                    f"A request of {num_tokens} tokens exceeds the budget of "
+                    f"{self.max_tokens} tokens, {self.tokens} of which are used."
+                )
+            self.requests += 1
+            self.tokens += num_tokens
+
+
+@lru_cache(maxsize=None)
+def _rate_limiter(requests_per_minute: int, tokens_per_minute: int) -> RateLimiter:
+    """Return the rate limiter shared by all requests with the same limits."""
+    return RateLimiter(requests_per_minute, tokens_per_minute)
+
+
+def map_concurrently(
+    func: Callable[[T], R], items: Sequence[T], max_concurrency: int
+) -> List[R]:
+    """Apply a function to items concurrently, returning results in order.
+
+    Parameters
+    ----------
+    func : Callable
+        Function applied to each item.
+    items : Sequence
+        The items.
+    max_concurrency : int
+        Maximum number of items processed at the same time.
+
+    Returns
+    -------
+    results : list
+        The result for each item, in the order of ``items``.
+    """
+    if max_concurrency <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    executor = ThreadPoolExecutor(max_workers=min(max_concurrency, len(items)))
+    try:
+        futures = [executor.submit(func, item) for item in items]
+        return [future.result() for future in futures]
+    finally:
+        # Requests that have not started are not sent after a failure
+        executor.shutdown(cancel_futures=True)
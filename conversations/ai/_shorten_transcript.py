@@ -1,6 +1,19 @@
 # Description: Shorten transcript using GPT-4
-from typing import List, Optional
-from ._chatgpt import _num_tokens_from_messages, _content_to_message
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from ._chatgpt import (
+    ChunkTooLongError,
+    _create_chat_completion,
+    _num_tokens_from_messages,
+    _transcript_prompt,
+)
+from ._scheduler import (
+    RateLimiter,
+    RequestBudget,
+    _rate_limiter,
+    map_concurrently,
+)
+from ._tokens import TokenIndex, _split_turns, _split_words
 from openai import OpenAI
 from conversations.config import settings
 
@@ -11,9 +24,18 @@ def _shorten_transcript(
     transcript: str,
     max_prompt_tokens: int = settings.max_prompt_tokens,
     shorten_iterations: int = 2,
+    overlap_tokens: int = 0,
+    levels: Optional[List[List[str]]] = None,
+    max_requests: Optional[int] = None,
+    max_tokens: Optional[int] = None,
 ) -> str:
     """Shorten a transcript using GPT-4.
 
+    The transcript is split into chunks that are shortened once. While the
+    joined summaries are still too long, consecutive summaries are merged
+    into chunks and shortened again, level by level, so completed work is
+    never repeated.
+
     Parameters
     ----------
     transcript : str
@@ -22,15 +44,33 @@ def _shorten_transcript(
         The maximum number of tokens for text chunks and the target for the final transcript.
     shorten_iterations : int, default=2
         The number of iterations to use for shortening each chunk.
+    overlap_tokens : int, default=0
+        The maximum number of tokens of speaker turns repeated at the start
+        of each chunk from the end of the previous chunk.
+    levels : list of list of str, optional
+        The chunks of the transcript followed by the summaries of each level,
+        appended to as each level completes. Pass the levels of an earlier
+        call with the same transcript and parameters, for example one that
+        ran out of budget, to continue from its last completed level.
+    max_requests : int, optional
+        Maximum number of requests, by default ``settings.max_shorten_requests``.
+    max_tokens : int, optional
+        Maximum number of prompt tokens sent, by default
+        ``settings.max_shorten_tokens``.
 
     Returns
     -------
     str
         The shortened transcript.
+
+    Raises
+    ------
+    BudgetExceededError
+        If shortening needs more requests or tokens than allowed.
     """
-    num_tokens = _num_tokens_from_messages(
-        _content_to_message(transcript), model="gpt-4o"
-    )
+    index = TokenIndex(_split_turns(transcript), model="gpt-4o")
+    overhead = _prompt_overhead()
+    num_tokens = overhead + index.num_tokens()
     print(
         f"The transcript has {num_tokens} tokens. The limit is {max_prompt_tokens} tokens."
     )
@@ -38,88 +78,219 @@ def _shorten_transcript(
         print("Transcript is short enough, returning as is...")
         return transcript
 
-    chunks = _chunk_transcript(transcript, max_prompt_tokens)
+    if levels is None:
+        levels = []
+    if not levels:
+        levels.append(
+            _chunk_transcript(
+                transcript,
+                max_prompt_tokens,
+                index=index,
+                overlap_tokens=overlap_tokens,
+                shorten_iterations=shorten_iterations,
+            )
+        )
+
+    limiter = _rate_limiter(
+        settings.openai_requests_per_minute, settings.openai_tokens_per_minute
+    )
+    budget = RequestBudget(
+        settings.max_shorten_requests if max_requests is None else max_requests,
+        settings.max_shorten_tokens if max_tokens is None else max_tokens,
+    )
 
-    summarized_chunks = []
-    for chunk in chunks:
+    def summarise(chunk: str) -> str:
         print(f"Summarizing chunk of {len(chunk)} characters...")
-        summarized_chunk = _summarise_chunk(
+        return _summarise_chunk(
             chunk,
             model="gpt-4o",
             temperature=0.0,
             iterations=shorten_iterations,
+            limiter=limiter,
+            budget=budget,
         )
-        summarized_chunks.append(summarized_chunk)
 
-    shortened_transcript = "\n\n".join(summarized_chunks)  # type: ignore
-    num_tokens_shortened = _num_tokens_from_messages(
-        _content_to_message(shortened_transcript), model="gpt-4o"
-    )
-    print(f"The shortened transcript has {num_tokens_shortened} tokens.")
+    chunks = levels[0]
+    while True:
+        if len(levels) > 1:
+            # Summaries are joined as turns are, with a blank line between
+            summaries = levels[-1]
+            merged = TokenIndex(
+                summaries[:1] + [f"\n\n{summary}" for summary in summaries[1:]],
+                model="gpt-4o",
+            )
+            num_tokens = overhead + merged.num_tokens()
+            print(f"Level {len(levels) - 1} of shortening has {num_tokens} tokens.")
+            if num_tokens <= max_prompt_tokens:
+                return merged.text()
 
-    if num_tokens_shortened > max_prompt_tokens:
-        print("Shortened transcript is still too long, reducing chunk size...")
-        return _shorten_transcript(transcript, max_prompt_tokens=max_prompt_tokens)
+            max_chunk_tokens = _max_chunk_tokens(max_prompt_tokens, shorten_iterations)
+            merged = _split_long_pieces(merged, max_chunk_tokens)
+            boundaries = _chunk_boundaries(merged, max_chunk_tokens)
+            chunks = [
+                merged.text(first, last).lstrip("\n") for first, last in boundaries
+            ]
+            print(f"Merging {len(summaries)} summaries into {len(chunks)} chunks...")
 
-    return shortened_transcript
+        # Chunks are independent, so are shortened concurrently
+        levels.append(
+            map_concurrently(
+                summarise, chunks, max_concurrency=settings.openai_max_concurrency
+            )
+        )
 
 
 def _chunk_transcript(
-    transcript: str, max_prompt_tokens: int = settings.max_prompt_tokens
+    transcript: str,
+    max_prompt_tokens: int = settings.max_prompt_tokens,
+    index: Optional[TokenIndex] = None,
+    overlap_tokens: int = 0,
+    shorten_iterations: int = 1,
 ) -> List[str]:
     """Split a transcript into chunks of a given token limit.
 
+    Speaker turns are packed into chunks in a single pass, so chunks only
+    split a speaker turn that does not fit in a chunk on its own, which is
+    split at words. See ``_chunk_boundaries``.
+
     Parameters
     ----------
     transcript : str
         The transcript to split.
     max_prompt_tokens : int, default=settings.max_prompt_tokens
-        The maximum number of tokens allowed for a single chunk of text.
+        The maximum number of tokens in a prompt that shortens a chunk.
+    index : TokenIndex, optional
+        Token index of the speaker turns of the transcript, if already known.
+    overlap_tokens : int, default=0
+        The maximum number of tokens of speaker turns repeated from the end
+        of each chunk at the start of the next chunk.
+    shorten_iterations : int, default=1
+        The number of passes each chunk is shortened in. See
+        ``_max_chunk_tokens``.
 
     Returns
     -------
     List[str]
         The list of chunks.
+
+    Raises
+    ------
+    ChunkTooLongError
+        If a single word does not fit in a chunk.
     """
-    if (
-        _num_tokens_from_messages(_content_to_message(transcript), model="gpt-4o")
-        <= max_prompt_tokens
-    ):
+    if index is None:
+        index = TokenIndex(_split_turns(transcript), model="gpt-4o")
+    max_chunk_tokens = _max_chunk_tokens(max_prompt_tokens, shorten_iterations)
+
+    if index.num_tokens() <= max_chunk_tokens:
         print("Transcript is short enough, returning as is...")
         return [transcript]
 
-    print("Transcript is too long, splitting in half...")
-    transcript_chunks = []
+    index = _split_long_pieces(index, max_chunk_tokens)
+    boundaries = _chunk_boundaries(index, max_chunk_tokens, overlap_tokens)
+    print(f"Transcript is too long, splitting into {len(boundaries)} chunks...")
+    return [index.text(first, last) for first, last in boundaries]
 
-    # Split the transcript into two halves
-    half = len(transcript) // 2
-    transcript_chunks.extend(_chunk_transcript(transcript[:half], max_prompt_tokens))
-    transcript_chunks.extend(_chunk_transcript(transcript[half:], max_prompt_tokens))
 
-    return transcript_chunks
+def _split_long_pieces(index: TokenIndex, max_chunk_tokens: int) -> TokenIndex:
+    """Split the pieces of a text that do not fit in a chunk at words.
 
+    Pieces that fit in a chunk are kept whole. The index is returned as it
+    is if every piece fits.
+    """
+    if not len(index) or index.counts.max() <= max_chunk_tokens:
+        return index
 
-def _summarise_chunk(
-    chunk: str, model: str, temperature: float, iterations: int = 2
-) -> Optional[str]:
-    """Summarise a chunk of text using GPT-4.
+    print("Splitting speaker turns that are too long for a chunk at words...")
+    pieces: List[str] = []
+    for piece, count in zip(index.pieces, index.counts):
+        if count > max_chunk_tokens:
+            pieces.extend(_split_words(piece))
+        else:
+            pieces.append(piece)
+    return TokenIndex(pieces, model="gpt-4o")
+
+
+def _chunk_boundaries(
+    index: TokenIndex, max_chunk_tokens: int, overlap_tokens: int = 0
+) -> List[Tuple[int, int]]:
+    """Pack consecutive pieces of a text into chunks under a token budget.
+
+    Each chunk is extended with as many following pieces as fit in the
+    budget. With an overlap, each chunk starts with the last pieces of the
+    previous chunk, up to ``overlap_tokens`` tokens, as long as the next
+    piece still fits.
 
     Parameters
     ----------
-    chunk : str
-        The chunk of text to summarise.
-    model : str
-        The model to use.
-    temperature : float
-        The temperature to use.
-    iterations : int, default=2
-        The number of iterations to use for shortening each chunk.
+    index : TokenIndex
+        Token index of the pieces, usually speaker turns.
+    max_chunk_tokens : int
+        The maximum number of tokens in a chunk.
+    overlap_tokens : int, default=0
+        The maximum number of tokens repeated between consecutive chunks.
 
     Returns
     -------
-    str
-        The summarised chunk.
+    List[Tuple[int, int]]
+        The index of the first piece of each chunk and one past its last
+        piece.
+
+    Raises
+    ------
+    ChunkTooLongError
+        If a single piece has more than ``max_chunk_tokens`` tokens.
+    """
+    prefix = index.prefix
+    boundaries: List[Tuple[int, int]] = []
+    first = 0
+    while first < len(index):
+        # Last piece such that the chunk fits in the budget
+        last = int(np.searchsorted(prefix, prefix[first] + max_chunk_tokens, "right"))
+        last = min(last - 1, len(index))
+        if last <= first:
+            raise ChunkTooLongError(
+                f"Speaker turn {first} has {index.counts[first]} tokens, "
+                f"more than the chunk limit of {max_chunk_tokens} tokens."
+            )
+        boundaries.append((first, last))
+        if last == len(index):
+            break
+
+        # Repeat pieces from the end of this chunk, leaving room for the next
+        overlap_first = np.searchsorted(prefix, prefix[last] - overlap_tokens, "left")
+        next_fits = np.searchsorted(prefix, prefix[last + 1] - max_chunk_tokens, "left")
+        first = min(max(int(overlap_first), int(next_fits), first + 1), last)
+
+    return boundaries
+
+
+def _prompt_overhead(shorten_iterations: int = 1) -> int:
+    """Return the number of tokens the shortening prompts add to a chunk.
+
+    Recursive passes send the earlier messages again, with the previous
+    reply and the recursive prompt. The replies are not counted.
+    """
+    messages = _shortening_messages("")
+    for _ in range(shorten_iterations - 1):
+        messages.append({"role": "assistant", "content": ""})
+        messages.append({"role": "user", "content": _recursive_shortening_prompt()})
+    return _num_tokens_from_messages(messages, model="gpt-4o")
+
+
+def _max_chunk_tokens(max_prompt_tokens: int, shorten_iterations: int = 1) -> int:
+    """Return the number of tokens of a chunk whose prompts fit the limit.
+
+    Each recursive pass sends the chunk with all previous replies, so the
+    room left by the prompts is shared by the chunk and the replies, which
+    are assumed to be no longer than the chunk.
     """
+    available = max_prompt_tokens - _prompt_overhead(shorten_iterations)
+    return available // max(shorten_iterations, 1)
+
+
+def _shortening_messages(chunk: str) -> List[Dict[str, str]]:
+    """Create the messages of the first shortening pass of a chunk."""
     system_prompt = (
         "You are a meeting assistant. You have excellent language abilities. "
         "You will take a transcript and shorten the transcript without modifying the meaning of the conversation. "
@@ -130,37 +301,98 @@ def _summarise_chunk(
         "make sure every speaker turn is retained in the resulting transcript. "
         "Be sure to retain the interactions between speakers and personal information."
     )
-    first_prompt = (
-        f"Please shorten the following transcript to two-thirds of the original length. "
-        f"You must retain all key information, action points, guidance, dates, numbers, "
-        f"instructions, advice, names, personal information, and business information. \n\n {chunk}"
+    first_prompt = _transcript_prompt(
+        chunk,
+        "Please shorten the above transcript to two-thirds of the original length. "
+        "You must retain all key information, action points, guidance, dates, numbers, "
+        "instructions, advice, names, personal information, and business information.",
     )
-    recursive_prompt = (
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": first_prompt},
+    ]
+
+
+def _recursive_shortening_prompt() -> str:
+    """Create the prompt of the recursive shortening passes."""
+    return (
         "You shortened the transcript too much. "
         "Please reflect on the shortened transcript and determine if it removed any key advice/guidance/instruction "
         "or information from the original transcript. Please rewrite the shortened "
         "transcript to be longer and include the lost content. "
     )
 
+
+def _summarise_chunk(
+    chunk: str,
+    model: str,
+    temperature: float,
+    iterations: int = 2,
+    limiter: Optional[RateLimiter] = None,
+    budget: Optional[RequestBudget] = None,
+) -> str:
+    """Summarise a chunk of text using GPT-4.
+
+    Parameters
+    ----------
+    chunk : str
+        The chunk of text to summarise.
+    model : str
+        The model to use.
+    temperature : float
+        The temperature to use.
+    iterations : int, default=2
+        The number of iterations to use for shortening each chunk.
+    limiter : RateLimiter, optional
+        Rate limiter to wait on before each request.
+    budget : RequestBudget, optional
+        Budget charged with each request.
+
+    Returns
+    -------
+    str
+        The summarised chunk.
+
+    Raises
+    ------
+    ValueError
+        If the model returns an empty summary.
+    """
+    messages = _shortening_messages(chunk)
+
     # First pass
     print("Computing first shortening pass...")
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": first_prompt},
-    ]
-    response = client.chat.completions.create(
-        model=model, temperature=temperature, messages=messages  # type: ignore
+    content, _ = _create_chat_completion(
+        messages,
+        model,
+        temperature,
+        openai_client=client,
+        limiter=limiter,
+        budget=budget,
+        validate=_check_summary,
     )
-    responses = [response.choices[0].message.content]
+    responses = [content]
 
     if iterations > 1:
         for recursive_iter in range(iterations - 1):
             print(f"Computing recursive shortening pass {recursive_iter + 1}...")
             messages.append({"role": "assistant", "content": responses[-1]})  # type: ignore
-            messages.append({"role": "user", "content": recursive_prompt})
-            response = client.chat.completions.create(
-                model=model, temperature=temperature, messages=messages  # type: ignore
+            messages.append({"role": "user", "content": _recursive_shortening_prompt()})
+            content, _ = _create_chat_completion(
+                messages,
+                model,
+                temperature,
+                openai_client=client,
+                limiter=limiter,
+                budget=budget,
+                validate=_check_summary,
             )
-            responses.append(response.choices[0].message.content)
+            responses.append(content)
+
+    return responses[-1]  # type: ignore
+
 
-    return response.choices[0].message.content
+def _check_summary(content: Optional[str]) -> None:
+    """Raise an error if the model returned an empty summary."""
+    if not content or not content.strip():
+        raise ValueError("The model returned an empty summary of a chunk.")
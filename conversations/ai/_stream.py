@@ -0,0 +1,76 @@
+"""Streamed language model responses."""
+
+from typing import Callable, Dict, Iterable, Iterator, Optional
+import time
+
+
+class ResponseStream:
+    """Text of a response, yielded in pieces as it arrives.
+
+    Iterating over the stream sends the request and yields the text deltas
+    of the response. A stream can be iterated over only once. Once the
+    stream is exhausted, the full text, the usage and the timings of the
+    response are available as attributes.
+
+    Parameters
+    ----------
+    deltas : Iterable[str]
+        The text deltas of the response. The request is sent when the first
+        delta is requested.
+    on_complete : Callable[[str], None], optional
+        Called with the full text once the stream is exhausted.
+    clock : Callable[[], float], optional
+        Clock in seconds, by default ``time.perf_counter``.
+
+    Attributes
+    ----------
+    text : str or None
+        The full text, once the stream is exhausted.
+    usage : dict or None
+        The tokens used by the response, if reported.
+    time_to_first_token : float or None
+        Seconds from sending the request to receiving the first text.
+    latency : float or None
+        Seconds from sending the request to receiving the full response.
+    """
+
+    def __init__(
+        self,
+        deltas: Iterable[str],
+        on_complete: Optional[Callable[[str], None]] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        """Initialise the response stream."""
+        self._deltas = deltas
+        self.on_complete = on_complete
+        self._clock = clock
+        self.text: Optional[str] = None
+        self.usage: Optional[Dict[str, int]] = None
+        self.time_to_first_token: Optional[float] = None
+        self.latency: Optional[float] = None
+        self._iterator = self._iterate()
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the text deltas of the response."""
+        return self._iterator
+
+    def read(self) -> str:
+        """Consume the rest of the stream and return the full text."""
+        for _ in self._iterator:
+            pass
+        return self.text  # type: ignore
+
+    def _iterate(self) -> Iterator[str]:
+        start = self._clock()
+        parts = []
+        for delta in self._deltas:
+            if not delta:
+                continue
+            if self.time_to_first_token is None:
+                self.time_to_first_token = self._clock() - start
+            parts.append(delta)
+            yield delta
+        self.latency = self._clock() - start
+        self.text = "".join(parts)
+        if self.on_complete is not None:
+            self.on_complete(self.text)
@@ -0,0 +1,89 @@
+"""Token accounting for transcripts."""
+
+from typing import List, Optional, Sequence
+import re
+
+import numpy as np
+
+from ._chatgpt import _encoding
+
+
+class TokenIndex:
+    """Token counts of consecutive pieces of a text.
+
+    Each piece is tokenized once, and the running total of the token counts
+    is kept so that the number of tokens in any span of pieces is found
+    without tokenizing again.
+
+    Parameters
+    ----------
+    pieces : Sequence[str]
+        Consecutive pieces of a text, such as its speaker turns.
+    model : str, optional
+        The model to use for tokenization, by default "gpt-4o".
+
+    Attributes
+    ----------
+    pieces : list[str]
+        The pieces of text.
+    counts : np.ndarray
+        Number of tokens in each piece.
+    prefix : np.ndarray
+        Running total of the token counts, with one more entry than pieces
+        and starting at zero.
+    """
+
+    __slots__ = ("pieces", "counts", "prefix")
+
+    def __init__(self, pieces: Sequence[str], model: str = "gpt-4o"):
+        """Initialise the token index."""
+        self.pieces = list(pieces)
+        tokens = _encoding(model).encode_ordinary_batch(self.pieces)
+        self.counts = np.fromiter((len(t) for t in tokens), dtype=np.int64)
+        self.prefix = np.zeros(len(self.pieces) + 1, dtype=np.int64)
+        np.cumsum(self.counts, out=self.prefix[1:])
+
+    def __len__(self) -> int:
+        """Return the number of pieces."""
+        return len(self.pieces)
+
+    def num_tokens(self, first: int = 0, last: Optional[int] = None) -> int:
+        """Return the number of tokens in a span of pieces.
+
+        Parameters
+        ----------
+        first : int, optional
+            Index of the first piece, by default 0.
+        last : int, optional
+            Index one past the last piece, by default the end of the text.
+
+        Returns
+        -------
+        int
+            The number of tokens in the pieces.
+        """
+        if last is None:
+            last = len(self)
+        return int(self.prefix[last] - self.prefix[first])
+
+    def text(self, first: int = 0, last: Optional[int] = None) -> str:
+        """Return the text of a span of pieces."""
+        return "".join(self.pieces[first:last])
+
+
+def _split_turns(transcript: str) -> List[str]:
+    """Split an exported transcript into speaker turns.
+
+    Each turn starts with the blank line that precedes it, so joining the
+    turns gives back the transcript. A transcript without speaker turns is
+    split into words instead.
+    """
+    turns = [turn for turn in re.split(r"(?=\n\n)", transcript) if turn]
+    if len(turns) > 1:
+        return turns
+    return _split_words(transcript)
+
+
+def _split_words(text: str) -> List[str]:
+    """Split a text into words, each with the whitespace that precedes it."""
+    return [word for word in re.split(r"(?<=\S)(?=\s)", text) if word]
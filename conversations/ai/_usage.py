@@ -0,0 +1,79 @@
+"""Accounting of the tokens used by language model requests."""
+
+from threading import Lock
+from typing import Dict
+
+
+class UsageStats:
+    """Running totals of the tokens used by language model requests.
+
+    Prompt tokens that the provider read from its prompt cache are counted
+    separately, so the benefit of prompts that share a prefix can be checked.
+    The totals are thread safe and may be updated by concurrent requests.
+
+    Attributes
+    ----------
+    requests : int
+        Number of requests sent to the API.
+    cached_responses : int
+        Number of requests served from the local response cache.
+    prompt_tokens : int
+        Number of prompt tokens, including cached prompt tokens.
+    cached_prompt_tokens : int
+        Number of prompt tokens read from the provider's prompt cache.
+    completion_tokens : int
+        Number of completion tokens.
+    """
+
+    def __init__(self):
+        """Initialise the totals at zero."""
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Set all totals to zero."""
+        with self._lock:
+            self.requests = 0
+            self.cached_responses = 0
+            self.prompt_tokens = 0
+            self.cached_prompt_tokens = 0
+            self.completion_tokens = 0
+
+    @property
+    def uncached_prompt_tokens(self) -> int:
+        """Number of prompt tokens that were not read from the prompt cache."""
+        return self.prompt_tokens - self.cached_prompt_tokens
+
+    def record(self, usage: Dict[str, int]) -> None:
+        """Add the usage of a request sent to the API."""
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += usage["prompt_tokens"]
+            self.cached_prompt_tokens += usage["cached_prompt_tokens"]
+            self.completion_tokens += usage["completion_tokens"]
+
+    def record_cached_response(self) -> None:
+        """Count a request served from the local response cache."""
+        with self._lock:
+            self.cached_responses += 1
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return the totals as a dictionary."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "cached_responses": self.cached_responses,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_prompt_tokens": self.cached_prompt_tokens,
+                "uncached_prompt_tokens": self.uncached_prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+            }
+
+    def __repr__(self) -> str:
+        """Return the totals as a string."""
+        totals = ", ".join(f"{key}={value}" for key, value in self.as_dict().items())
+        return f"UsageStats({totals})"
+
+
+usage_stats = UsageStats()
+"""Token usage of all requests made by this package."""
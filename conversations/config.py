@@ -1,5 +1,8 @@
 """Configuration settings for the conversations package."""
 
+from pathlib import Path
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -10,6 +13,36 @@ class OpenAISettings(BaseSettings):
     openai_text_model: str = "gpt-4.1-mini"
     max_prompt_tokens: int = 900000
     """Max tokens for AI processing chunks and final transcript target."""
+    openai_max_upload_bytes: int = 25 * 1024 * 1024
+    """Largest audio file accepted by the OpenAI transcription endpoint."""
+    openai_max_concurrency: int = 4
+    """Maximum number of concurrent requests to the OpenAI API."""
+    openai_requests_per_minute: int = 500
+    """Requests per minute allowed by your OpenAI rate limits."""
+    openai_tokens_per_minute: int = 1_000_000
+    """Prompt tokens per minute allowed by your OpenAI rate limits."""
+    max_shorten_requests: int = 200
+    """Maximum number of requests made to shorten a single transcript."""
+    max_shorten_tokens: int = 20_000_000
+    """Maximum number of prompt tokens sent to shorten a single transcript."""
+
+
+class CacheSettings(BaseSettings):
+    """Settings for the local caches used during processing."""
+
+    whisper_model_cache_max_bytes: int = 4_000_000_000
+    """Memory ceiling for local Whisper models kept loaded in the process."""
+    cache_dir: Path = Path.home() / ".cache" / "conversations"
+    """Directory holding the on-disk caches."""
+    transcription_cache_max_bytes: int = 1_000_000_000
+    """Size limit of the transcription result cache."""
+    response_cache_enabled: bool = True
+    """Whether language model responses are cached."""
+    response_cache_max_bytes: int = 100_000_000
+    """Size limit of the language model response cache."""
+    response_cache_ttl_seconds: Optional[float] = 30 * 24 * 60 * 60
+    """Time after which cached responses expire, or None to keep them."""
 
 
 settings = OpenAISettings()
+cache_settings = CacheSettings()
@@ -1,3 +1,3 @@
 """Use simple-diarizer for diarisation."""
 
-from ._simple import process
+from ._simple import process, preload_diarizer, evict_diarizer
@@ -1,9 +1,20 @@
 from pathlib import Path
 from simple_diarizer import diarizer
-from typing import Any, Dict, List, Optional
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
 
+from conversations._audio import decoded_audio_file
 
-def process(audio_file: Path, num_speakers: int = 2) -> List[Dict[str, Any]]:
+_diarizers: Dict[Tuple[str, str], Any] = {}
+_diarizers_lock = Lock()
+
+
+def process(
+    audio_file: Path,
+    num_speakers: int = 2,
+    embed_model: str = "xvec",
+    cluster_method: str = "sc",
+) -> List[Dict[str, Any]]:
     """Diarise audio using simple_diarizer.
 
     Parameters
@@ -12,17 +23,75 @@ def process(audio_file: Path, num_speakers: int = 2) -> List[Dict[str, Any]]:
         Path to the audio file.
     num_speakers : int
         The number of speakers in the conversation.
+    embed_model : str
+        The speaker embedding model, either "xvec" or "ecapa".
+    cluster_method : str
+        The clustering method, either "sc" or "ahc".
 
     Returns
     -------
     segments : list[dict]
         List containing the segments as dictionaries.
+
+    Notes
+    -----
+    The diariser reads the 16 kHz mono decoded audio shared with local
+    transcription, so the recording is only decoded once. Diarisers are
+    kept in a process-wide cache, so the embedding model is only loaded
+    the first time a combination of settings is used.
     """
-    diar = diarizer.Diarizer(
-        embed_model="xvec",  # 'xvec' and 'ecapa' supported
-        cluster_method="sc",  # 'ahc' and 'sc' supported
-    )
+    diar = _get_diarizer(embed_model, cluster_method)
 
-    segments = diar.diarize(audio_file, num_speakers=num_speakers)
+    segments = diar.diarize(
+        str(decoded_audio_file(audio_file)), num_speakers=num_speakers
+    )
 
     return segments
+
+
+def preload_diarizer(embed_model: str = "xvec", cluster_method: str = "sc") -> None:
+    """Create a diariser and load its embedding model ahead of use.
+
+    Parameters
+    ----------
+    embed_model : str
+        The speaker embedding model, either "xvec" or "ecapa".
+    cluster_method : str
+        The clustering method, either "sc" or "ahc".
+    """
+    _get_diarizer(embed_model, cluster_method)
+
+
+def evict_diarizer(
+    embed_model: Optional[str] = None, cluster_method: Optional[str] = None
+) -> None:
+    """Remove diarisers from the process-wide cache, releasing their models.
+
+    Parameters
+    ----------
+    embed_model : str, optional
+        Embedding model of the diarisers to remove. If None, diarisers with
+        any embedding model are removed.
+    cluster_method : str, optional
+        Clustering method of the diarisers to remove. If None, diarisers with
+        any clustering method are removed.
+    """
+    with _diarizers_lock:
+        for key in list(_diarizers):
+            if embed_model is not None and key[0] != embed_model:
+                continue
+            if cluster_method is not None and key[1] != cluster_method:
+                continue
+            del _diarizers[key]
+
+
+def _get_diarizer(embed_model: str, cluster_method: str) -> Any:
+    """Return a cached diariser, creating it if needed."""
+    key = (embed_model, cluster_method)
+    with _diarizers_lock:
+        if key not in _diarizers:
+            _diarizers[key] = diarizer.Diarizer(
+                embed_model=embed_model,  # 'xvec' and 'ecapa' supported
+                cluster_method=cluster_method,  # 'ahc' and 'sc' supported
+            )
+        return _diarizers[key]
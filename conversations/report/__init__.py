@@ -1,4 +1,6 @@
 """Report generation for conversations."""
 
 from ._report import generate
-from ._text import export_text
+from ._html import iter_html, write_html
+from ._text import export_text, iter_text, write_text
+from ._virtual import iter_virtual_html, write_virtual_html
@@ -0,0 +1,159 @@
+"""Render conversation reports as HTML without building a document tree."""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+import html
+
+from ._report import style, test
+from ._utils import (
+    _get_segement_speaker,
+    _iter_grouped_segments,
+    _iter_segments,
+)
+
+_HEAD = f"""<!DOCTYPE html>
+<html>
+  <head>
+    <title>Conversation</title>
+    <script src="https://cdn.tailwindcss.com"></script>
+    <style>{style}</style>
+  </head>
+  <body>
+    <div class="ml-12 mr-12 mt-6">
+"""
+
+_AUDIO = """      <div class="audio-container">
+        <audio class="w-full border" controls="controls" id="audio">
+          <source src="{src}" type="audio/wav">
+        </audio>
+      </div>
+      <script>{script}</script>
+"""
+
+_SPEAKER = (
+    '          <input class="border m-1 bg-blue-50 mb-2 mt-4 p-1 pl-2 pr-2" '
+    'onclick="play({start})" type="button" value="{speaker}">\n'
+)
+
+_SEGMENT = """        <p class="mr-2 m-1 flex">
+{speaker}          <p class="ml-8 mr-8 m-1" onclick="play({start})">{text}</p>
+        </p>
+"""
+
+_TAIL = """      </div>
+    </div>
+  </body>
+</html>"""
+
+
+def iter_html(
+    transcript: dict,
+    diarisation: Optional[List[Dict[str, Any]]] = None,
+    audio_file: Optional[Path] = None,
+    speaker_mapping: Optional[dict] = None,
+    alignment: str = "midpoint",
+) -> Iterator[str]:
+    """Generate the html page of a conversation in chunks.
+
+    Joining the chunks gives the same html as rendering the document created
+    by ``generate``, but segments are formatted one at a time from string
+    templates instead of building a document tree.
+
+    Parameters
+    ----------
+    transcript : dict | SegmentTable
+        Transcript from transcribe module.
+    diarisation : dict
+        Speaker diarisation from from diarisation module.
+    audio_file : PosixPath | None
+        Path to audio file. If provided, audio will be embedded in the
+        report and timestamps will link to audio times.
+    speaker_mapping : dict
+        Mapping of old speaker names to new speaker names.
+        For example, {"0": "Alice", "1": "Bob"}.
+    alignment : str
+        How transcript segments are assigned to diarised speakers, either
+        "midpoint" or "overlap".
+
+    Yields
+    ------
+    str
+        Consecutive chunks of the html page.
+    """
+    segments: Iterable[dict] = _iter_segments(transcript)
+    if diarisation is not None:
+        segments = _iter_grouped_segments(transcript, diarisation, alignment=alignment)
+
+    if speaker_mapping is None:
+        speaker_mapping = {}
+
+    yield _HEAD
+    if audio_file is not None:
+        yield _AUDIO.format(src=_escape(str(audio_file)), script=test)
+    yield '      <div class="pt-2" id="conversation">\n'
+
+    previous_speaker = None
+    for seg in segments:
+        start = _escape(str(seg["start"]))
+        speaker = _get_segement_speaker(seg, speaker_mapping)
+
+        speaker_button = ""
+        if diarisation is not None and speaker != previous_speaker:
+            speaker_button = _SPEAKER.format(start=start, speaker=_escape(f"{speaker}"))
+            previous_speaker = speaker
+
+        yield _SEGMENT.format(
+            speaker=speaker_button,
+            start=start,
+            text=_escape(f"{seg['text']}"),
+        )
+
+    yield _TAIL
+
+
+def write_html(
+    file: Union[str, Path, TextIO],
+    transcript: dict,
+    diarisation: Optional[List[Dict[str, Any]]] = None,
+    audio_file: Optional[Path] = None,
+    speaker_mapping: Optional[dict] = None,
+    alignment: str = "midpoint",
+) -> None:
+    """Write the html page of a conversation to a file.
+
+    The page is generated by ``iter_html`` and written as it is generated.
+
+    Parameters
+    ----------
+    file : str | Path | TextIO
+        Path of the html file, or a file-like object opened for writing text.
+    transcript : dict | SegmentTable
+        Transcript from transcribe module.
+    diarisation : dict
+        Speaker diarisation from from diarisation module.
+    audio_file : PosixPath | None
+        Path to audio file to embed in the report.
+    speaker_mapping : dict
+        Mapping of old speaker names to new speaker names.
+    alignment : str
+        How transcript segments are assigned to diarised speakers, either
+        "midpoint" or "overlap".
+    """
+    chunks = iter_html(
+        transcript,
+        diarisation=diarisation,
+        audio_file=audio_file,
+        speaker_mapping=speaker_mapping,
+        alignment=alignment,
+    )
+
+    if isinstance(file, (str, Path)):
+        with open(file, "w") as f:
+            f.writelines(chunks)
+    else:
+        file.writelines(chunks)
+
+
+def _escape(text: str) -> str:
+    """Escape text for html, in the same way as dominate."""
+    return html.escape(text, quote=False).replace('"', "&quot;")
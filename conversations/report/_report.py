@@ -2,9 +2,9 @@ import dominate
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from ._utils import (
-    _map_speaker_names,
     _get_segement_speaker,
     _group_transcript_segements_by_speaker,
+    _iter_segments,
 )
 
 
@@ -14,18 +14,29 @@ audio.currentTime = t;
 audio.play();
 }"""
 
+style = """
+            .audio-container {
+                position: sticky;
+                top: 0;
+                background: white;
+                z-index: 100;
+                padding: 1rem 0;
+            }
+        """
+
 
 def generate(
     transcript: dict,
     diarisation: Optional[List[Dict[str, Any]]] = None,
     audio_file: Optional[Path] = None,
     speaker_mapping: Optional[dict] = None,
+    alignment: str = "midpoint",
 ):
     """Create html page from conversation.
 
     Parameters
     ----------
-    transcript : dict
+    transcript : dict | SegmentTable
         Transcript from transcribe module.
     diarisation : dict
         Speaker diarisation from from diarisation module.
@@ -35,6 +46,10 @@ def generate(
     speaker_mapping : dict
         Mapping of old speaker names to new speaker names.
         For example, {"0": "Alice", "1": "Bob"}.
+    alignment : str
+        How transcript segments are assigned to diarised speakers. Either
+        "midpoint", the speaker at the middle of each segment, or "overlap",
+        the speaker overlapping each segment the most.
 
     Returns
     -------
@@ -42,11 +57,11 @@ def generate(
         Conversation report as a dominate document.
     """
     if diarisation is not None:
-        transcript = _group_transcript_segements_by_speaker(transcript, diarisation)
+        transcript = _group_transcript_segements_by_speaker(
+            transcript, diarisation, alignment=alignment
+        )
 
-    if speaker_mapping is not None:
-        transcript = _map_speaker_names(transcript, speaker_mapping)
-    else:
+    if speaker_mapping is None:
         speaker_mapping = {}
 
     doc = dominate.document(title="Conversation")
@@ -54,17 +69,7 @@ def generate(
     with doc.head:
         dominate.tags.script(src="https://cdn.tailwindcss.com")
         # Add custom styles for sticky audio controls
-        dominate.tags.style(
-            """
-            .audio-container {
-                position: sticky;
-                top: 0;
-                background: white;
-                z-index: 100;
-                padding: 1rem 0;
-            }
-        """
-        )
+        dominate.tags.style(style)
 
     with doc:
         with dominate.tags.div(cls="ml-12 mr-12 mt-6"):
@@ -79,7 +84,7 @@ def generate(
 
             with dominate.tags.div(id="conversation", cls="pt-2"):
                 previous_speaker = None
-                for seg in transcript["segments"]:
+                for seg in _iter_segments(transcript):
                     start = seg["start"]
                     stop = seg["end"]
                     speaker = _get_segement_speaker(seg, speaker_mapping)
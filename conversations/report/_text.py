@@ -1,8 +1,9 @@
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Union
 from ._utils import (
-    _map_speaker_names,
     _get_segement_speaker,
-    _group_transcript_segements_by_speaker,
+    _iter_grouped_segments,
+    _iter_segments,
 )
 
 
@@ -12,6 +13,7 @@ def export_text(
     speaker_mapping: Optional[dict] = None,
     datetimestr: Optional[str] = None,
     attendees: Optional[List[str]] = None,
+    alignment: str = "midpoint",
 ):
     """Create text file from conversation.
 
@@ -20,9 +22,10 @@ def export_text(
 
     Parameters
     ----------
-    transcript : Dict[str, Any]
+    transcript : Dict[str, Any] | SegmentTable
         The transcript data structured as a dictionary with a key "segments" containing a list of dicts.
         Each dict has a "text" key with the corresponding transcript segment text and optionally a "speaker" key.
+        A ``SegmentTable`` may be given instead.
     diarisation : Optional[List[Dict[str, Any]]], default=None
         A list of diarisation data dictionaries. Each dictionary should have the keys "start", "end", and "speaker".
     speaker_mapping : Optional[Dict[str, str]], default=None
@@ -32,6 +35,9 @@ def export_text(
         A string representing the date and time of the meeting.
     attendees : Optional[List[str]], default=None
         A list of attendees in the meeting.
+    alignment : str, default="midpoint"
+        How transcript segments are assigned to diarised speakers, either
+        ``"midpoint"`` or ``"overlap"``.
 
     Returns
     -------
@@ -46,32 +52,122 @@ def export_text(
     >>> export_text(transcript, diarisation, speaker_mapping)
     'John: Hello, world!'
     """
-    if diarisation is not None:
-        transcript = _group_transcript_segements_by_speaker(transcript, diarisation)
+    text = "".join(
+        iter_text(
+            transcript,
+            diarisation=diarisation,
+            speaker_mapping=speaker_mapping,
+            datetimestr=datetimestr,
+            attendees=attendees,
+            alignment=alignment,
+        )
+    )
+    print("\n\n")
+
+    return text
+
+
+def write_text(
+    file: Union[str, Path, TextIO],
+    transcript: dict,
+    diarisation: Optional[List[Dict[str, Any]]] = None,
+    speaker_mapping: Optional[dict] = None,
+    datetimestr: Optional[str] = None,
+    attendees: Optional[List[str]] = None,
+    alignment: str = "midpoint",
+) -> None:
+    """Write the conversation as text to a file.
+
+    The text is identical to that returned by ``export_text``, but is written
+    as it is generated rather than being built in memory first.
+
+    Parameters
+    ----------
+    file : str | Path | TextIO
+        Path of the text file, or a file-like object opened for writing text.
+    transcript : Dict[str, Any] | SegmentTable
+        The transcript data, as for ``export_text``.
+    diarisation : Optional[List[Dict[str, Any]]], default=None
+        A list of diarisation data dictionaries.
+    speaker_mapping : Optional[Dict[str, str]], default=None
+        A dictionary that maps speaker identifiers to speaker names.
+    datetimestr : Optional[str], default=None
+        A string representing the date and time of the meeting.
+    attendees : Optional[List[str]], default=None
+        A list of attendees in the meeting.
+    alignment : str, default="midpoint"
+        How transcript segments are assigned to diarised speakers, either
+        ``"midpoint"`` or ``"overlap"``.
+    """
+    chunks = iter_text(
+        transcript,
+        diarisation=diarisation,
+        speaker_mapping=speaker_mapping,
+        datetimestr=datetimestr,
+        attendees=attendees,
+        alignment=alignment,
+    )
 
-    if speaker_mapping is not None:
-        transcript = _map_speaker_names(transcript, speaker_mapping)
+    if isinstance(file, (str, Path)):
+        with open(file, "w") as f:
+            f.writelines(chunks)
     else:
-        speaker_mapping = {}
+        file.writelines(chunks)
 
-    doc = ""
 
-    previous_speaker = None
+def iter_text(
+    transcript: dict,
+    diarisation: Optional[List[Dict[str, Any]]] = None,
+    speaker_mapping: Optional[dict] = None,
+    datetimestr: Optional[str] = None,
+    attendees: Optional[List[str]] = None,
+    alignment: str = "midpoint",
+) -> Iterator[str]:
+    """Generate the text of a conversation in chunks.
+
+    Joining the chunks gives the text returned by ``export_text``. Segments
+    are grouped and mapped to speaker names one at a time, so the whole
+    document is never held in memory.
+
+    Parameters
+    ----------
+    transcript : Dict[str, Any] | SegmentTable
+        The transcript data, as for ``export_text``.
+    diarisation : Optional[List[Dict[str, Any]]], default=None
+        A list of diarisation data dictionaries.
+    speaker_mapping : Optional[Dict[str, str]], default=None
+        A dictionary that maps speaker identifiers to speaker names.
+    datetimestr : Optional[str], default=None
+        A string representing the date and time of the meeting.
+    attendees : Optional[List[str]], default=None
+        A list of attendees in the meeting.
+    alignment : str, default="midpoint"
+        How transcript segments are assigned to diarised speakers, either
+        ``"midpoint"`` or ``"overlap"``.
+
+    Yields
+    ------
+    str
+        Consecutive chunks of the text document.
+    """
+    segments: Iterable[dict] = _iter_segments(transcript)
+    if diarisation is not None:
+        segments = _iter_grouped_segments(transcript, diarisation, alignment=alignment)
+
+    if speaker_mapping is None:
+        speaker_mapping = {}
 
     if datetimestr is not None:
-        doc += "Meeting Transcript from " + datetimestr
+        yield "Meeting Transcript from " + datetimestr
     if attendees is not None:
-        doc += " with " + ", ".join(attendees)
-    print("\n\n")
+        yield " with " + ", ".join(attendees)
 
-    for seg in transcript["segments"]:
+    previous_speaker = None
+    for seg in segments:
         speaker = _get_segement_speaker(seg, speaker_mapping)
 
-        if diarisation is not None:
-            if speaker != previous_speaker:
-                doc += f"\n\n{speaker}:"
-                previous_speaker = speaker
-
-        doc += f" {seg['text']}"
-
-    return doc
+        if diarisation is not None and speaker != previous_speaker:
+            previous_speaker = speaker
+            yield f"\n\n{speaker}: {seg['text']}"
+        else:
+            yield f" {seg['text']}"
@@ -1,34 +1,23 @@
-import numpy as np
-
-
-def _map_speaker_names(transcript: dict, speaker_mapping: dict) -> dict:
-    """Map old speaker names to new speaker names in transcript.
+from typing import Dict, Iterator, List
 
-    Parameters
-    ----------
-    transcript : dict
-        Transcript from transcribe module.
-    speaker_mapping : dict
-        Mapping of old speaker names to new speaker names.
+import numpy as np
 
-    Returns
-    -------
-    mapped_transcript : dict
-        Transcript with updated speaker names.
-    """
-    mapped_segments = []
+from conversations._segments import SegmentTable
 
-    for seg in transcript["segments"]:
-        mapped_seg = seg.copy()
-        if "speaker" in seg and seg["speaker"] in speaker_mapping:
-            mapped_seg["speaker"] = speaker_mapping[seg["speaker"]]
-        mapped_segments.append(mapped_seg)
 
-    return {"segments": mapped_segments}
+def _iter_segments(transcript) -> Iterator[dict]:
+    """Iterate over the segments of a transcript or segment table."""
+    if isinstance(transcript, SegmentTable):
+        return iter(transcript)
+    return iter(transcript["segments"])
 
 
 def _get_segement_speaker(segment, speaker_mapping: dict) -> str:
-    """Get speaker label from segment."""
+    """Get speaker label from segment.
+
+    The speaker mapping is applied here, when the segment is rendered, so
+    that remapping speakers does not copy any segments.
+    """
     if "speaker" in segment:
         speaker_name = segment["speaker"]
         if speaker_name in speaker_mapping:
@@ -57,46 +46,159 @@ def _find_current_speaker(timeval, diarisation) -> str:
     return str(diarisation[-1]["label"])
 
 
+def _find_current_speakers(timevals, diarisation) -> List[str]:
+    """Find the speaker labels associated with many times at once.
+
+    Gives the same labels as calling ``_find_current_speaker`` for each time,
+    using a binary search over the sorted diarisation start times.
+    """
+    starts = np.array([seg["start"] for seg in diarisation], dtype=float)
+    labels = [str(seg["label"]) for seg in diarisation]
+    timevals = np.asarray(timevals, dtype=float)
+
+    if np.any(np.diff(starts) < 0):
+        # Binary search needs sorted start times
+        return [_find_current_speaker(t, diarisation) for t in timevals]
+
+    last = len(starts) - 1
+    # Index of the last diarisation segment starting before each time
+    idx = np.searchsorted(starts, timevals, side="left") - 1
+    found = (idx >= 0) & (idx < last)
+    found &= starts[np.clip(idx + 1, 0, last)] > timevals
+    idx = np.where(found, idx, last)
+
+    return [labels[i] for i in idx]
+
+
+def _find_overlapping_speakers(seg_starts, seg_ends, diarisation) -> List[str]:
+    """Find the speaker with the most overlap with each time interval.
+
+    Intervals that do not overlap any diarisation segment are assigned
+    the speaker at their midpoint, as by ``_find_current_speakers``.
+    """
+    seg_starts = np.asarray(seg_starts, dtype=float)
+    seg_ends = np.asarray(seg_ends, dtype=float)
+    order = np.argsort([seg["start"] for seg in diarisation], kind="stable")
+    starts = np.array([diarisation[i]["start"] for i in order], dtype=float)
+    ends = np.array([diarisation[i]["end"] for i in order], dtype=float)
+    labels = [str(diarisation[i]["label"]) for i in order]
+
+    speakers = _find_current_speakers(
+        seg_starts + (seg_ends - seg_starts) / 2, diarisation
+    )
+
+    # Only diarisation segments starting before an interval ends can overlap it
+    last_candidates = np.searchsorted(starts, seg_ends, side="left")
+    max_ends = np.maximum.accumulate(ends) if len(ends) else ends
+    first_candidates = np.searchsorted(max_ends, seg_starts, side="right")
+
+    for seg_idx, (first, last) in enumerate(zip(first_candidates, last_candidates)):
+        overlaps: Dict[str, float] = {}
+        for i in range(first, last):
+            overlap = min(ends[i], seg_ends[seg_idx]) - max(
+                starts[i], seg_starts[seg_idx]
+            )
+            if overlap > 0:
+                overlaps[labels[i]] = overlaps.get(labels[i], 0.0) + overlap
+        if overlaps:
+            speakers[seg_idx] = max(overlaps, key=overlaps.__getitem__)
+
+    return speakers
+
+
 def _group_transcript_segements_by_speaker(
-    transcript, diarization, seconds_per_segment=20
+    transcript, diarization, seconds_per_segment=20, alignment="midpoint"
 ):
-    """Group transcript segments by speaker."""
-    if "speaker" in transcript["segments"][0]:
+    """Group transcript segments by speaker.
+
+    Parameters
+    ----------
+    transcript : dict | SegmentTable
+        Transcript from transcribe module.
+    diarization : list[dict]
+        Speaker diarisation from diarisation module.
+    seconds_per_segment : float
+        Maximum duration of a grouped segment.
+    alignment : str
+        How transcript segments are assigned to speakers. ``"midpoint"``
+        assigns the speaker at the middle of each segment and ``"overlap"``
+        assigns the speaker that overlaps the segment the most.
+
+    Returns
+    -------
+    grouped_transcript : dict | SegmentTable
+        Transcript with consecutive segments of each speaker grouped together.
+    """
+    if _has_speakers(transcript):
         # Already grouped by speaker
         return transcript
 
+    return {
+        "segments": list(
+            _iter_grouped_segments(
+                transcript, diarization, seconds_per_segment, alignment
+            )
+        )
+    }
+
+
+def _iter_grouped_segments(
+    transcript, diarization, seconds_per_segment=20, alignment="midpoint"
+) -> Iterator[dict]:
+    """Lazily group transcript segments by speaker.
+
+    Yields the segments of ``_group_transcript_segements_by_speaker`` one at
+    a time, so that only the group being built is held in memory.
+    """
+    if _has_speakers(transcript):
+        # Already grouped by speaker
+        yield from _iter_segments(transcript)
+        return
+
+    if isinstance(transcript, SegmentTable):
+        starts = transcript.start
+        stops = transcript.end
+    else:
+        starts = np.array([seg["start"] for seg in transcript["segments"]], dtype=float)
+        stops = np.array([seg["end"] for seg in transcript["segments"]], dtype=float)
+
+    if alignment == "midpoint":
+        speakers = _find_current_speakers(starts + ((stops - starts) / 2), diarization)
+    elif alignment == "overlap":
+        speakers = _find_overlapping_speakers(starts, stops, diarization)
     else:
-        speaker_segments = []
-        current_speaker = ""
-        for seg in transcript["segments"]:
-            start = seg["start"]
-            stop = seg["end"]
-            mid_time = start + ((stop - start) / 2)
-
-            speaker = _find_current_speaker(mid_time, diarization)
-
-            if speaker != current_speaker:
-                current_speaker = speaker
-                speaker_segments.append(
-                    {
-                        "speaker": speaker,
-                        "text": seg["text"],
-                        "start": start,
-                        "end": stop,
-                    }
-                )
-            else:
-                if stop - speaker_segments[-1]["start"] > seconds_per_segment:
-                    speaker_segments.append(
-                        {
-                            "speaker": speaker,
-                            "text": seg["text"],
-                            "start": start,
-                            "end": stop,
-                        }
-                    )
-                else:
-                    speaker_segments[-1]["text"] += " " + seg["text"]
-                    speaker_segments[-1]["end"] = stop
-
-        return {"segments": speaker_segments}
+        raise ValueError(
+            f"alignment must be 'midpoint' or 'overlap'. Received {alignment}."
+        )
+
+    group = None
+    for seg, speaker in zip(_iter_segments(transcript), speakers):
+        start = seg["start"]
+        stop = seg["end"]
+
+        if (
+            group is None
+            or speaker != group["speaker"]
+            or stop - group["start"] > seconds_per_segment
+        ):
+            if group is not None:
+                yield group
+            group = {
+                "speaker": speaker,
+                "text": seg["text"],
+                "start": start,
+                "end": stop,
+            }
+        else:
+            group["text"] += " " + seg["text"]
+            group["end"] = stop
+
+    if group is not None:
+        yield group
+
+
+def _has_speakers(transcript) -> bool:
+    """Check if transcript segments are already labelled with speakers."""
+    if isinstance(transcript, SegmentTable):
+        return transcript.has_speakers()
+    return "speaker" in transcript["segments"][0]
@@ -0,0 +1,399 @@
+"""Render long conversations as a data-driven html page with virtual scrolling."""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+import json
+import os
+
+from ._html import _escape
+from ._report import style
+from ._utils import (
+    _iter_grouped_segments,
+    _iter_segments,
+)
+
+_HEAD = f"""<!DOCTYPE html>
+<html>
+  <head>
+    <meta charset="utf-8">
+    <title>Conversation</title>
+    <script src="https://cdn.tailwindcss.com"></script>
+    <style>{style}</style>
+  </head>
+  <body>
+    <div class="ml-12 mr-12 mt-6">
+      <div class="audio-container">
+"""
+
+_AUDIO = """        <audio class="w-full border" controls="controls" id="audio">
+          <source src="{src}" type="audio/wav">
+        </audio>
+"""
+
+_SEARCH = """        <div class="flex mt-2">
+          <input class="border p-1 pl-2 pr-2 flex-grow" id="search" placeholder="Search" type="search">
+          <input class="border ml-1 p-1 pl-2 pr-2" id="search-prev" type="button" value="&uarr;">
+          <input class="border ml-1 p-1 pl-2 pr-2" id="search-next" type="button" value="&darr;">
+          <span class="ml-2 p-1" id="search-count"></span>
+        </div>
+      </div>
+      <div class="pt-2" id="conversation"></div>
+    </div>
+"""
+
+_TAIL = """    <script>{script}</script>
+  </body>
+</html>"""
+
+# Segments are rendered in blocks, and only blocks near the visible part of
+# the page are kept in the document. Blocks that have not been rendered yet
+# take an estimated height, and blocks that are removed keep their height.
+_VIEWER = """
+(function () {
+  var data = window.conversationData ||
+    JSON.parse(document.getElementById("conversation-data").textContent);
+  var BLOCK_SIZE = 100;
+  var ROW_HEIGHT = 40;
+  var n = data.start.length;
+  var container = document.getElementById("conversation");
+  var search = document.getElementById("search");
+  var searchCount = document.getElementById("search-count");
+  var lowerText = null;
+  var query = "";
+  var matches = [];
+  var current = -1;
+  var blocks = [];
+
+  function seek(t) {
+    var audio = document.getElementById("audio");
+    if (audio) {
+      audio.currentTime = t;
+      audio.play();
+    }
+  }
+
+  function appendText(parent, text) {
+    if (!query) {
+      parent.textContent = text;
+      return;
+    }
+    var lower = text.toLowerCase();
+    var pos = 0;
+    var idx;
+    while ((idx = lower.indexOf(query, pos)) !== -1) {
+      parent.appendChild(document.createTextNode(text.slice(pos, idx)));
+      var mark = document.createElement("mark");
+      mark.textContent = text.slice(idx, idx + query.length);
+      parent.appendChild(mark);
+      pos = idx + query.length;
+    }
+    parent.appendChild(document.createTextNode(text.slice(pos)));
+  }
+
+  function renderSegment(i) {
+    var row = document.createElement("div");
+    row.className = "mr-2 m-1 flex";
+    row.dataset.index = i;
+    if (data.headers && (i === 0 || data.speaker[i] !== data.speaker[i - 1])) {
+      var button = document.createElement("input");
+      button.type = "button";
+      button.value = data.speakers[data.speaker[i]];
+      button.className = "border m-1 bg-blue-50 mb-2 mt-4 p-1 pl-2 pr-2";
+      row.appendChild(button);
+    }
+    var text = document.createElement("p");
+    text.className = "ml-8 mr-8 m-1";
+    if (current !== -1 && matches[current] === i) {
+      text.className += " bg-yellow-100";
+    }
+    appendText(text, data.text[i]);
+    row.appendChild(text);
+    return row;
+  }
+
+  function fill(block) {
+    if (block.childElementCount) {
+      return;
+    }
+    var first = Number(block.dataset.block) * BLOCK_SIZE;
+    var last = Math.min(n, first + BLOCK_SIZE);
+    var fragment = document.createDocumentFragment();
+    for (var i = first; i < last; i++) {
+      fragment.appendChild(renderSegment(i));
+    }
+    block.appendChild(fragment);
+    block.style.minHeight = "";
+  }
+
+  function empty(block) {
+    if (!block.childElementCount) {
+      return;
+    }
+    block.style.minHeight = block.offsetHeight + "px";
+    block.textContent = "";
+  }
+
+  function refresh(block) {
+    if (block.childElementCount) {
+      block.textContent = "";
+      fill(block);
+    }
+  }
+
+  var observer = new IntersectionObserver(function (entries) {
+    entries.forEach(function (entry) {
+      if (entry.isIntersecting) {
+        fill(entry.target);
+      } else {
+        empty(entry.target);
+      }
+    });
+  }, {rootMargin: "1500px 0px"});
+
+  for (var first = 0; first < n; first += BLOCK_SIZE) {
+    var block = document.createElement("div");
+    block.dataset.block = blocks.length;
+    block.style.minHeight = Math.min(BLOCK_SIZE, n - first) * ROW_HEIGHT + "px";
+    container.appendChild(block);
+    observer.observe(block);
+    blocks.push(block);
+  }
+
+  container.addEventListener("click", function (event) {
+    var row = event.target.closest("[data-index]");
+    if (row) {
+      seek(data.start[Number(row.dataset.index)]);
+    }
+  });
+
+  function updateCount() {
+    if (!query) {
+      searchCount.textContent = "";
+    } else if (!matches.length) {
+      searchCount.textContent = "No matches";
+    } else {
+      searchCount.textContent = (current + 1) + " / " + matches.length;
+    }
+  }
+
+  function step(direction) {
+    if (!matches.length) {
+      return;
+    }
+    var previous = current === -1 ? -1 : matches[current];
+    current = (current + direction + matches.length) % matches.length;
+    var i = matches[current];
+    if (previous !== -1) {
+      refresh(blocks[Math.floor(previous / BLOCK_SIZE)]);
+    }
+    var block = blocks[Math.floor(i / BLOCK_SIZE)];
+    refresh(block);
+    fill(block);
+    block.querySelector('[data-index="' + i + '"]').scrollIntoView({block: "center"});
+    updateCount();
+  }
+
+  search.addEventListener("input", function () {
+    query = search.value.toLowerCase();
+    if (lowerText === null) {
+      lowerText = data.text.map(function (text) { return text.toLowerCase(); });
+    }
+    matches = [];
+    current = -1;
+    if (query) {
+      for (var i = 0; i < n; i++) {
+        if (lowerText[i].indexOf(query) !== -1) {
+          matches.push(i);
+        }
+      }
+    }
+    blocks.forEach(refresh);
+    step(1);
+    updateCount();
+  });
+  search.addEventListener("keydown", function (event) {
+    if (event.key === "Enter") {
+      step(event.shiftKey ? -1 : 1);
+    }
+  });
+  document.getElementById("search-prev").addEventListener("click", function () {
+    step(-1);
+  });
+  document.getElementById("search-next").addEventListener("click", function () {
+    step(1);
+  });
+})();
+"""
+
+
+def iter_virtual_html(
+    transcript: dict,
+    diarisation: Optional[List[Dict[str, Any]]] = None,
+    audio_file: Optional[Path] = None,
+    speaker_mapping: Optional[dict] = None,
+    alignment: str = "midpoint",
+    data_src: Optional[str] = None,
+) -> Iterator[str]:
+    """Generate a virtualised html page of a conversation in chunks.
+
+    The segments are embedded once as compact JSON and rendered in the
+    browser, with only the segments near the visible part of the page in the
+    document. The page opens quickly however long the conversation is, and
+    keeps the speaker headers and click-to-seek of ``generate``, along with a
+    search over the segment text.
+
+    Parameters
+    ----------
+    transcript : dict | SegmentTable
+        Transcript from transcribe module.
+    diarisation : dict
+        Speaker diarisation from from diarisation module.
+    audio_file : PosixPath | None
+        Path to audio file. If provided, audio will be embedded in the
+        report and clicking a segment will seek to its start.
+    speaker_mapping : dict
+        Mapping of old speaker names to new speaker names.
+        For example, {"0": "Alice", "1": "Bob"}.
+    alignment : str
+        How transcript segments are assigned to diarised speakers, either
+        "midpoint" or "overlap".
+    data_src : str, optional
+        URL of a sidecar script holding the segment data, as written by
+        ``write_virtual_html``. If provided, the data is loaded from the
+        sidecar instead of being embedded in the page.
+
+    Yields
+    ------
+    str
+        Consecutive chunks of the html page.
+    """
+    yield _HEAD
+    if audio_file is not None:
+        yield _AUDIO.format(src=_escape(str(audio_file)))
+    yield _SEARCH
+
+    if data_src is not None:
+        yield f'    <script src="{_escape(data_src)}"></script>\n'
+    else:
+        data = _virtual_report_data(transcript, diarisation, speaker_mapping, alignment)
+        yield '    <script id="conversation-data" type="application/json">'
+        # Escaping "<" keeps "</script>" in the text from ending the element
+        yield _dump_data(data).replace("<", "\\u003c")
+        yield "</script>\n"
+
+    yield _TAIL.format(script=_VIEWER)
+
+
+def write_virtual_html(
+    file: Union[str, Path, TextIO],
+    transcript: dict,
+    diarisation: Optional[List[Dict[str, Any]]] = None,
+    audio_file: Optional[Path] = None,
+    speaker_mapping: Optional[dict] = None,
+    alignment: str = "midpoint",
+    data_file: Optional[Union[str, Path]] = None,
+) -> None:
+    """Write a virtualised html page of a conversation to a file.
+
+    Parameters
+    ----------
+    file : str | Path | TextIO
+        Path of the html file, or a file-like object opened for writing text.
+    transcript : dict | SegmentTable
+        Transcript from transcribe module.
+    diarisation : dict
+        Speaker diarisation from from diarisation module.
+    audio_file : PosixPath | None
+        Path to audio file to embed in the report.
+    speaker_mapping : dict
+        Mapping of old speaker names to new speaker names.
+    alignment : str
+        How transcript segments are assigned to diarised speakers, either
+        "midpoint" or "overlap".
+    data_file : str | Path, optional
+        If provided, the segment data is written to this sidecar script
+        instead of being embedded in the page. It is referenced relative to
+        the html file when ``file`` is a path, and by ``data_file`` otherwise.
+    """
+    data_src = None
+    if data_file is not None:
+        data = _virtual_report_data(transcript, diarisation, speaker_mapping, alignment)
+        with open(data_file, "w") as f:
+            f.write("window.conversationData = ")
+            f.write(_dump_data(data))
+            f.write(";\n")
+
+        if isinstance(file, (str, Path)):
+            data_src = os.path.relpath(data_file, Path(file).parent)
+        else:
+            data_src = str(data_file)
+        data_src = Path(data_src).as_posix()
+
+    chunks = iter_virtual_html(
+        transcript,
+        diarisation=diarisation,
+        audio_file=audio_file,
+        speaker_mapping=speaker_mapping,
+        alignment=alignment,
+        data_src=data_src,
+    )
+
+    if isinstance(file, (str, Path)):
+        with open(file, "w") as f:
+            f.writelines(chunks)
+    else:
+        file.writelines(chunks)
+
+
+def _virtual_report_data(
+    transcript: dict,
+    diarisation: Optional[List[Dict[str, Any]]],
+    speaker_mapping: Optional[dict],
+    alignment: str,
+) -> Dict[str, Any]:
+    """Collect the segments of a report as columns with interned speakers."""
+    segments: Iterable[dict] = _iter_segments(transcript)
+    if diarisation is not None:
+        segments = _iter_grouped_segments(transcript, diarisation, alignment=alignment)
+
+    if speaker_mapping is None:
+        speaker_mapping = {}
+
+    # Speakers are interned before mapping, so only the interned labels are
+    # looked up in the speaker mapping
+    labels: List[Any] = []
+    label_ids: Dict[Any, int] = {}
+    speaker: List[int] = []
+    start: List[float] = []
+    text: List[str] = []
+    for seg in segments:
+        label = seg.get("speaker")
+        if label not in label_ids:
+            label_ids[label] = len(labels)
+            labels.append(label)
+        speaker.append(label_ids[label])
+        start.append(round(float(seg["start"]), 2))
+        text.append(f"{seg['text']}")
+
+    # Speakers that are mapped to the same name share an id
+    speaker_ids: Dict[str, int] = {}
+    lookup = [
+        speaker_ids.setdefault(
+            "unknown" if label is None else f"{speaker_mapping.get(label, label)}",
+            len(speaker_ids),
+        )
+        for label in labels
+    ]
+
+    return {
+        "headers": diarisation is not None,
+        "speakers": list(speaker_ids),
+        "speaker": [lookup[idx] for idx in speaker],
+        "start": start,
+        "text": text,
+    }
+
+
+def _dump_data(data: Dict[str, Any]) -> str:
+    """Serialise report data as compact JSON."""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
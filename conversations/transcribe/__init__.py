@@ -1 +1,3 @@
 """Transcriptions for conversations."""
+
+from ._cache import TranscriptionCache
@@ -0,0 +1,84 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import pickle
+
+from conversations._cache import DirectoryCache
+from conversations.config import cache_settings
+
+
+class TranscriptionCache(DirectoryCache):
+    """Content addressed cache of transcription results.
+
+    Transcripts are stored as pickle files in a local directory, keyed on the
+    content hash of the recording and the settings used to transcribe it.
+    The same recording at a different path, or transcribed again with
+    identical settings, is served from the cache instead of being transcribed.
+    When the cache grows beyond ``max_bytes`` the least recently used
+    transcripts are removed.
+
+    Parameters
+    ----------
+    directory : pathlib.Path
+        Directory in which cached transcripts are stored.
+    max_bytes : int
+        Maximum combined size in bytes of the cached transcripts.
+    """
+
+    suffix = ".pkl"
+
+    @staticmethod
+    def key(
+        content_hash: str,
+        method: str,
+        model: str,
+        language: str,
+        prompt: Optional[str] = None,
+        custom_terms: Optional[List[str]] = None,
+    ) -> str:
+        """Create the cache key of a transcription.
+
+        Parameters
+        ----------
+        content_hash : str
+            Hash of the contents of the recording.
+        method : str
+            The transcription method.
+        model : str
+            The transcription model.
+        language : str
+            The language of the conversation.
+        prompt : str, optional
+            The transcription prompt.
+        custom_terms : list[str], optional
+            Custom terms passed to the transcription engine.
+
+        Returns
+        -------
+        str
+            The cache key.
+        """
+        settings = [content_hash, method, model, language, prompt, custom_terms]
+        return hashlib.sha256(json.dumps(settings).encode()).hexdigest()
+
+    def _read(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        """Read a transcript, or return None if the file is corrupt."""
+        with open(file_path, "rb") as file:
+            try:
+                return pickle.load(file)
+            except (EOFError, pickle.UnpicklingError):
+                return None
+
+    def _write(self, file_path: Path, transcript: Dict[str, Any]) -> None:
+        """Write a transcript."""
+        with open(file_path, "wb") as file:
+            pickle.dump(transcript, file)
+
+
+def _transcription_cache() -> TranscriptionCache:
+    """Create the transcription cache configured in the cache settings."""
+    return TranscriptionCache(
+        directory=cache_settings.cache_dir / "transcriptions",
+        max_bytes=cache_settings.transcription_cache_max_bytes,
+    )
@@ -0,0 +1,158 @@
+"""Split audio into windows and stitch the window transcripts back together."""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+
+def _find_silence_splits(
+    audio: np.ndarray,
+    sample_rate: int,
+    num_windows: int,
+    min_window_seconds: float = 60.0,
+    search_seconds: float = 10.0,
+    frame_seconds: float = 0.1,
+) -> List[int]:
+    """Find sample indices at which to split audio into windows.
+
+    The audio is divided into ``num_windows`` windows of roughly equal length.
+    Each split is then moved to the quietest frame within ``search_seconds``
+    of the equal-length boundary, so that splits land in pauses rather than
+    in the middle of words.
+
+    Parameters
+    ----------
+    audio : np.ndarray
+        Mono audio samples, either floating point or integer PCM samples.
+        Memory mapped samples are read block by block.
+    sample_rate : int
+        Sample rate of the audio in Hz.
+    num_windows : int
+        The desired number of windows.
+    min_window_seconds : float, default=60.0
+        Minimum window length. Fewer windows are used for short recordings.
+    search_seconds : float, default=10.0
+        How far either side of the equal-length boundary to search for silence.
+    frame_seconds : float, default=0.1
+        Length of the frames over which the audio energy is computed.
+
+    Returns
+    -------
+    splits : list[int]
+        Sorted sample indices of the window boundaries, starting with 0 and
+        ending with ``len(audio)``.
+    """
+    num_samples = len(audio)
+    max_windows = int(num_samples // (min_window_seconds * sample_rate))
+    num_windows = max(1, min(num_windows, max_windows))
+    if num_windows == 1:
+        return [0, num_samples]
+
+    frame_len = max(1, int(frame_seconds * sample_rate))
+    num_frames = num_samples // frame_len
+    energy = _frame_energy(audio, frame_len, num_frames)
+
+    search_frames = int(search_seconds * sample_rate) // frame_len
+    splits = [0]
+    for window_idx in range(1, num_windows):
+        target = (num_samples * window_idx // num_windows) // frame_len
+        lo = max(target - search_frames, splits[-1] // frame_len + 1)
+        hi = min(target + search_frames + 1, num_frames)
+        quietest = lo + int(np.argmin(energy[lo:hi])) if hi > lo else target
+        splits.append(quietest * frame_len + frame_len // 2)
+    splits.append(num_samples)
+
+    return splits
+
+
+def _frame_energy(
+    audio: np.ndarray, frame_len: int, num_frames: int, block_frames: int = 10000
+) -> np.ndarray:
+    """Compute the root mean square energy of consecutive audio frames."""
+    energy = np.empty(num_frames, dtype=np.float32)
+    for first in range(0, num_frames, block_frames):
+        last = min(first + block_frames, num_frames)
+        block = np.asarray(audio[first * frame_len : last * frame_len])
+        block = block.astype(np.float32).reshape(last - first, frame_len)
+        energy[first:last] = np.sqrt(np.mean(block**2, axis=1))
+    return energy
+
+
+def _stitch_transcripts(
+    results: Sequence[Dict[str, Any]], offsets: Sequence[float]
+) -> Dict[str, Any]:
+    """Combine whisper format transcripts of consecutive windows.
+
+    Parameters
+    ----------
+    results : Sequence[dict]
+        Transcripts in whisper format, one per window, in time order.
+    offsets : Sequence[float]
+        Start time in seconds of each window within the full recording.
+
+    Returns
+    -------
+    transcript : dict
+        A single transcript in whisper format with global segment times.
+        Segments at a seam that repeat the text of the preceding segment
+        are dropped.
+    """
+    segments = list(_iter_stitched_segments(results, offsets))
+
+    transcript: Dict[str, Any] = {
+        "text": "".join(seg["text"] for seg in segments),
+        "segments": segments,
+    }
+    if results and "language" in results[0]:
+        transcript["language"] = results[0]["language"]
+
+    return transcript
+
+
+def _iter_stitched_segments(
+    results: Iterable[Dict[str, Any]], offsets: Iterable[float]
+) -> Iterator[Dict[str, Any]]:
+    """Yield the segments of consecutive window transcripts with global times.
+
+    Window transcripts are consumed lazily, so segments of the first window
+    are yielded before later windows have been transcribed.
+
+    Parameters
+    ----------
+    results : Iterable[dict]
+        Transcripts in whisper format, one per window, in time order.
+    offsets : Iterable[float]
+        Start time in seconds of each window within the full recording.
+
+    Yields
+    ------
+    segment : dict
+        Segment with start and end times relative to the full recording.
+    """
+    previous: Optional[Dict[str, Any]] = None
+    num_segments = 0
+    for result, offset in zip(results, offsets):
+        for seg in result["segments"]:
+            seg = dict(seg)
+            seg["start"] = seg["start"] + offset
+            seg["end"] = seg["end"] + offset
+            if "words" in seg and seg["words"] is not None:
+                seg["words"] = [
+                    {**w, "start": w["start"] + offset, "end": w["end"] + offset}
+                    for w in seg["words"]
+                ]
+
+            if previous is not None and _is_seam_duplicate(previous, seg):
+                continue
+
+            seg["id"] = num_segments
+            num_segments += 1
+            previous = seg
+            yield seg
+
+
+def _is_seam_duplicate(previous: Dict[str, Any], segment: Dict[str, Any]) -> bool:
+    """Check whether a segment repeats the previous segment across a seam."""
+    overlaps = segment["start"] < previous["end"]
+    same_text = segment["text"].strip() == previous["text"].strip()
+    return overlaps and same_text
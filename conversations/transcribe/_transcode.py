@@ -0,0 +1,125 @@
+"""Transcode recordings to small speech optimised files before uploading."""
+
+from pathlib import Path
+from typing import List, Optional, Tuple
+import math
+import subprocess
+
+from conversations._audio import SAMPLE_RATE, decoded_audio_file, _memmap_wav
+from ._chunking import _find_silence_splits
+
+
+def transcode_for_upload(
+    audio_file: Path,
+    output_file: Path,
+    bitrate_kbps: int = 32,
+    start: Optional[float] = None,
+    duration: Optional[float] = None,
+) -> Path:
+    """Transcode audio to low bitrate mono Opus for uploading.
+
+    The recording is read from its decoded 16 kHz mono audio, which is
+    shared with the local processing stages, and encoded with the Opus
+    speech (``voip``) profile.
+
+    Parameters
+    ----------
+    audio_file : Path
+        Path to the recording.
+    output_file : Path
+        Path of the transcoded file. Should have an ``.ogg`` suffix.
+    bitrate_kbps : int, optional
+        Target bitrate in kilobits per second, by default 32.
+    start : float, optional
+        Start time in seconds of the section to transcode. By default the
+        section starts at the beginning of the recording.
+    duration : float, optional
+        Duration in seconds of the section to transcode. By default the
+        section extends to the end of the recording.
+
+    Returns
+    -------
+    output_file : Path
+        Path of the transcoded file.
+    """
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-y"]
+    if start is not None:
+        cmd += ["-ss", f"{start:.3f}"]
+    if duration is not None:
+        cmd += ["-t", f"{duration:.3f}"]
+    cmd += [
+        "-i",
+        str(decoded_audio_file(audio_file)),
+        "-ac",
+        "1",
+        "-c:a",
+        "libopus",
+        "-application",
+        "voip",
+        "-b:a",
+        f"{bitrate_kbps}k",
+        str(output_file),
+    ]
+    proc = subprocess.run(cmd, capture_output=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Failed to transcode audio: {proc.stderr.decode()}")
+
+    return output_file
+
+
+def split_for_upload(
+    audio_file: Path,
+    output_dir: Path,
+    max_bytes: int,
+    bitrate_kbps: int = 32,
+) -> List[Tuple[Path, float]]:
+    """Transcode audio into pieces that are each smaller than a size limit.
+
+    Piece boundaries are placed at pauses in the speech, so that words are
+    not cut in half at the seams.
+
+    Parameters
+    ----------
+    audio_file : Path
+        Path to the recording.
+    output_dir : Path
+        Directory in which the pieces are written.
+    max_bytes : int
+        Maximum size in bytes of each piece.
+    bitrate_kbps : int, optional
+        Target bitrate in kilobits per second, by default 32.
+
+    Returns
+    -------
+    pieces : list[tuple[Path, float]]
+        The path of each piece and its start time in seconds within the
+        recording, in time order.
+    """
+    search_seconds = 10.0
+    pcm = _memmap_wav(decoded_audio_file(audio_file))
+    duration = len(pcm) / SAMPLE_RATE
+
+    # Leave room for container overhead, bitrate overshoot and the silence search
+    max_seconds = 0.8 * max_bytes * 8 / (bitrate_kbps * 1000) - 2 * search_seconds
+    num_pieces = max(1, math.ceil(duration / max_seconds))
+    splits = _find_silence_splits(
+        pcm,
+        SAMPLE_RATE,
+        num_pieces,
+        min_window_seconds=min(60.0, max_seconds),
+        search_seconds=search_seconds,
+    )
+
+    pieces = []
+    for idx, (start, stop) in enumerate(zip(splits[:-1], splits[1:])):
+        output_file = Path(output_dir) / f"piece_{idx:04d}.ogg"
+        transcode_for_upload(
+            audio_file,
+            output_file,
+            bitrate_kbps=bitrate_kbps,
+            start=start / SAMPLE_RATE,
+            duration=(stop - start) / SAMPLE_RATE,
+        )
+        pieces.append((output_file, start / SAMPLE_RATE))
+
+    return pieces
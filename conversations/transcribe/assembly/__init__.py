@@ -1,3 +1,5 @@
 """Use Assembly for transcription of conversations."""
 
-from ._assembly import process
+from ._assembly import process, process_stream
+from ._batch import process_many, aprocess_many
+from ._words import WordTable, set_word_data
@@ -1,9 +1,13 @@
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 import os
+import tempfile
 
 import assemblyai as aai  # type: ignore
 
+from .._transcode import transcode_for_upload
+from ._words import set_word_data
+
 # Load environmental variable for API key
 aai.settings.api_key = f"{os.getenv('ASSEMBLYAI_API_KEY')}"
 
@@ -13,6 +17,8 @@ def process(
     model_name: str = "nano",
     language: str = "en",
     custom_terms: Optional[List[str]] = None,
+    compress_upload: bool = False,
+    word_data: str = "full",
 ) -> Dict[str, str]:
     """Transcribe audio using AssemblyAI.
 
@@ -28,12 +34,86 @@ def process(
     custom_terms : list[str], optional
         Custom terms to help the speech model with specific vocabulary.
         Only used when ``model_name`` is ``"slam-1"``.
+    compress_upload : bool, optional
+        If True, upload low bitrate mono speech audio instead of the original
+        recording, by default False.
+    word_data : str, optional
+        How to store word level data, one of ``"compact"``, ``"full"`` or
+        ``"none"``. ``"compact"`` stores the words in a single
+        :class:`WordTable` under ``transcript["words"]`` and each segment
+        references its words with a ``word_range``, ``"full"`` keeps the
+        lists of word dictionaries returned by AssemblyAI, and ``"none"``
+        drops word level data. By default ``"full"``. ``"compact"`` uses
+        much less memory for long recordings.
 
     Returns
     -------
     transcript : Dict[str, str]
         Dictionary containing the audio transcript in whisper format.
     """
+    config = _transcription_config(model_name, language, custom_terms)
+    transcriber = aai.Transcriber(config=config)
+
+    if compress_upload:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            upload_file = transcode_for_upload(audio_file, Path(tmp_dir) / "upload.ogg")
+            transcript = transcriber.transcribe(str(upload_file))
+    else:
+        transcript = transcriber.transcribe(str(audio_file))
+
+    return _to_whisper_format(transcript.json_response, word_data=word_data)
+
+
+def process_stream(
+    audio_file: Path,
+    model_name: str = "nano",
+    language: str = "en",
+    custom_terms: Optional[List[str]] = None,
+    compress_upload: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """Transcribe audio using AssemblyAI, yielding segments.
+
+    AssemblyAI only returns utterances once the transcription job has
+    completed, so all segments are yielded as soon as the job is polled
+    as complete.
+
+    Parameters
+    ----------
+    audio_file : Path
+        Path to the audio file.
+    model_name : str, optional
+        Name of the assembly model to use. To use the cloud service
+        provided by Assembly, use "nano", "slam-1", "universal", or "best".
+    language : str, optional
+        Language to use for the transcription, by default "en".
+    custom_terms : list[str], optional
+        Custom terms to help the speech model with specific vocabulary.
+        Only used when ``model_name`` is ``"slam-1"``.
+    compress_upload : bool, optional
+        If True, upload low bitrate mono speech audio instead of the original
+        recording, by default False.
+
+    Yields
+    ------
+    segment : dict
+        Transcript segment in whisper format, with the keys ``start``,
+        ``end``, ``text``, ``speaker`` and ``words``.
+    """
+    result = process(
+        audio_file,
+        model_name=model_name,
+        language=language,
+        custom_terms=custom_terms,
+        compress_upload=compress_upload,
+        word_data="full",
+    )
+    yield from result["segments"]  # type: ignore
+
+
+def _transcription_config(
+    model_name: str, language: str, custom_terms: Optional[List[str]]
+) -> "aai.TranscriptionConfig":
+    """Create the AssemblyAI transcription configuration for a model."""
     allowed_model_names = ["nano", "best", "slam-1", "universal"]
     if model_name.lower() not in allowed_model_names:
         raise ValueError(
@@ -68,14 +148,13 @@ def process(
             speaker_labels=True,
         )
 
-    transcriber = aai.Transcriber(config=config)
-
-    transcript = transcriber.transcribe(str(audio_file))
-
-    # Convert to openai format
+    return config
 
-    result = transcript.json_response
 
+def _to_whisper_format(
+    result: Dict[str, Any], word_data: str = "full"
+) -> Dict[str, Any]:
+    """Convert an AssemblyAI transcript response to whisper format."""
     result["segments"] = result["utterances"]
 
     # For each segment, convert the start and end times to seconds from milliseconds
@@ -85,4 +164,4 @@ def process(
         seg["end"] = seg["end"] / 1000
         seg["speaker"] = f"Speaker_{seg['speaker']}"
 
-    return result
+    return set_word_data(result, word_data)
@@ -0,0 +1,233 @@
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+from collections import defaultdict
+import asyncio
+import tempfile
+
+import assemblyai as aai  # type: ignore
+import httpx
+
+from .._transcode import transcode_for_upload
+from ._assembly import _to_whisper_format, _transcription_config
+
+# Consecutive failed polls of a job after which it is treated as failed
+_MAX_POLL_ERRORS = 5
+
+
+async def aprocess_many(
+    audio_files: Sequence[Path],
+    model_name: str = "nano",
+    language: str = "en",
+    custom_terms: Optional[List[str]] = None,
+    max_concurrency: int = 8,
+    poll_interval: float = 3.0,
+    compress_upload: bool = False,
+    return_exceptions: bool = False,
+    base_url: Optional[str] = None,
+    word_data: str = "full",
+) -> AsyncIterator[Tuple[Path, Union[Dict[str, Any], Exception]]]:
+    """Transcribe many recordings concurrently using AssemblyAI.
+
+    Recordings are uploaded and submitted concurrently, with at most
+    ``max_concurrency`` uploads in flight at a time. All outstanding jobs
+    are polled together from a single loop, and each transcript is yielded
+    in whisper format as soon as its job completes.
+
+    Parameters
+    ----------
+    audio_files : Sequence[Path]
+        Paths to the audio files.
+    model_name : str, optional
+        Name of the assembly model to use, one of "nano", "slam-1",
+        "universal", or "best", by default "nano".
+    language : str, optional
+        Language to use for the transcription, by default "en".
+    custom_terms : list[str], optional
+        Custom terms to help the speech model with specific vocabulary.
+        Only used when ``model_name`` is ``"slam-1"``.
+    max_concurrency : int, optional
+        Maximum number of recordings uploaded and submitted at the same
+        time, by default 8.
+    poll_interval : float, optional
+        Seconds between polls of the outstanding jobs, by default 3.
+    compress_upload : bool, optional
+        If True, upload low bitrate mono speech audio instead of the original
+        recordings, by default False.
+    return_exceptions : bool, optional
+        If True, a failed recording is yielded with the exception in place of
+        its transcript. If False, the first failure is raised. By default False.
+        Failed polls of a job are retried, and the job only fails after
+        several polls in a row fail.
+    base_url : str, optional
+        Base URL of the AssemblyAI API. Defaults to ``aai.settings.base_url``.
+    word_data : str, optional
+        How to store word level data, one of ``"compact"``, ``"full"`` or
+        ``"none"``, as for ``assembly.process``. By default ``"full"``.
+
+    Yields
+    ------
+    audio_file : Path
+        Path of the recording, as given in ``audio_files``.
+    transcript : dict or Exception
+        Dictionary containing the audio transcript in whisper format.
+    """
+    config = _transcription_config(model_name, language, custom_terms)
+    request = config.raw.model_dump(mode="json", exclude_none=True, by_alias=True)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=base_url or aai.settings.base_url,
+        headers={"authorization": f"{aai.settings.api_key}"},
+        timeout=aai.settings.http_timeout,
+    ) as client:
+
+        async def submit(audio_file: Path) -> str:
+            async with semaphore:
+                if compress_upload:
+                    with tempfile.TemporaryDirectory() as tmp_dir:
+                        upload_file = await asyncio.to_thread(
+                            transcode_for_upload,
+                            audio_file,
+                            Path(tmp_dir) / "upload.ogg",
+                        )
+                        upload_url = await _upload(client, upload_file)
+                else:
+                    upload_url = await _upload(client, audio_file)
+                return await _submit(client, {**request, "audio_url": upload_url})
+
+        submissions = {
+            asyncio.create_task(submit(Path(audio_file))): audio_file
+            for audio_file in audio_files
+        }
+        outstanding: Dict[str, Any] = {}
+        poll_errors: Dict[str, int] = defaultdict(int)
+
+        try:
+            while submissions or outstanding:
+                await asyncio.sleep(poll_interval)
+
+                for task in [task for task in submissions if task.done()]:
+                    audio_file = submissions.pop(task)
+                    if task.exception() is None:
+                        outstanding[task.result()] = audio_file
+                    elif return_exceptions:
+                        yield audio_file, task.exception()  # type: ignore
+                    else:
+                        raise task.exception()  # type: ignore
+
+                transcript_ids = list(outstanding)
+                responses = await asyncio.gather(
+                    *(_poll(client, transcript_id) for transcript_id in transcript_ids),
+                    return_exceptions=True,
+                )
+                for transcript_id, response in zip(transcript_ids, responses):
+                    if isinstance(response, BaseException):
+                        if not isinstance(response, Exception):
+                            raise response
+                        # A failed poll is retried, unless it keeps failing
+                        poll_errors[transcript_id] += 1
+                        if poll_errors[transcript_id] < _MAX_POLL_ERRORS:
+                            continue
+                        audio_file = outstanding.pop(transcript_id)
+                        if not return_exceptions:
+                            raise response
+                        yield audio_file, response
+                        continue
+
+                    poll_errors[transcript_id] = 0
+                    if response["status"] == "completed":
+                        audio_file = outstanding.pop(response["id"])
+                        yield audio_file, _to_whisper_format(response, word_data)
+                    elif response["status"] == "error":
+                        audio_file = outstanding.pop(response["id"])
+                        error = aai.types.TranscriptError(
+                            f"failed to transcribe {audio_file}: {response.get('error')}"
+                        )
+                        if not return_exceptions:
+                            raise error
+                        yield audio_file, error
+        finally:
+            for task in submissions:
+                task.cancel()
+
+
+def process_many(
+    audio_files: Sequence[Path],
+    model_name: str = "nano",
+    language: str = "en",
+    custom_terms: Optional[List[str]] = None,
+    max_concurrency: int = 8,
+    poll_interval: float = 3.0,
+    compress_upload: bool = False,
+    return_exceptions: bool = False,
+    base_url: Optional[str] = None,
+    word_data: str = "full",
+) -> Dict[Path, Union[Dict[str, Any], Exception]]:
+    """Transcribe many recordings concurrently using AssemblyAI.
+
+    This is a blocking wrapper around :func:`aprocess_many` and accepts the
+    same parameters.
+
+    Returns
+    -------
+    transcripts : dict
+        Mapping from each path in ``audio_files`` to its transcript in
+        whisper format, or to the exception if ``return_exceptions`` is True
+        and the recording failed.
+    """
+
+    async def collect():
+        return {
+            audio_file: transcript
+            async for audio_file, transcript in aprocess_many(
+                audio_files,
+                model_name=model_name,
+                language=language,
+                custom_terms=custom_terms,
+                max_concurrency=max_concurrency,
+                poll_interval=poll_interval,
+                compress_upload=compress_upload,
+                return_exceptions=return_exceptions,
+                base_url=base_url,
+                word_data=word_data,
+            )
+        }
+
+    return asyncio.run(collect())
+
+
+async def _upload(client: httpx.AsyncClient, audio_file: Path) -> str:
+    """Upload a file to AssemblyAI and return its upload URL."""
+    response = await client.post("/v2/upload", content=_read_chunks(audio_file))
+    if response.status_code != httpx.codes.OK:
+        raise aai.types.TranscriptError(
+            f"Failed to upload audio file {audio_file}: {response.text}",
+        )
+    return response.json()["upload_url"]
+
+
+async def _submit(client: httpx.AsyncClient, request: Dict[str, Any]) -> str:
+    """Submit a transcription job and return the transcript id."""
+    response = await client.post("/v2/transcript", json=request)
+    if response.status_code != httpx.codes.OK:
+        raise aai.types.TranscriptError(
+            f"failed to transcribe url {request['audio_url']}: {response.text}",
+        )
+    return response.json()["id"]
+
+
+async def _poll(client: httpx.AsyncClient, transcript_id: str) -> Dict[str, Any]:
+    """Get the current state of a transcription job."""
+    response = await client.get(f"/v2/transcript/{transcript_id}")
+    if response.status_code != httpx.codes.OK:
+        raise aai.types.TranscriptError(
+            f"failed to retrieve transcript {transcript_id}: {response.text}",
+        )
+    return response.json()
+
+
+async def _read_chunks(audio_file: Path, chunk_size: int = 1 << 20):
+    """Read a file in chunks without blocking the event loop."""
+    with open(audio_file, "rb") as file:
+        while chunk := await asyncio.to_thread(file.read, chunk_size):
+            yield chunk
@@ -0,0 +1,195 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+WORD_DATA_OPTIONS = ["compact", "full", "none"]
+
+
+class WordTable:
+    """Columnar storage of word level transcription data.
+
+    Words are stored as parallel NumPy arrays of start and end times,
+    confidences and speaker ids, with the text of every word held in a single
+    string. This replaces hundreds of thousands of small dictionaries with a
+    handful of arrays.
+
+    Attributes
+    ----------
+    start : np.ndarray
+        Start time of each word in milliseconds.
+    end : np.ndarray
+        End time of each word in milliseconds.
+    confidence : np.ndarray
+        Confidence of each word.
+    speaker : np.ndarray
+        Index of the speaker of each word into ``speakers``, or -1 if the
+        speaker is unknown.
+    speakers : list[str]
+        Speaker labels.
+    text : str
+        Text of all words concatenated.
+    offsets : np.ndarray
+        Offsets of each word into ``text``, with one more entry than words.
+    """
+
+    __slots__ = ("start", "end", "confidence", "speaker", "speakers", "text", "offsets")
+
+    def __init__(
+        self,
+        start: np.ndarray,
+        end: np.ndarray,
+        confidence: np.ndarray,
+        speaker: np.ndarray,
+        speakers: List[str],
+        text: str,
+        offsets: np.ndarray,
+    ):
+        """Initialise the word table."""
+        self.start = start
+        self.end = end
+        self.confidence = confidence
+        self.speaker = speaker
+        self.speakers = speakers
+        self.text = text
+        self.offsets = offsets
+
+    @classmethod
+    def from_words(cls, words: Sequence[Dict[str, Any]]) -> "WordTable":
+        """Create a word table from a list of AssemblyAI word dictionaries."""
+        speakers: List[str] = []
+        speaker_ids: Dict[Optional[str], int] = {None: -1}
+        speaker = np.empty(len(words), dtype=np.int16)
+        for idx, word in enumerate(words):
+            label = word.get("speaker")
+            if label not in speaker_ids:
+                speaker_ids[label] = len(speakers)
+                speakers.append(label)  # type: ignore
+            speaker[idx] = speaker_ids[label]
+
+        lengths = np.fromiter((len(w["text"]) for w in words), dtype=np.int64)
+        offsets = np.zeros(len(words) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        return cls(
+            start=np.fromiter((w["start"] for w in words), dtype=np.int64),
+            end=np.fromiter((w["end"] for w in words), dtype=np.int64),
+            confidence=np.fromiter(
+                (w.get("confidence", np.nan) for w in words), dtype=np.float64
+            ),
+            speaker=speaker,
+            speakers=speakers,
+            text="".join(w["text"] for w in words),
+            offsets=offsets,
+        )
+
+    def __len__(self) -> int:
+        """Return the number of words."""
+        return len(self.start)
+
+    def word(self, idx: int) -> str:
+        """Return the text of a word."""
+        return self.text[self.offsets[idx] : self.offsets[idx + 1]]
+
+    def to_dicts(self, first: int = 0, last: Optional[int] = None) -> List[Dict]:
+        """Convert a range of words back to AssemblyAI word dictionaries.
+
+        Parameters
+        ----------
+        first : int, optional
+            Index of the first word, by default 0.
+        last : int, optional
+            Index one past the last word, by default the end of the table.
+
+        Returns
+        -------
+        words : list[dict]
+            Word dictionaries with the keys ``text``, ``start``, ``end``,
+            ``confidence`` and ``speaker``.
+        """
+        if last is None:
+            last = len(self)
+        return [
+            {
+                "text": self.word(idx),
+                "start": int(self.start[idx]),
+                "end": int(self.end[idx]),
+                "confidence": float(self.confidence[idx]),
+                "speaker": (
+                    self.speakers[self.speaker[idx]] if self.speaker[idx] >= 0 else None
+                ),
+            }
+            for idx in range(first, last)
+        ]
+
+
+def set_word_data(result: Dict[str, Any], word_data: str = "full") -> Dict:
+    """Convert the word level data of a transcript to the requested form.
+
+    Parameters
+    ----------
+    result : dict
+        Transcript returned by ``assembly.process``, with word level data in
+        any of the supported forms.
+    word_data : str, optional
+        How to store word level data. ``"compact"`` stores all words in a
+        :class:`WordTable` under ``result["words"]``, with each segment
+        referencing its words through a ``word_range`` of indices.
+        ``"full"`` stores lists of word dictionaries as returned by AssemblyAI,
+        and ``"none"`` drops word level data. By default ``"full"``.
+
+    Returns
+    -------
+    result : dict
+        The transcript, modified in place.
+    """
+    if word_data not in WORD_DATA_OPTIONS:
+        raise ValueError(
+            f"word_data must be one of {WORD_DATA_OPTIONS}. Received {word_data}."
+        )
+
+    segments = result.get("segments") or []
+    words = result.get("words")
+
+    if word_data == "full":
+        # Word dictionaries are kept as they are, only a word table is converted
+        if isinstance(words, WordTable):
+            for seg in segments:
+                if "word_range" in seg:
+                    seg["words"] = words.to_dicts(*seg.pop("word_range"))
+            result["words"] = words.to_dicts()
+        return result
+
+    table = _word_table(result) if word_data == "compact" else None
+    if table is None:
+        result.pop("words", None)
+        for seg in segments:
+            seg.pop("words", None)
+            seg.pop("word_range", None)
+        return result
+
+    # Segments hold consecutive runs of the words, in time order
+    cursor = 0
+    for seg in segments:
+        if "word_range" not in seg and seg.get("words"):
+            start = seg["words"][0]["start"]
+            first = cursor + int(np.searchsorted(table.start[cursor:], start))
+            cursor = first + len(seg["words"])
+            seg["word_range"] = (first, cursor)
+        seg.pop("words", None)
+    result["words"] = table
+    return result
+
+
+def _word_table(result: Dict[str, Any]) -> Optional[WordTable]:
+    """Return the words of a transcript as a word table, if it has any."""
+    words = result.get("words")
+    if isinstance(words, WordTable):
+        return words
+    if not words:
+        # Transcripts assembled from streamed segments only have segment words
+        words = [
+            w for seg in result.get("segments") or [] for w in seg.get("words") or []
+        ]
+    if words:
+        return WordTable.from_words(words)
+    return None
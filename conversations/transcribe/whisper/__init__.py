@@ -1,3 +1,9 @@
 """Use Whisper for transcription of conversations."""
 
-from ._whisper import process
+from ._whisper import process, process_stream
+from ._model_cache import (
+    preload_model,
+    evict_model,
+    set_model_cache_limit,
+    cached_models,
+)
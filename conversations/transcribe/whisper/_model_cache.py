@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Dict, List, Optional, Tuple
+
+import whisper
+
+from conversations.config import cache_settings
+
+
+_CacheKey = Tuple[str, str]
+
+
+class _ModelCache:
+    """Least recently used cache of loaded Whisper models.
+
+    Models are keyed by model name and device. When the combined size of
+    the cached model weights exceeds ``max_bytes`` the least recently used
+    models are evicted. The most recently loaded model is always kept, even
+    if it alone exceeds the ceiling.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._models: "OrderedDict[_CacheKey, Tuple[Any, int]]" = OrderedDict()
+        self._lock = RLock()
+
+    def get(self, model_name: str, device: str = "cpu") -> Any:
+        """Return a loaded model, loading it if it is not cached."""
+        key = (model_name, device)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key][0]
+
+            model = whisper.load_model(model_name, device=device)
+            self._models[key] = (model, _model_num_bytes(model))
+            self._evict_to_fit()
+            return model
+
+    def evict(self, model_name: Optional[str] = None, device: Optional[str] = None):
+        """Remove models matching ``model_name`` and ``device`` from the cache."""
+        with self._lock:
+            for key in list(self._models):
+                if model_name is not None and key[0] != model_name:
+                    continue
+                if device is not None and key[1] != device:
+                    continue
+                del self._models[key]
+
+    def cached(self) -> List[Dict[str, Any]]:
+        """Describe the cached models from least to most recently used."""
+        with self._lock:
+            return [
+                {"model_name": key[0], "device": key[1], "num_bytes": num_bytes}
+                for key, (_, num_bytes) in self._models.items()
+            ]
+
+    def total_bytes(self) -> int:
+        """Return the combined size of the cached model weights."""
+        with self._lock:
+            return sum(num_bytes for _, num_bytes in self._models.values())
+
+    def _evict_to_fit(self):
+        while len(self._models) > 1 and self.total_bytes() > self.max_bytes:
+            self._models.popitem(last=False)
+
+
+def _model_num_bytes(model: Any) -> int:
+    """Return the size in bytes of the parameters and buffers of a model."""
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+_model_cache = _ModelCache(max_bytes=cache_settings.whisper_model_cache_max_bytes)
+
+
+def preload_model(model_name: str = "base.en", device: str = "cpu") -> None:
+    """Load a local Whisper model into the process-wide model cache.
+
+    Subsequent local transcriptions with the same model and device reuse
+    the loaded model instead of reading the weights from disk again.
+
+    Parameters
+    ----------
+    model_name : str, optional
+        Name of the whisper model to load, by default "base.en".
+    device : str, optional
+        The device on which to load the model, by default "cpu".
+    """
+    _model_cache.get(model_name, device=device)
+
+
+def evict_model(model_name: Optional[str] = None, device: Optional[str] = None):
+    """Remove local Whisper models from the process-wide model cache.
+
+    Parameters
+    ----------
+    model_name : str, optional
+        Name of the whisper model to evict. If None, models with any name
+        are evicted.
+    device : str, optional
+        Device of the models to evict. If None, models on any device are
+        evicted.
+    """
+    _model_cache.evict(model_name, device=device)
+
+
+def set_model_cache_limit(max_bytes: int) -> None:
+    """Set the memory ceiling of the process-wide model cache.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Maximum combined size in bytes of the cached model weights. Least
+        recently used models are evicted until the cache fits.
+    """
+    with _model_cache._lock:
+        _model_cache.max_bytes = max_bytes
+        _model_cache._evict_to_fit()
+
+
+def cached_models() -> List[Dict[str, Any]]:
+    """List the models held in the process-wide model cache.
+
+    Returns
+    -------
+    models : list[dict]
+        One dictionary per cached model with the keys ``model_name``,
+        ``device`` and ``num_bytes``, ordered from least to most recently used.
+    """
+    return _model_cache.cached()
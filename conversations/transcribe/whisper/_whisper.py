@@ -1,10 +1,28 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import math
+import multiprocessing
+import os
+import tempfile
 
 from openai import OpenAI
-import whisper
+import torch
 
 from conversations.config import settings
+from conversations._audio import (
+    SAMPLE_RATE,
+    decoded_audio_file,
+    _memmap_wav,
+    _pcm_to_float,
+)
+from .._chunking import (
+    _find_silence_splits,
+    _iter_stitched_segments,
+    _stitch_transcripts,
+)
+from .._transcode import split_for_upload
+from ._model_cache import _model_cache
 
 client = OpenAI()
 
@@ -14,6 +32,8 @@ def process(
     model_name: str = "base.en",
     prompt: str | None = None,
     language: str = "en",
+    num_workers: Optional[int] = 1,
+    compress_upload: bool = False,
 ) -> Dict[str, str]:
     """Transcribe audio using Whisper.
 
@@ -28,6 +48,15 @@ def process(
         Prompt to use for the transcription, by default None.
     language : str, optional
         Language to use for the transcription, by default "en".
+    num_workers : int, None, optional
+        Number of worker processes used by local models. If greater than one,
+        the recording is split into windows at pauses in the speech and the
+        windows are transcribed in parallel. If None, one worker per CPU core
+        is used. By default 1. Ignored by the cloud service.
+    compress_upload : bool, optional
+        If True, the cloud service is sent low bitrate mono speech audio,
+        split into pieces below the upload size limit that are uploaded
+        concurrently. By default False. Ignored by local models.
 
     Returns
     -------
@@ -35,16 +64,29 @@ def process(
         Dictionary containing the audio transcript in whisper format.
     """
     if model_name == "openai.en":
-        result = _cloud_whisper(audio_file, prompt=prompt, language=language)
+        result = _cloud_whisper(
+            audio_file,
+            prompt=prompt,
+            language=language,
+            compress_upload=compress_upload,
+        )
     else:
         result = _local_whisper(
-            audio_file, model_name=model_name, prompt=prompt, language=language
+            audio_file,
+            model_name=model_name,
+            prompt=prompt,
+            language=language,
+            num_workers=num_workers,
         )
     return result
 
 
 def _cloud_whisper(
-    audio_file: Path, prompt: str | None = None, language: str = "en"
+    audio_file: Path,
+    prompt: str | None = None,
+    language: str = "en",
+    compress_upload: bool = False,
+    max_concurrent_uploads: int = 4,
 ) -> Dict[str, str]:
     """Transcribe audio using OpenAI's Whisper API.
 
@@ -56,12 +98,42 @@ def _cloud_whisper(
         Prompt to use for the transcription, by default None.
     language : str, optional
         Language to use for the transcription, by default "en".
+    compress_upload : bool, optional
+        If True, transcode the audio to low bitrate mono speech audio split
+        into pieces below ``settings.openai_max_upload_bytes``, transcribe the
+        pieces concurrently and merge the results. By default False.
+    max_concurrent_uploads : int, optional
+        Maximum number of pieces uploaded at the same time, by default 4.
 
     Returns
     -------
     transcript : Dict[str, str]
         Dictionary containing the audio transcript in whisper format.
     """
+    if not compress_upload:
+        return _cloud_whisper_request(audio_file, prompt=prompt, language=language)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pieces = split_for_upload(
+            audio_file, Path(tmp_dir), max_bytes=settings.openai_max_upload_bytes
+        )
+        with ThreadPoolExecutor(max_workers=max_concurrent_uploads) as executor:
+            results = list(
+                executor.map(
+                    lambda piece: _cloud_whisper_request(
+                        piece[0], prompt=prompt, language=language
+                    ),
+                    pieces,
+                )
+            )
+
+    return _stitch_transcripts(results, [offset for _, offset in pieces])
+
+
+def _cloud_whisper_request(
+    audio_file: Path, prompt: str | None = None, language: str = "en"
+) -> Dict[str, Any]:
+    """Send a single file to OpenAI's Whisper API."""
     if prompt is None:
         result = client.audio.transcriptions.create(
             file=audio_file,
@@ -86,6 +158,7 @@ def _local_whisper(
     device: str = "cpu",
     prompt: str | None = None,
     language: str = "en",
+    num_workers: Optional[int] = 1,
 ) -> Dict[str, str]:
     """Transcribe audio using a local Whisper model.
 
@@ -102,13 +175,178 @@ def _local_whisper(
         Prompt to use for the transcription, by default None.
     language : str, optional
         Language to use for the transcription, by default "en".
+    num_workers : int, None, optional
+        Number of worker processes to transcribe with. If None, one worker
+        per CPU core is used. By default 1.
 
     Returns
     -------
     transcript : Dict[str, str]
         Dictionary containing the audio transcript in whisper format.
+
+    Notes
+    -----
+    The model is loaded through the process-wide model cache, so repeated
+    transcriptions with the same model and device only load the weights once.
+    The recording is decoded once into a sidecar file that is shared with the
+    diariser and reused by later transcriptions.
     """
-    model = whisper.load_model(model_name, device=device)
-    audio = whisper.load_audio(str(audio_file))
-    result = model.transcribe(audio, prompt=prompt, language=language)
-    return result
+    wav_file = decoded_audio_file(audio_file)
+    pcm = _memmap_wav(wav_file)
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+
+    splits = _find_silence_splits(pcm, SAMPLE_RATE, num_workers)
+    if len(splits) == 2:
+        model = _model_cache.get(model_name, device=device)
+        return model.transcribe(_pcm_to_float(pcm), prompt=prompt, language=language)
+
+    windows = list(zip(splits[:-1], splits[1:]))
+    offsets = [start / SAMPLE_RATE for start in splits[:-1]]
+    results = list(
+        _map_windows(
+            wav_file, windows, num_workers, model_name, device, prompt, language
+        )
+    )
+
+    return _stitch_transcripts(results, offsets)
+
+
+def process_stream(
+    audio_file: Path,
+    model_name: str = "base.en",
+    prompt: str | None = None,
+    language: str = "en",
+    num_workers: Optional[int] = 1,
+    window_seconds: float = 300.0,
+    compress_upload: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """Transcribe audio using Whisper, yielding segments as they are decoded.
+
+    Parameters
+    ----------
+    audio_file : Path
+        Path to the audio file.
+    model_name : str, optional
+        Name of the whisper model to use. To use the cloud service
+        provided by OpenAI, use "openai.en", by default "base.en".
+    prompt : str, optional
+        Prompt to use for the transcription, by default None.
+    language : str, optional
+        Language to use for the transcription, by default "en".
+    num_workers : int, None, optional
+        Number of worker processes used by local models. If None, one worker
+        per CPU core is used. By default 1. Ignored by the cloud service.
+    window_seconds : float, optional
+        Approximate length of the windows that local models decode at a time.
+        Segments of a window are yielded as soon as the window is decoded.
+        By default 300.
+    compress_upload : bool, optional
+        If True, the cloud service is sent low bitrate mono speech audio.
+        By default False. Ignored by local models.
+
+    Yields
+    ------
+    segment : dict
+        Transcript segment in whisper format, with at least the keys
+        ``start``, ``end`` and ``text``.
+    """
+    if model_name == "openai.en":
+        result = _cloud_whisper(
+            audio_file,
+            prompt=prompt,
+            language=language,
+            compress_upload=compress_upload,
+        )
+        yield from result["segments"]  # type: ignore
+        return
+
+    wav_file = decoded_audio_file(audio_file)
+    pcm = _memmap_wav(wav_file)
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+
+    duration = len(pcm) / SAMPLE_RATE
+    num_windows = max(num_workers, math.ceil(duration / window_seconds))
+    splits = _find_silence_splits(
+        pcm,
+        SAMPLE_RATE,
+        num_windows,
+        min_window_seconds=min(60.0, window_seconds),
+    )
+    windows = list(zip(splits[:-1], splits[1:]))
+    offsets = [start / SAMPLE_RATE for start in splits[:-1]]
+
+    yield from _iter_stitched_segments(
+        _map_windows(
+            wav_file, windows, num_workers, model_name, "cpu", prompt, language
+        ),
+        offsets,
+    )
+
+
+def _map_windows(
+    wav_file: Path,
+    windows: List[Tuple[int, int]],
+    num_workers: int,
+    model_name: str,
+    device: str,
+    prompt: str | None,
+    language: str,
+) -> Iterator[Dict[str, Any]]:
+    """Transcribe windows of audio, yielding the results in window order.
+
+    Windows are given as start and stop sample indices into the decoded WAV
+    file. With a single worker the windows are transcribed one at a time in
+    this process. Otherwise they are transcribed in a pool of worker processes
+    that share the CPU cores between them, each memory mapping its own window.
+    """
+    if num_workers == 1:
+        for window in windows:
+            yield _transcribe_window(
+                wav_file, window, model_name, device, prompt, language
+            )
+        return
+
+    num_workers = min(num_workers, len(windows))
+    num_threads = max(1, (os.cpu_count() or 1) // num_workers)
+    executor = ProcessPoolExecutor(
+        max_workers=num_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(num_threads,),
+    )
+    try:
+        yield from executor.map(
+            _transcribe_window,
+            [wav_file] * len(windows),
+            windows,
+            [model_name] * len(windows),
+            [device] * len(windows),
+            [prompt] * len(windows),
+            [language] * len(windows),
+        )
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _init_worker(num_threads: int):
+    """Share the CPU cores between the transcription worker processes."""
+    torch.set_num_threads(num_threads)
+
+
+def _transcribe_window(
+    wav_file: Path,
+    window: Tuple[int, int],
+    model_name: str,
+    device: str,
+    prompt: str | None,
+    language: str,
+) -> Dict[str, Any]:
+    """Transcribe one window of a decoded WAV file."""
+    start, stop = window
+    audio = _pcm_to_float(_memmap_wav(wav_file)[start:stop])
+    model = _model_cache.get(model_name, device=device)
+    return model.transcribe(audio, prompt=prompt, language=language)
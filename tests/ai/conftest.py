@@ -0,0 +1,20 @@
+import pytest
+import tiktoken
+
+from conversations.ai import _chatgpt, _tokens
+
+# Tokenizer with one token per byte, which does not need to be downloaded
+_byte_encoding = tiktoken.Encoding(
+    name="bytes",
+    pat_str=r"\s+|\S+",
+    mergeable_ranks={bytes([i]): i for i in range(256)},
+    special_tokens={},
+)
+
+
+@pytest.fixture
+def byte_encoding(monkeypatch):
+    """Count tokens with one token per byte, for tests that run offline."""
+    monkeypatch.setattr(_chatgpt, "_encoding", lambda model: _byte_encoding)
+    monkeypatch.setattr(_tokens, "_encoding", lambda model: _byte_encoding)
+    return _byte_encoding
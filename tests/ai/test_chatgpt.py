@@ -1,7 +1,15 @@
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 from openai import OpenAI
-from conversations.ai._chatgpt import summarise, query
-from conversations.config import settings
+import pytest
+from conversations.ai import _chatgpt, usage_stats
+from conversations.ai import ResponseStream
+from conversations.ai._chatgpt import (
+    query,
+    query_many,
+    summarise,
+    summarise_stream,
+)
+from conversations.config import cache_settings, settings
 
 
 @patch.object(OpenAI, "chat")
@@ -20,3 +28,224 @@ def test_query_uses_settings_model(mock_chat):
     # Check the model argument in the call_args
     _, kwargs = mock_chat.completions.create.call_args
     assert kwargs["model"] == settings.openai_text_model
+
+
+def _response(content, prompt_tokens, completion_tokens, cached_tokens=0):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    response.usage.prompt_tokens = prompt_tokens
+    response.usage.completion_tokens = completion_tokens
+    response.usage.prompt_tokens_details.cached_tokens = cached_tokens
+    return response
+
+
+@pytest.fixture
+def mock_client(monkeypatch, byte_encoding):
+    client = MagicMock()
+    monkeypatch.setattr(_chatgpt, "client", client)
+    monkeypatch.setattr(cache_settings, "response_cache_enabled", False)
+    return client
+
+
+def test_query_many_concurrent(mock_client, monkeypatch):
+    monkeypatch.setattr(settings, "openai_max_concurrency", 4)
+    started, finished = [], []
+
+    def create(model, temperature, messages):
+        question = (
+            messages[-1]["content"].split("question:\n\n")[1].split("\n")[0].strip()
+        )
+        started.append((question, len(finished)))
+        finished.append(question)
+        return _response(f"Answer to {question}", 100, len(question), 80)
+
+    mock_client.chat.completions.create.side_effect = create
+    answers = query_many("test transcript", ["Who?", "Where exactly?", "When?"])
+
+    # The first question is answered before the others are sent
+    assert started[0] == ("Who?", 0)
+    assert all(num_finished >= 1 for _, num_finished in started[1:])
+
+    assert answers == {
+        "Who?": {
+            "answer": "Answer to Who?",
+            "prompt_tokens": 100,
+            "cached_prompt_tokens": 80,
+            "completion_tokens": 4,
+        },
+        "Where exactly?": {
+            "answer": "Answer to Where exactly?",
+            "prompt_tokens": 100,
+            "cached_prompt_tokens": 80,
+            "completion_tokens": 14,
+        },
+        "When?": {
+            "answer": "Answer to When?",
+            "prompt_tokens": 100,
+            "cached_prompt_tokens": 80,
+            "completion_tokens": 5,
+        },
+    }
+    # Every prompt starts with the transcript
+    prompts = [
+        call.kwargs["messages"][-1]["content"]
+        for call in mock_client.chat.completions.create.call_args_list
+    ]
+    prefix = prompts[0][: prompts[0].index("Who?")]
+    assert "test transcript" in prefix
+    assert all(prompt.startswith(prefix) for prompt in prompts)
+
+
+def test_query_many_packed(mock_client):
+    mock_client.chat.completions.create.return_value = _response(
+        '```json\n{"1": "Alice", "2": "In the office"}\n```', 1010, 30, 900
+    )
+    answers = query_many("test transcript", ["Who?", "Where?"], batch="packed")
+
+    mock_client.chat.completions.create.assert_called_once()
+    prompt = mock_client.chat.completions.create.call_args.kwargs["messages"][-1]
+    assert "1. Who?\n    2. Where?" in prompt["content"]
+
+    # Shared prompt tokens are split equally, completion tokens by answer
+    assert answers == {
+        "Who?": {
+            "answer": "Alice",
+            "prompt_tokens": 504,
+            "cached_prompt_tokens": 450,
+            "completion_tokens": 8,
+        },
+        "Where?": {
+            "answer": "In the office",
+            "prompt_tokens": 506,
+            "cached_prompt_tokens": 450,
+            "completion_tokens": 22,
+        },
+    }
+
+    # Only the packed prompt asks for the format of the answers
+    assert "markdown" not in prompt["content"]
+
+    mock_client.chat.completions.create.return_value = _response("Sorry", 1, 1)
+    with pytest.raises(ValueError, match="Sorry"):
+        query_many("test transcript", ["Who?"], batch="packed")
+    with pytest.raises(ValueError, match="batch"):
+        query_many("test transcript", ["Who?"], batch="unknown")
+
+
+def test_query_many_packed_does_not_cache_unreadable_replies(
+    mock_client, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(cache_settings, "response_cache_enabled", True)
+    monkeypatch.setattr(cache_settings, "cache_dir", tmp_path)
+    mock_client.chat.completions.create.return_value = _response("Sorry", 1, 1)
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="Sorry"):
+            query_many("test transcript", ["Who?"], batch="packed")
+    assert mock_client.chat.completions.create.call_count == 2
+
+    mock_client.chat.completions.create.return_value = _response('{"1": "Al"}', 1, 1)
+    for _ in range(2):
+        answers = query_many("test transcript", ["Who?"], batch="packed")
+        assert answers["Who?"]["answer"] == "Al"
+    assert mock_client.chat.completions.create.call_count == 3
+
+    # Cached answers used no tokens
+    assert answers["Who?"] == {
+        "answer": "Al",
+        "prompt_tokens": 0,
+        "cached_prompt_tokens": 0,
+        "completion_tokens": 0,
+    }
+
+
+def test_prompts_share_a_transcript_prefix(mock_client):
+    mock_client.chat.completions.create.return_value = _response("Text", 100, 10, 60)
+    usage_stats.reset()
+
+    summarise("test transcript")
+    query("test transcript", "Who?")
+    summary, answer = [
+        call.kwargs["messages"]
+        for call in mock_client.chat.completions.create.call_args_list
+    ]
+
+    # Only the instructions at the end of the prompts differ
+    assert summary[0] == answer[0]
+    prefix = summary[1]["content"][: summary[1]["content"].index("First, write")]
+    assert "test transcript" in prefix
+    assert answer[1]["content"].startswith(prefix)
+
+    assert usage_stats.as_dict() == {
+        "requests": 2,
+        "cached_responses": 0,
+        "prompt_tokens": 200,
+        "cached_prompt_tokens": 120,
+        "uncached_prompt_tokens": 80,
+        "completion_tokens": 20,
+    }
+
+
+def _chunk(content=None, usage=None):
+    chunk = MagicMock()
+    chunk.choices = [] if content is None else [MagicMock()]
+    if content is not None:
+        chunk.choices[0].delta.content = content
+    chunk.usage = usage
+    return chunk
+
+
+def test_summarise_stream(mock_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_settings, "cache_dir", tmp_path)
+    monkeypatch.setattr(cache_settings, "response_cache_enabled", True)
+    usage = _response("", 100, 3, 40).usage
+    mock_client.chat.completions.create.side_effect = lambda **kwargs: MagicMock(
+        __iter__=lambda self: iter(
+            [_chunk("The "), _chunk(""), _chunk("summary"), _chunk(usage=usage)]
+        )
+    )
+
+    stream = summarise_stream("test transcript")
+    mock_client.chat.completions.create.assert_not_called()
+    assert list(stream) == ["The ", "summary"]
+    assert stream.text == "The summary"
+    assert stream.usage == {
+        "prompt_tokens": 100,
+        "cached_prompt_tokens": 40,
+        "completion_tokens": 3,
+    }
+    assert 0 <= stream.time_to_first_token <= stream.latency
+    _, kwargs = mock_client.chat.completions.create.call_args
+    assert kwargs["stream"] is True
+
+    # Streamed responses are cached like complete ones
+    assert summarise("test transcript") == "The summary"
+    assert list(summarise_stream("test transcript")) == ["The summary"]
+    assert mock_client.chat.completions.create.call_count == 1
+
+    # Empty replies are not cached
+    mock_client.chat.completions.create.side_effect = lambda **kwargs: MagicMock(
+        __iter__=lambda self: iter([_chunk(""), _chunk(usage=usage)])
+    )
+    for call_count in [2, 3]:
+        assert summarise_stream("other transcript").read() == ""
+        assert mock_client.chat.completions.create.call_count == call_count
+
+
+def test_response_stream_timings():
+    now = [0.0]
+
+    def deltas():
+        now[0] += 2
+        yield "Hello"
+        now[0] += 3
+        yield " world"
+
+    completed = []
+    stream = ResponseStream(
+        deltas(), on_complete=completed.append, clock=lambda: now[0]
+    )
+    assert next(iter(stream)) == "Hello"
+    assert stream.read() == "Hello world"
+    assert (stream.time_to_first_token, stream.latency) == (2, 5)
+    assert completed == ["Hello world"]
@@ -0,0 +1,91 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+import json
+import os
+
+from conversations.ai import _chatgpt
+from conversations.ai._cache import ResponseCache
+from conversations.config import cache_settings
+
+messages = [{"role": "user", "content": "Hello"}]
+
+
+def test_cache_key_depends_on_request():
+    key = ResponseCache.key("gpt-4o", 0.3, messages)
+    assert key == ResponseCache.key("gpt-4o", 0.3, messages)
+    assert key != ResponseCache.key("gpt-4.1-mini", 0.3, messages)
+    assert key != ResponseCache.key("gpt-4o", 0.0, messages)
+    assert key != ResponseCache.key(
+        "gpt-4o", 0.3, [{"role": "user", "content": "Hello!"}]
+    )
+
+
+def test_cache_round_trip(tmp_path: Path):
+    cache = ResponseCache(tmp_path, max_bytes=10_000_000)
+
+    assert cache.get("missing") is None
+    cache.put("key", "Response")
+    assert cache.get("key") == "Response"
+
+    cache.clear()
+    assert cache.get("key") is None
+
+
+def test_cache_expires_responses(tmp_path: Path):
+    cache = ResponseCache(tmp_path, max_bytes=10_000_000, ttl_seconds=60)
+    cache.put("key", "Response")
+    assert cache.get("key") == "Response"
+
+    entry = json.loads((tmp_path / "key.json").read_text())
+    entry["created"] -= 120
+    (tmp_path / "key.json").write_text(json.dumps(entry))
+    assert cache.get("key") is None
+    assert not (tmp_path / "key.json").exists()
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path):
+    cache = ResponseCache(tmp_path, max_bytes=2500)
+
+    cache.put("old", "x" * 1000)
+    cache.put("used", "x" * 1000)
+    os.utime(tmp_path / "old.json", (1, 1))
+    os.utime(tmp_path / "used.json", (2, 2))
+    cache.get("used")
+    cache.put("new", "x" * 1000)
+
+    assert cache.get("old") is None
+    assert cache.get("used") == "x" * 1000
+    assert cache.get("new") == "x" * 1000
+
+
+def test_create_chat_completion_is_cached(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(cache_settings, "cache_dir", tmp_path)
+    client = MagicMock()
+    client.chat.completions.create.return_value.choices[0].message.content = "Hi"
+
+    for _ in range(2):
+        content, usage = _chatgpt._create_chat_completion(
+            messages, "gpt-4o", 0.3, openai_client=client
+        )
+        assert content == "Hi"
+    # Cached responses use no tokens
+    assert usage == {
+        "prompt_tokens": 0,
+        "cached_prompt_tokens": 0,
+        "completion_tokens": 0,
+    }
+    assert client.chat.completions.create.call_count == 1
+
+    # Bypassing the cache always makes a request
+    _chatgpt._create_chat_completion(
+        messages, "gpt-4o", 0.3, use_cache=False, openai_client=client
+    )
+    assert client.chat.completions.create.call_count == 2
+    monkeypatch.setattr(cache_settings, "response_cache_enabled", False)
+    _chatgpt._create_chat_completion(messages, "gpt-4o", 0.3, openai_client=client)
+    assert client.chat.completions.create.call_count == 3
+
+    # A different request is not served from the cache
+    monkeypatch.setattr(cache_settings, "response_cache_enabled", True)
+    _chatgpt._create_chat_completion(messages, "gpt-4o", 0.0, openai_client=client)
+    assert client.chat.completions.create.call_count == 4
@@ -0,0 +1,57 @@
+import pytest
+
+from conversations.ai._retrieval import RetrievalIndex, _split_passages
+
+transcript = (
+    "Meeting Transcript from 2024-01-01"
+    "\n\nAlice: Welcome everyone to the planning meeting."
+    "\n\nBob: Thanks. The budget for the new office is forty thousand."
+    "\n\nAlice: Great, and when does the lease start?"
+    "\n\nBob: The lease starts in March."
+    "\n\nAlice: Lovely weather today."
+    "\n\nBob: Indeed, very sunny."
+)
+
+pytestmark = pytest.mark.usefixtures("byte_encoding")
+
+
+def test_split_passages():
+    passages = _split_passages(transcript)
+    assert len(passages) == 7
+    assert "".join(passages) == transcript
+
+    # Long turns are split without losing text
+    long_turn = "\n\nAlice:" + " word" * 25
+    passages = _split_passages(long_turn, words_per_passage=10)
+    assert len(passages) == 3
+    assert "".join(passages) == long_turn
+
+
+def test_search_ranks_matching_passages():
+    index = RetrievalIndex(transcript)
+    assert index.search("What is the budget?", top_k=1) == [2]
+    assert index.search("lease", top_k=5) == [4, 3]
+    assert index.search("unrelated question") == []
+
+
+def test_context_adds_neighbours_within_budget():
+    index = RetrievalIndex(transcript)
+
+    context = index.context("budget office", top_k=1, neighbours=0)
+    assert context == (
+        "[...]\n\nBob: Thanks. The budget for the new office is forty thousand.\n\n[...]"
+    )
+
+    context = index.context("budget office", top_k=1, neighbours=1)
+    assert context.startswith("[...]\n\nAlice: Welcome")
+    assert context.endswith("lease start?\n\n[...]")
+
+    # Neighbours that do not fit in the budget are left out
+    budget = int(index.tokens.counts[2] + index.tokens.counts[3])
+    context = index.context("budget office", neighbours=1, max_tokens=budget)
+    assert "Welcome" not in context
+    assert "lease start?" in context
+
+    # Without a match, the start of the transcript is sent
+    context = index.context("unrelated question", max_tokens=60)
+    assert context.startswith("Meeting Transcript")
@@ -0,0 +1,242 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+
+from openai import OpenAI
+import pytest
+
+from conversations.ai import _chatgpt, _shorten_transcript
+from conversations.ai._scheduler import (
+    BudgetExceededError,
+    RateLimiter,
+    RequestBudget,
+    map_concurrently,
+)
+from conversations.config import cache_settings, settings
+
+
+class _StandInOpenAI(BaseHTTPRequestHandler):
+    """Minimal stand-in for the OpenAI chat completions endpoint."""
+
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    requests: list = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        cls = type(self)
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with cls.lock:
+            cls.requests.append(request)
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(0.05)
+        with cls.lock:
+            cls.in_flight -= 1
+
+        messages = request["messages"]
+        if len(messages) > 2:
+            # Recursive pass, keep the previous shortened transcript
+            content = messages[-2]["content"]
+        else:
+            chunk = messages[-1]["content"].split("Meeting transcript:", 1)[1]
+            content = chunk.strip().split("\n")[0].split(":")[0]
+
+        data = json.dumps(
+            {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": request["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 1,
+                    "completion_tokens": 1,
+                    "total_tokens": 2,
+                },
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def stand_in_client(monkeypatch, byte_encoding):
+    _StandInOpenAI.requests = []
+    _StandInOpenAI.max_in_flight = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInOpenAI)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = OpenAI(
+        base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", api_key="test"
+    )
+    monkeypatch.setattr(_shorten_transcript, "client", client)
+    monkeypatch.setattr(cache_settings, "response_cache_enabled", False)
+    yield client
+    server.shutdown()
+
+
+def test_shorten_transcript_concurrently(stand_in_client, monkeypatch):
+    monkeypatch.setattr(settings, "openai_max_concurrency", 3)
+    transcript = "".join(f"\n\nSpeaker {idx}: " + "word " * 10 for idx in range(12))
+    # Chunks of 130 tokens, with room for the reply sent in the second pass
+    max_prompt_tokens = _shorten_transcript._prompt_overhead(2) + 2 * 130
+
+    shortened = _shorten_transcript._shorten_transcript(
+        transcript, max_prompt_tokens=max_prompt_tokens, shorten_iterations=2
+    )
+
+    # Chunks of two turns, shortened to their first speaker in order
+    assert shortened == "\n\n".join(f"Speaker {idx}" for idx in range(0, 12, 2))
+    assert len(_StandInOpenAI.requests) == 12
+    assert 1 < _StandInOpenAI.max_in_flight <= 3
+    # Every pass, including the second with the reply, fits the limit
+    assert all(
+        _chatgpt._num_tokens_from_messages(request["messages"], model="gpt-4o")
+        <= max_prompt_tokens
+        for request in _StandInOpenAI.requests
+    )
+
+
+def test_shorten_transcript_levels(stand_in_client):
+    transcript = "".join(f"\n\nSpeaker {idx}: " + "word " * 10 for idx in range(60))
+    max_prompt_tokens = _shorten_transcript._prompt_overhead() + 130
+    levels = []
+
+    shortened = _shorten_transcript._shorten_transcript(
+        transcript,
+        max_prompt_tokens=max_prompt_tokens,
+        shorten_iterations=1,
+        levels=levels,
+    )
+
+    # Only the summaries of the first level are merged and shortened again
+    assert [len(level) for level in levels] == [30, 30, 3]
+    assert levels[1][:2] == ["Speaker 0", "Speaker 2"]
+    assert shortened == "\n\n".join(levels[2])
+    assert len(_StandInOpenAI.requests) == 33
+
+    # Completed levels are reused
+    _StandInOpenAI.requests = []
+    again = _shorten_transcript._shorten_transcript(
+        transcript,
+        max_prompt_tokens=max_prompt_tokens,
+        shorten_iterations=1,
+        levels=levels[:2],
+    )
+    assert again == shortened
+    assert len(_StandInOpenAI.requests) == 3
+
+
+def test_shorten_transcript_budget(stand_in_client, monkeypatch):
+    monkeypatch.setattr(settings, "openai_max_concurrency", 1)
+    transcript = "".join(f"\n\nSpeaker {idx}: " + "word " * 10 for idx in range(60))
+    max_prompt_tokens = _shorten_transcript._prompt_overhead() + 130
+    levels = []
+
+    with pytest.raises(BudgetExceededError):
+        _shorten_transcript._shorten_transcript(
+            transcript,
+            max_prompt_tokens=max_prompt_tokens,
+            shorten_iterations=1,
+            levels=levels,
+            max_requests=10,
+        )
+    assert len(_StandInOpenAI.requests) == 10
+    assert len(levels) == 1
+
+    with pytest.raises(BudgetExceededError):
+        _shorten_transcript._shorten_transcript(
+            transcript,
+            max_prompt_tokens=max_prompt_tokens,
+            shorten_iterations=1,
+            max_tokens=1000,
+        )
+
+
+def test_shorten_transcript_empty_summary(stand_in_client, monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_settings, "response_cache_enabled", True)
+    monkeypatch.setattr(cache_settings, "cache_dir", tmp_path)
+    monkeypatch.setattr(settings, "openai_max_concurrency", 1)
+    # Turns without a speaker are shortened to an empty reply
+    transcript = "".join("\n\n: " + "word " * 10 for _ in range(12))
+    max_prompt_tokens = _shorten_transcript._prompt_overhead() + 130
+
+    for num_requests in [1, 2]:
+        with pytest.raises(ValueError, match="empty summary"):
+            _shorten_transcript._shorten_transcript(
+                transcript, max_prompt_tokens=max_prompt_tokens, shorten_iterations=1
+            )
+        # Empty replies are not cached, so are requested again
+        assert len(_StandInOpenAI.requests) == num_requests
+
+
+def test_request_budget():
+    budget = RequestBudget(max_requests=2, max_tokens=100)
+    budget.charge(60)
+    with pytest.raises(BudgetExceededError, match="100 tokens"):
+        budget.charge(50)
+    budget.charge(40)
+    assert (budget.requests, budget.tokens) == (2, 100)
+    with pytest.raises(BudgetExceededError, match="2 requests"):
+        budget.charge(0)
+
+
+def test_rate_limiter():
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    limiter = RateLimiter(2, 100, clock=lambda: now[0], sleep=sleep)
+    limiter.acquire(10)
+    limiter.acquire(10)
+    assert now[0] == 0
+
+    # One request is allowed every 30 seconds
+    limiter.acquire(10)
+    assert now[0] == pytest.approx(30)
+
+    # Waits for both a request and the tokens
+    limiter.acquire(100)
+    assert now[0] == pytest.approx(60)
+    limiter.acquire(90)
+    assert now[0] == pytest.approx(114)
+
+    # Requests larger than the budget wait for the full budget
+    limiter.acquire(1000)
+    assert now[0] == pytest.approx(174)
+
+
+def test_map_concurrently():
+    def slow_square(value):
+        time.sleep(0.01 * (5 - value))
+        return value**2
+
+    assert map_concurrently(slow_square, range(5), max_concurrency=5) == [
+        0,
+        1,
+        4,
+        9,
+        16,
+    ]
+    assert map_concurrently(slow_square, [2], max_concurrency=1) == [4]
+
+    def fail(value):
+        raise ValueError(value)
+
+    with pytest.raises(ValueError):
+        map_concurrently(fail, range(3), max_concurrency=2)
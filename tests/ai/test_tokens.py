@@ -0,0 +1,116 @@
+import pytest
+
+from conversations.ai import _chatgpt, _shorten_transcript
+from conversations.ai._chatgpt import ChunkTooLongError
+from conversations.ai._tokens import TokenIndex, _split_turns
+
+transcript = "Meeting Transcript" + "".join(
+    f"\n\nSpeaker {idx % 2}: " + "word " * (idx + 1) for idx in range(8)
+)
+
+pytestmark = pytest.mark.usefixtures("byte_encoding")
+
+
+def test_split_turns():
+    turns = _split_turns(transcript)
+    assert len(turns) == 9
+    assert "".join(turns) == transcript
+    assert all(turn.startswith("\n\nSpeaker") for turn in turns[1:])
+
+    assert _split_turns(" Hello there. Hi!") == [" Hello", " there.", " Hi!"]
+
+
+def test_token_index():
+    index = TokenIndex(_split_turns(transcript))
+    assert index.num_tokens() == len(transcript.encode())
+    for first, last in [(0, 1), (2, 5), (3, 9), (4, 4)]:
+        text = index.text(first, last)
+        assert index.num_tokens(first, last) == len(text.encode())
+
+
+def test_chunk_transcript_at_turns(monkeypatch, byte_encoding):
+    calls = []
+    encode_ordinary_batch = byte_encoding.encode_ordinary_batch
+
+    def counting_encode(pieces):
+        calls.append(len(pieces))
+        return encode_ordinary_batch(pieces)
+
+    monkeypatch.setattr(byte_encoding, "encode_ordinary_batch", counting_encode)
+    overhead = _shorten_transcript._prompt_overhead()
+    max_prompt_tokens = overhead + 100
+
+    chunks = _shorten_transcript._chunk_transcript(transcript, max_prompt_tokens)
+    assert "".join(chunks) == transcript
+    assert all(len(chunk.encode()) <= 100 for chunk in chunks)
+    assert all(chunk.startswith("\n\nSpeaker") for chunk in chunks[1:])
+    # Each turn is tokenized once
+    assert calls == [9]
+
+    # Turns are packed greedily
+    index = TokenIndex(_split_turns(transcript))
+    for first, last in _shorten_transcript._chunk_boundaries(index, 100):
+        assert index.num_tokens(first, last) <= 100
+        assert last == len(index) or index.num_tokens(first, last + 1) > 100
+
+    # A turn that is too long on its own is split at words
+    long_turn = "\n\nSpeaker 0: " + "word " * 50
+    chunks = _shorten_transcript._chunk_transcript(
+        transcript + long_turn, max_prompt_tokens
+    )
+    assert "".join(chunks) == transcript + long_turn
+    assert all(len(chunk.encode()) <= 100 for chunk in chunks)
+    # Turns that fit are kept whole
+    assert all(
+        any(turn in chunk for chunk in chunks) for turn in _split_turns(transcript)
+    )
+    assert not any(long_turn in chunk for chunk in chunks)
+
+    # A single word that is too long cannot be split
+    with pytest.raises(ChunkTooLongError):
+        _shorten_transcript._chunk_transcript(
+            transcript + "\n\nSpeaker 0: " + "w" * 150, max_prompt_tokens
+        )
+
+
+def test_chunk_boundaries_overlap():
+    index = TokenIndex(["a" * 10] * 10)
+    assert _shorten_transcript._chunk_boundaries(index, 35) == [
+        (0, 3),
+        (3, 6),
+        (6, 9),
+        (9, 10),
+    ]
+    assert _shorten_transcript._chunk_boundaries(index, 35, overlap_tokens=10) == [
+        (0, 3),
+        (2, 5),
+        (4, 7),
+        (6, 9),
+        (8, 10),
+    ]
+    # Overlap never stops the next piece fitting
+    assert _shorten_transcript._chunk_boundaries(index, 35, overlap_tokens=100) == [
+        (0, 3),
+        (1, 4),
+        (2, 5),
+        (3, 6),
+        (4, 7),
+        (5, 8),
+        (6, 9),
+        (7, 10),
+    ]
+
+    index = TokenIndex(["a" * 10, "a" * 50, "a" * 10])
+    with pytest.raises(ChunkTooLongError, match="Speaker turn 1"):
+        _shorten_transcript._chunk_boundaries(index, 35)
+
+
+def test_num_tokens_from_messages_aliases():
+    messages = [{"role": "user", "content": "Hello"}]
+    num_tokens = _chatgpt._num_tokens_from_messages(messages, model="gpt-4-0314")
+    assert num_tokens == 3 + len("user") + len("Hello") + 3
+    for model in ["gpt-4", "gpt-4-1106-preview"]:
+        assert _chatgpt._num_tokens_from_messages(messages, model=model) == num_tokens
+
+    with pytest.raises(NotImplementedError):
+        _chatgpt._num_tokens_from_messages(messages, model="unknown-model")
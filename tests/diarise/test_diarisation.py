@@ -1,5 +1,7 @@
 from conversations.diarise import simple
+from conversations.diarise.simple import _simple
 from pathlib import Path
+from unittest.mock import patch
 import pooch
 
 
@@ -12,3 +14,21 @@ audio_file = pooch.retrieve(
 def test_process():
     """Test whisper processing of audio."""
     assert True
+
+
+@patch("simple_diarizer.diarizer.Diarizer")
+def test_diarizer_is_cached(mock_diarizer):
+    """Test that diarisers are created once per configuration."""
+    simple.evict_diarizer()
+    simple.preload_diarizer()
+    simple.preload_diarizer()
+    assert mock_diarizer.call_count == 1
+
+    simple.preload_diarizer(embed_model="ecapa", cluster_method="ahc")
+    assert mock_diarizer.call_count == 2
+
+    simple.evict_diarizer(embed_model="xvec")
+    assert list(_simple._diarizers) == [("ecapa", "ahc")]
+    simple.preload_diarizer()
+    assert mock_diarizer.call_count == 3
+    simple.evict_diarizer()
@@ -0,0 +1,42 @@
+from io import StringIO
+
+from conversations.report import generate, iter_html, write_html
+
+transcript = {
+    "segments": [
+        {"start": 0.0, "end": 2.0, "text": 'Hello <b>"world"</b> & all'},
+        {"start": 2.0, "end": 3.0, "text": "there."},
+        {"start": 4.5, "end": 6.0, "text": "Hi!"},
+        {"start": 6.0, "end": 7.0, "text": "Bye."},
+    ]
+}
+diarisation = [
+    {"start": 0.0, "end": 4.0, "label": 0},
+    {"start": 4.0, "end": 6.5, "label": 1},
+    {"start": 6.5, "end": 8.0, "label": 0},
+]
+
+
+def test_iter_html_matches_generate():
+    for kwargs in [
+        dict(transcript=transcript),
+        dict(transcript=transcript, audio_file="audio & more.wav"),
+        dict(
+            transcript=transcript,
+            diarisation=diarisation,
+            audio_file="audio.wav",
+            speaker_mapping={"0": "Alice", "1": "<Bob>"},
+        ),
+    ]:
+        assert "".join(iter_html(**kwargs)) == generate(**kwargs).render()
+
+
+def test_write_html(tmp_path):
+    expected = generate(transcript, diarisation).render()
+
+    file = StringIO()
+    write_html(file, transcript, diarisation)
+    assert file.getvalue() == expected
+
+    write_html(tmp_path / "report.html", transcript, diarisation)
+    assert (tmp_path / "report.html").read_text() == expected
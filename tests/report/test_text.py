@@ -0,0 +1,63 @@
+from io import StringIO
+
+from conversations.report import export_text, iter_text, write_text
+
+transcript = {
+    "segments": [
+        {"start": 0.0, "end": 2.0, "text": "Hello"},
+        {"start": 2.0, "end": 3.0, "text": "there."},
+        {"start": 4.5, "end": 6.0, "text": "Hi!"},
+        {"start": 6.0, "end": 7.0, "text": "Bye."},
+    ]
+}
+diarisation = [
+    {"start": 0.0, "end": 4.0, "label": 0},
+    {"start": 4.0, "end": 6.5, "label": 1},
+    {"start": 6.5, "end": 8.0, "label": 0},
+]
+kwargs = dict(
+    transcript=transcript,
+    diarisation=diarisation,
+    speaker_mapping={"0": "Alice", "1": "Bob"},
+    datetimestr="2024-01-01 09:00:00",
+    attendees=["Alice", "Bob"],
+)
+expected = (
+    "Meeting Transcript from 2024-01-01 09:00:00 with Alice, Bob"
+    "\n\nAlice: Hello there.\n\nBob: Hi!\n\nAlice: Bye."
+)
+
+
+def test_export_text():
+    assert export_text(**kwargs) == expected
+    assert export_text(transcript) == " Hello there. Hi! Bye."
+
+
+def test_iter_text():
+    chunks = list(iter_text(**kwargs))
+    assert len(chunks) > 1
+    assert "".join(chunks) == expected
+
+
+def test_write_text(tmp_path):
+    file = StringIO()
+    write_text(file, **kwargs)
+    assert file.getvalue() == expected
+
+    write_text(tmp_path / "conversation.txt", **kwargs)
+    assert (tmp_path / "conversation.txt").read_text() == expected
+
+
+def test_speaker_mapping_applied_once():
+    # Swapping names must not map a speaker back to its original name
+    text = export_text(transcript, diarisation, speaker_mapping={"0": "1", "1": "0"})
+    assert text == "\n\n1: Hello there.\n\n0: Hi!\n\n1: Bye."
+
+    segments = [dict(seg, speaker="A") for seg in transcript["segments"]]
+    text = export_text({"segments": segments}, speaker_mapping={"A": "B", "B": "C"})
+    assert text == " Hello there. Hi! Bye."
+    assert "".join(iter_text({"segments": segments}, [{"note": ""}], {"A": "B"})) == (
+        "\n\nB: Hello there. Hi! Bye."
+    )
+    # Segments are not modified by the mapping
+    assert all(seg["speaker"] == "A" for seg in segments)
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from conversations.report._utils import (
+    _find_current_speaker,
+    _find_current_speakers,
+    _find_overlapping_speakers,
+    _group_transcript_segements_by_speaker,
+)
+
+
+def _random_diarisation(rng, num_segments=50):
+    edges = np.cumsum(rng.uniform(0.5, 10, num_segments + 1))
+    return [
+        {"start": float(start), "end": float(stop), "label": int(rng.integers(3))}
+        for start, stop in zip(edges[:-1], edges[1:])
+    ]
+
+
+def test_find_current_speakers_matches_loop():
+    rng = np.random.default_rng(0)
+    diarisation = _random_diarisation(rng)
+    times = rng.uniform(-5, diarisation[-1]["end"] + 5, 1000)
+    # Include times exactly at segment boundaries
+    times = np.concatenate([times, [seg["start"] for seg in diarisation]])
+
+    expected = [_find_current_speaker(t, diarisation) for t in times]
+    assert _find_current_speakers(times, diarisation) == expected
+
+    # Unsorted diarisation falls back to the loop
+    shuffled = [diarisation[i] for i in rng.permutation(len(diarisation))]
+    expected = [_find_current_speaker(t, shuffled) for t in times]
+    assert _find_current_speakers(times, shuffled) == expected
+
+
+def test_find_overlapping_speakers():
+    diarisation = [
+        {"start": 0.0, "end": 4.0, "label": "A"},
+        {"start": 4.0, "end": 5.0, "label": "B"},
+        {"start": 5.0, "end": 6.0, "label": "A"},
+        {"start": 8.0, "end": 9.0, "label": "B"},
+    ]
+    seg_starts = [0.5, 3.5, 3.0, 6.5]
+    seg_ends = [1.0, 5.5, 6.0, 7.0]
+
+    # Midpoint of 3.5-5.5 is in B, but A overlaps it the most
+    assert _find_current_speakers([4.5], diarisation) == ["B"]
+    assert _find_overlapping_speakers(seg_starts, seg_ends, diarisation) == [
+        "A",
+        "A",
+        "A",
+        # No overlap, so the speaker at the midpoint is used
+        _find_current_speaker(6.75, diarisation),
+    ]
+
+
+def test_group_transcript_alignment():
+    transcript = {
+        "segments": [
+            {"start": 0.0, "end": 2.0, "text": "Hello"},
+            {"start": 2.0, "end": 3.0, "text": "there."},
+            {"start": 3.0, "end": 6.0, "text": "Hi!"},
+        ]
+    }
+    diarisation = [
+        {"start": 0.0, "end": 4.0, "label": "A"},
+        {"start": 4.0, "end": 4.8, "label": "B"},
+        {"start": 4.8, "end": 10.0, "label": "A"},
+    ]
+
+    grouped = _group_transcript_segements_by_speaker(transcript, diarisation)
+    assert [seg["speaker"] for seg in grouped["segments"]] == ["A", "B"]
+    assert grouped["segments"][0]["text"] == "Hello there."
+
+    grouped = _group_transcript_segements_by_speaker(
+        transcript, diarisation, alignment="overlap"
+    )
+    assert [seg["speaker"] for seg in grouped["segments"]] == ["A"]
+    assert grouped["segments"][0]["end"] == 6.0
+
+    with pytest.raises(ValueError, match="alignment"):
+        _group_transcript_segements_by_speaker(
+            transcript, diarisation, alignment="nearest"
+        )
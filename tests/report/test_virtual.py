@@ -0,0 +1,90 @@
+from io import StringIO
+import json
+import re
+
+from conversations.report import iter_virtual_html, write_virtual_html
+
+transcript = {
+    "segments": [
+        {"start": 0.0, "end": 2.0, "text": "Hello </script> there"},
+        {"start": 2.0, "end": 3.0, "text": "world."},
+        {"start": 4.5, "end": 6.0, "text": "Hi!"},
+        {"start": 6.0, "end": 7.0, "text": "Bye."},
+    ]
+}
+diarisation = [
+    {"start": 0.0, "end": 4.0, "label": 0},
+    {"start": 4.0, "end": 6.5, "label": 1},
+    {"start": 6.5, "end": 8.0, "label": 0},
+]
+
+
+def _embedded_data(page):
+    match = re.search(
+        r'<script id="conversation-data" type="application/json">(.*?)</script>',
+        page,
+        flags=re.DOTALL,
+    )
+    return json.loads(match.group(1))
+
+
+def test_iter_virtual_html():
+    page = "".join(
+        iter_virtual_html(
+            transcript,
+            diarisation,
+            audio_file="audio.wav",
+            speaker_mapping={"0": "Alice", "1": "Bob"},
+        )
+    )
+    assert '<source src="audio.wav" type="audio/wav">' in page
+    assert 'id="search"' in page
+    # Segments are only rendered in the browser
+    assert "ml-8 mr-8 m-1" not in page.split("<script>")[0]
+
+    data = _embedded_data(page)
+    assert data == {
+        "headers": True,
+        "speakers": ["Alice", "Bob"],
+        "speaker": [0, 1, 0],
+        "start": [0.0, 4.5, 6.0],
+        "text": ["Hello </script> there world.", "Hi!", "Bye."],
+    }
+
+    data = _embedded_data("".join(iter_virtual_html(transcript)))
+    assert data["headers"] is False
+    assert data["speakers"] == ["unknown"]
+    assert len(data["text"]) == 4
+
+
+def test_write_virtual_html_sidecar(tmp_path):
+    html_file = tmp_path / "report.html"
+    data_file = tmp_path / "data" / "report.js"
+    data_file.parent.mkdir()
+    write_virtual_html(html_file, transcript, diarisation, data_file=data_file)
+
+    page = html_file.read_text()
+    assert '<script src="data/report.js"></script>' in page
+    assert "conversation-data" not in page.split("<script>")[0]
+
+    sidecar = data_file.read_text()
+    assert sidecar.startswith("window.conversationData = ")
+    data = json.loads(sidecar[len("window.conversationData = ") : -2])
+    assert data["speaker"] == [0, 1, 0]
+
+    file = StringIO()
+    write_virtual_html(file, transcript)
+    assert _embedded_data(file.getvalue())["start"] == [0.0, 2.0, 4.5, 6.0]
+
+
+def test_virtual_speaker_mapping():
+    data = _embedded_data(
+        "".join(
+            iter_virtual_html(
+                transcript, diarisation, speaker_mapping={"0": "Alice", "1": "Alice"}
+            )
+        )
+    )
+    # Speakers mapped to the same name share an id, so get a single header
+    assert data["speakers"] == ["Alice"]
+    assert data["speaker"] == [0, 0, 0]
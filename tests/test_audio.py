@@ -0,0 +1,54 @@
+from conversations import _audio
+from pathlib import Path
+import os
+import wave
+import numpy as np
+
+
+def _fake_decode(calls):
+    def decode(recording, wav_file, chunk_size=1 << 20):
+        calls.append(recording)
+        samples = (np.arange(1600) % 100 - 50).astype("<i2")
+        with wave.open(str(wav_file), "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(_audio.SAMPLE_RATE)
+            out.writeframes(samples.tobytes())
+
+    return decode
+
+
+def test_decoded_audio_is_reused(tmp_path: Path, monkeypatch):
+    calls: list = []
+    monkeypatch.setattr(_audio, "_decode_to_wav", _fake_decode(calls))
+    recording = tmp_path / "meeting.m4a"
+    recording.write_bytes(b"recording contents")
+
+    wav_file = _audio.decoded_audio_file(recording)
+    assert wav_file == tmp_path / "meeting.16k.wav"
+    assert _audio.decoded_audio_file(recording) == wav_file
+    assert len(calls) == 1
+
+    # Touching the file does not change the content hash
+    os.utime(recording, (0, 0))
+    _audio.decoded_audio_file(recording)
+    assert len(calls) == 1
+
+    # Changing the content decodes the recording again
+    recording.write_bytes(b"new recording contents")
+    _audio.decoded_audio_file(recording)
+    assert len(calls) == 2
+
+
+def test_load_audio_matches_pcm(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(_audio, "_decode_to_wav", _fake_decode([]))
+    recording = tmp_path / "meeting.m4a"
+    recording.write_bytes(b"recording contents")
+
+    pcm = _audio.load_pcm(recording)
+    audio = _audio.load_audio(recording)
+
+    assert pcm.dtype == np.int16
+    assert len(pcm) == 1600
+    assert audio.dtype == np.float32
+    np.testing.assert_allclose(audio, pcm / 32768.0)
@@ -1,4 +1,4 @@
-from conversations.config import settings
+from conversations.config import settings, cache_settings
 
 
 def test_load_settings():
@@ -12,3 +12,18 @@ def test_openai_speech_model_default_value():
 def test_openai_token_settings_default_values():
     """Test that the token settings have the correct default values."""
     assert settings.max_prompt_tokens == 900000
+
+
+def test_cache_settings_default_values():
+    """Test that the cache settings have the correct default values."""
+    assert cache_settings.whisper_model_cache_max_bytes == 4_000_000_000
+    assert cache_settings.transcription_cache_max_bytes == 1_000_000_000
+    assert cache_settings.response_cache_enabled is True
+    assert cache_settings.response_cache_max_bytes == 100_000_000
+
+
+def test_openai_rate_limit_settings_default_values():
+    """Test that the request scheduling settings have the correct default values."""
+    assert settings.openai_max_concurrency == 4
+    assert settings.openai_requests_per_minute == 500
+    assert settings.openai_tokens_per_minute == 1_000_000
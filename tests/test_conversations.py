@@ -1,5 +1,6 @@
 from conversations import Conversation, load_conversation
 from conversations._conversations import _create_default_save_filename
+from conversations.config import cache_settings
 from pathlib import Path
 import pooch
 import dominate
@@ -7,6 +8,7 @@ import os
 import tempfile
 import pytest
 import pickle
+import asyncio
 from datetime import datetime, timezone, timedelta
 
 
@@ -204,3 +206,332 @@ def test_summarise_force_new_summary(conversation):
     assert summary != "Test summary"
     assert isinstance(summary, str)
     assert len(summary) > 0
+
+
+_streamed_segments = [
+    {"start": 0.0, "end": 1.5, "text": "Hello.", "speaker": "Speaker_A"},
+    {"start": 1.5, "end": 3.0, "text": "Hi there.", "speaker": "Speaker_B"},
+]
+
+
+def test_transcribe_stream(monkeypatch, tmp_path):
+    from conversations.transcribe import assembly
+
+    monkeypatch.setattr(cache_settings, "cache_dir", tmp_path)
+    monkeypatch.setattr(
+        assembly, "process_stream", lambda **kwargs: iter(_streamed_segments)
+    )
+    conv = Conversation(recording=audio_file, reload=False)
+    streamed = list(conv.transcribe_stream())
+
+    assert streamed == _streamed_segments
+    assert conv._transcription["segments"] == _streamed_segments
+    assert conv._transcription["text"] == "Hello. Hi there."
+    assert conv._diarisation is not None
+
+    with pytest.raises(RuntimeError):
+        next(conv.transcribe_stream())
+
+
+def test_atranscribe_stream(monkeypatch, tmp_path):
+    from conversations.transcribe import assembly
+
+    monkeypatch.setattr(cache_settings, "cache_dir", tmp_path)
+    monkeypatch.setattr(
+        assembly, "process_stream", lambda **kwargs: iter(_streamed_segments)
+    )
+    conv = Conversation(recording=audio_file, reload=False)
+
+    async def collect():
+        return [seg async for seg in conv.atranscribe_stream()]
+
+    assert asyncio.run(collect()) == _streamed_segments
+    assert conv._transcription["segments"] == _streamed_segments
+
+
+def test_transcribe_uses_cache(monkeypatch, tmp_path):
+    from conversations.transcribe import assembly
+
+    calls = []
+
+    def fake_process(**kwargs):
+        calls.append(kwargs)
+        return {"segments": list(_streamed_segments)}
+
+    monkeypatch.setattr(cache_settings, "cache_dir", tmp_path / "cache")
+    monkeypatch.setattr(assembly, "process", fake_process)
+
+    first = tmp_path / "first.m4a"
+    first.write_bytes(b"recording contents")
+    copy = tmp_path / "copy.m4a"
+    copy.write_bytes(b"recording contents")
+
+    conv = Conversation(recording=first, reload=False)
+    conv.transcribe()
+    assert len(calls) == 1
+
+    # Same contents at a different path are served from the cache
+    conv_copy = Conversation(recording=copy, reload=False)
+    conv_copy.transcribe()
+    assert len(calls) == 1
+    assert conv_copy._transcription == conv._transcription
+    assert conv_copy._diarisation is not None
+
+    # Different settings are transcribed again
+    Conversation(recording=copy, reload=False).transcribe(model="best")
+    assert len(calls) == 2
+
+    # The cache can be bypassed
+    Conversation(recording=copy, reload=False).transcribe(use_cache=False)
+    assert len(calls) == 3
+
+
+def test_transcribe_cache_keeps_word_data(monkeypatch, tmp_path):
+    from conversations.transcribe import assembly
+
+    words = [{"text": "Hello.", "start": 0, "end": 1500, "speaker": "A"}]
+
+    def fake_process(**kwargs):
+        segment = dict(_streamed_segments[0], words=[dict(w) for w in words])
+        return {"segments": [segment], "words": [dict(w) for w in words]}
+
+    monkeypatch.setattr(cache_settings, "cache_dir", tmp_path / "cache")
+    monkeypatch.setattr(assembly, "process", fake_process)
+    recording = tmp_path / "recording.m4a"
+    recording.write_bytes(b"recording contents")
+
+    conv = Conversation(recording=recording, reload=False)
+    conv.transcribe(word_data="none")
+    assert "words" not in conv._transcription
+
+    # The cached transcript keeps the word data that was dropped
+    conv = Conversation(recording=recording, reload=False)
+    conv.transcribe(word_data="full")
+    assert conv._transcription["words"] == words
+    assert conv._transcription["segments"][0]["words"] == words
+
+
+def _conversation_with_transcript():
+    conv = Conversation(
+        recording=audio_file,
+        reload=False,
+        meeting_datetime=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+    conv._transcription = {"segments": [dict(seg) for seg in _streamed_segments]}
+    conv._diarisation = [{"note": "speakers from transcription"}]
+    return conv
+
+
+def test_derived_views_are_memoised(monkeypatch):
+    from conversations import report
+
+    calls = []
+    export_text = report.export_text
+
+    def counting_export_text(**kwargs):
+        calls.append(kwargs)
+        return export_text(**kwargs)
+
+    monkeypatch.setattr(report, "export_text", counting_export_text)
+    conv = _conversation_with_transcript()
+
+    text = conv.export_text()
+    assert conv.export_text() == text
+    assert len(calls) == 1
+
+    # Changing any input recomputes the text
+    conv._speaker_mapping = {"Speaker_A": "Alice"}
+    assert "Alice:" in conv.export_text()
+    conv._speaker_mapping["Speaker_B"] = "Bob"
+    assert "Bob:" in conv.export_text()
+    conv._transcription["segments"].append(
+        {"start": 3.0, "end": 4.0, "text": "Bye.", "speaker": "Speaker_A"}
+    )
+    conv.mark_transcript_changed()
+    assert conv.export_text().endswith("Alice: Bye.")
+    conv._transcription["segments"][-1]["text"] = "Goodbye."
+    conv.mark_transcript_changed()
+    assert conv.export_text().endswith("Alice: Goodbye.")
+    conv._transcription = {"segments": _streamed_segments[:1]}
+    assert "Hi there." not in conv.export_text()
+    assert len(calls) == 6
+
+    # Derived views are not saved
+    assert "_derived_views" not in pickle.loads(pickle.dumps(conv)).__dict__
+
+
+def test_load_conversation_saved_by_older_version():
+    conv = _conversation_with_transcript()
+    conv._transcription_shortened = "Shortened."
+    for name in (
+        "_transcription_shortened_source",
+        "_transcription_shortened_levels",
+        "_retrieval_index",
+    ):
+        del conv.__dict__[name]
+
+    loaded = pickle.loads(pickle.dumps(conv))
+    assert loaded.shortened_transcript() == "Shortened."
+    assert loaded._retrieval_index is None
+
+
+def test_write_text(tmp_path):
+    conv = _conversation_with_transcript()
+    conv.write_text(tmp_path / "conversation.txt")
+    assert (tmp_path / "conversation.txt").read_text() == conv.export_text()
+
+    conv._transcription = None
+    with pytest.raises(RuntimeError, match="not been transcribed"):
+        conv.write_text(tmp_path / "empty.txt")
+
+
+def test_num_tokens_is_memoised(monkeypatch):
+    from conversations.ai import _chatgpt
+
+    calls = []
+
+    def fake_num_tokens(text, model):
+        calls.append(model)
+        return len(text.split())
+
+    monkeypatch.setattr(_chatgpt, "_num_tokens", fake_num_tokens)
+    conv = _conversation_with_transcript()
+
+    assert conv.num_tokens() == len(conv.export_text().split())
+    assert conv.num_tokens() == len(conv.export_text().split())
+    assert calls == ["gpt-4o"]
+
+
+def test_query_retrieval_mode(monkeypatch):
+    from conversations import ai
+    from conversations.ai import _retrieval
+
+    contexts = []
+    monkeypatch.setattr(
+        ai, "query", lambda context, *args: contexts.append(context) or "Answer"
+    )
+
+    class FakeIndex:
+        def context(self, query, **kwargs):
+            return f"turns about {query}"
+
+    built = []
+    monkeypatch.setattr(
+        _retrieval, "RetrievalIndex", lambda text: built.append(text) or FakeIndex()
+    )
+    conv = _conversation_with_transcript()
+
+    assert conv.query("hello", print_summary=False, mode="retrieval") == "Answer"
+    conv.query("there", print_summary=False, mode="retrieval")
+    assert contexts == ["turns about hello", "turns about there"]
+    assert built == [conv.export_text()]
+
+    # The index is rebuilt when the text changes
+    conv._speaker_mapping = {"Speaker_A": "Alice"}
+    conv.query("hello", print_summary=False, mode="retrieval")
+    assert len(built) == 2
+
+    with pytest.raises(ValueError, match="mode"):
+        conv.query("hello", mode="unknown")
+
+
+def test_query_many(monkeypatch, capsys):
+    from conversations import ai
+
+    calls = []
+
+    def fake_query_many(
+        transcript, questions, system_prompt, append_prompt, batch, use_cache
+    ):
+        calls.append(use_cache)
+        return {
+            question: {"answer": f"{batch} {transcript}", "prompt_tokens": 1}
+            for question in questions
+        }
+
+    monkeypatch.setattr(ai, "query_many", fake_query_many)
+    conv = _conversation_with_transcript()
+    conv._transcription_shortened = "short"
+
+    answers = conv.query_many(["Who?", "Why?"], batch="packed")
+    assert list(answers) == ["Who?", "Why?"]
+    assert answers["Why?"]["answer"] == "packed short"
+    assert "Why?\npacked short" in capsys.readouterr().out
+
+    conv.query_many(["Who?"], print_summary=False, force=True)
+    assert calls == [True, False]
+
+
+def test_summarise_stream_stores_summary(monkeypatch):
+    from conversations import ai
+
+    requests = []
+
+    def fake_summarise_stream(transcript, *args, use_cache):
+        requests.append(use_cache)
+        return ai.ResponseStream(["A short ", "summary"])
+
+    monkeypatch.setattr(ai, "summarise_stream", fake_summarise_stream)
+    conv = _conversation_with_transcript()
+    conv._transcription_shortened = "short"
+
+    stream = conv.summarise_stream()
+    assert conv._summary_automated is None
+    assert list(stream) == ["A short ", "summary"]
+    assert conv._summary_automated == "A short summary"
+
+    # An existing summary is streamed in one piece
+    assert list(conv.summarise_stream()) == ["A short summary"]
+    list(conv.summarise_stream(force=True))
+    assert requests == [True, False]
+
+
+def test_shortened_transcript_is_invalidated(monkeypatch):
+    from conversations.ai import _shorten_transcript
+
+    monkeypatch.setattr(
+        _shorten_transcript,
+        "_shorten_transcript",
+        lambda text, *args, **kwargs: f"short {len(text)}",
+    )
+    conv = _conversation_with_transcript()
+
+    shortened = conv.shortened_transcript()
+    assert conv.shortened_transcript() == shortened
+
+    conv._speaker_mapping = {"Speaker_A": "Al"}
+    assert conv.shortened_transcript() != shortened
+
+    # A shortened transcript given by the user is kept
+    conv = _conversation_with_transcript()
+    conv._transcription_shortened = "Given"
+    assert conv.shortened_transcript() == "Given"
+
+
+def test_shortened_transcript_resumes_levels(monkeypatch):
+    from conversations.ai import _shorten_transcript
+    from conversations.ai._scheduler import BudgetExceededError
+
+    calls = []
+
+    def shorten(text, *args, levels):
+        calls.append(len(levels))
+        if not levels:
+            levels.append([text])
+            raise BudgetExceededError("out of budget")
+        return "short"
+
+    monkeypatch.setattr(_shorten_transcript, "_shorten_transcript", shorten)
+    conv = _conversation_with_transcript()
+
+    with pytest.raises(BudgetExceededError):
+        conv.shortened_transcript()
+    assert conv.shortened_transcript() == "short"
+    assert calls == [0, 1]
+    assert conv._transcription_shortened_levels is None
+
+    # Levels made from other text are not reused
+    conv._speaker_mapping = {"Speaker_A": "Al"}
+    with pytest.raises(BudgetExceededError):
+        conv.shortened_transcript()
+    assert calls == [0, 1, 0]
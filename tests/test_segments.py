@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from conversations import SegmentTable
+from conversations.report import export_text, generate, iter_html
+
+transcript = {
+    "segments": [
+        {"start": 0.0, "end": 2.0, "text": "Hello", "speaker": "A"},
+        {"start": 2.0, "end": 3.0, "text": "there.", "speaker": "A"},
+        {"start": 4.5, "end": 6.0, "text": "Hi!", "speaker": "B"},
+        {"start": 6.0, "end": 7.0, "text": "Bye.", "speaker": "A"},
+    ]
+}
+
+
+def test_round_trip():
+    table = SegmentTable.from_transcript(transcript)
+    assert len(table) == 4
+    assert table.speakers == ["A", "B"]
+    assert table.speaker.tolist() == [0, 0, 1, 0]
+    assert table.text == "Hellothere.Hi!Bye."
+    assert table.segment_text(2) == "Hi!"
+    assert table[-1] == transcript["segments"][-1]
+    assert table.to_transcript() == transcript
+
+    with pytest.raises(IndexError):
+        table[4]
+
+    table = SegmentTable.from_segments([{"start": 0, "end": 1, "text": "No one"}])
+    assert not table.has_speakers()
+    assert table.to_transcript() == {
+        "segments": [{"start": 0.0, "end": 1.0, "text": "No one"}]
+    }
+
+
+def test_views_share_data():
+    table = SegmentTable.from_transcript(transcript)
+
+    mapped = table.map_speakers({"A": "Alice"})
+    assert mapped.speakers == ["Alice", "B"]
+    assert table.speakers == ["A", "B"]
+    assert [seg["speaker"] for seg in mapped] == ["Alice", "Alice", "B", "Alice"]
+    assert np.shares_memory(mapped.start, table.start)
+    assert mapped.text is table.text
+
+    sliced = table.time_slice(2.0, 6.0)
+    assert [seg["text"] for seg in sliced] == ["there.", "Hi!"]
+    assert np.shares_memory(sliced.end, table.end)
+    assert sliced.text is table.text
+    assert len(table.time_slice(start=5.0)) == 1
+    assert len(table.time_slice(stop=0.0)) == 0
+    assert len(table.time_slice(7.0, 1.0)) == 0
+
+
+def test_reports_accept_segment_table():
+    table = SegmentTable.from_transcript(transcript)
+    diarisation = [{"note": "speakers from transcription"}]
+    mapping = {"A": "Alice", "B": "Bob"}
+
+    assert export_text(table, diarisation, mapping) == export_text(
+        transcript, diarisation, mapping
+    )
+    assert "".join(iter_html(table, diarisation, speaker_mapping=mapping)) == (
+        generate(table, diarisation, speaker_mapping=mapping).render()
+    )
+    assert generate(table).render() == generate(transcript).render()
+
+    unlabelled = {
+        "segments": [
+            {key: value for key, value in seg.items() if key != "speaker"}
+            for seg in transcript["segments"]
+        ]
+    }
+    diarisation = [
+        {"start": 0.0, "end": 4.0, "label": 0},
+        {"start": 4.0, "end": 8.0, "label": 1},
+    ]
+    assert export_text(
+        SegmentTable.from_transcript(unlabelled), diarisation
+    ) == export_text(unlabelled, diarisation)
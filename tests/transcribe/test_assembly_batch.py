@@ -0,0 +1,167 @@
+from conversations.transcribe import assembly
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import json
+import threading
+import time
+import pytest
+
+
+class _StandInAssembly(BaseHTTPRequestHandler):
+    """Minimal stand-in for the AssemblyAI upload and transcript endpoints."""
+
+    lock = threading.Lock()
+    uploads_in_flight = 0
+    max_uploads_in_flight = 0
+    polls: dict = {}
+    jobs: dict = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, body, status=200):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            body = b""
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return body
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self):
+        cls = type(self)
+        body = self._read_body()
+        if self.path == "/v2/upload":
+            with cls.lock:
+                cls.uploads_in_flight += 1
+                cls.max_uploads_in_flight = max(
+                    cls.max_uploads_in_flight, cls.uploads_in_flight
+                )
+            time.sleep(0.05)
+            with cls.lock:
+                cls.uploads_in_flight -= 1
+            self._send_json({"upload_url": f"upload://{body.decode()}"})
+        elif self.path == "/v2/transcript":
+            request = json.loads(body)
+            transcript_id = f"job-{len(cls.jobs)}"
+            with cls.lock:
+                cls.jobs[transcript_id] = request
+                cls.polls[transcript_id] = 0
+            self._send_json({"id": transcript_id, "status": "queued"})
+
+    def do_GET(self):
+        cls = type(self)
+        transcript_id = self.path.rsplit("/", 1)[-1]
+        with cls.lock:
+            cls.polls[transcript_id] += 1
+            polls = cls.polls[transcript_id]
+        request = cls.jobs[transcript_id]
+        if request["audio_url"] == "upload://unreachable" or (
+            request["audio_url"] == "upload://flaky" and polls == 1
+        ):
+            self._send_json({"error": "service unavailable"}, status=503)
+        elif polls < 2:
+            self._send_json({"id": transcript_id, "status": "processing"})
+        elif request["audio_url"] == "upload://broken":
+            self._send_json(
+                {"id": transcript_id, "status": "error", "error": "bad audio"}
+            )
+        else:
+            text = request["audio_url"].removeprefix("upload://")
+            utterance = {"start": 500, "end": 2500, "text": text, "speaker": "A"}
+            self._send_json(
+                {
+                    "id": transcript_id,
+                    "status": "completed",
+                    "text": text,
+                    "utterances": [utterance],
+                }
+            )
+
+
+@pytest.fixture
+def stand_in_server():
+    _StandInAssembly.jobs = {}
+    _StandInAssembly.polls = {}
+    _StandInAssembly.max_uploads_in_flight = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInAssembly)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def _recordings(tmp_path: Path, names):
+    paths = []
+    for name in names:
+        path = tmp_path / f"{name}.m4a"
+        path.write_bytes(name.encode())
+        paths.append(path)
+    return paths
+
+
+def test_process_many(stand_in_server, tmp_path: Path):
+    """Test concurrent submission and polling of many recordings."""
+    audio_files = _recordings(tmp_path, [f"meeting{i}" for i in range(6)])
+
+    results = assembly.process_many(
+        audio_files,
+        max_concurrency=2,
+        poll_interval=0.01,
+        base_url=stand_in_server,
+    )
+
+    assert set(results) == set(audio_files)
+    assert _StandInAssembly.max_uploads_in_flight <= 2
+    for audio_file, transcript in results.items():
+        seg = transcript["segments"][0]
+        assert seg["text"] == audio_file.stem
+        assert seg["start"] == 0.5
+        assert seg["end"] == 2.5
+        assert seg["speaker"] == "Speaker_A"
+    assert _StandInAssembly.jobs["job-0"]["speaker_labels"] is True
+
+
+def test_process_many_failures(stand_in_server, tmp_path: Path):
+    """Test that failed jobs are reported."""
+    audio_files = _recordings(tmp_path, ["meeting", "broken"])
+
+    results = assembly.process_many(
+        audio_files,
+        poll_interval=0.01,
+        return_exceptions=True,
+        base_url=stand_in_server,
+    )
+    assert isinstance(results[audio_files[0]], dict)
+    assert isinstance(results[audio_files[1]], Exception)
+
+    with pytest.raises(Exception, match="bad audio"):
+        assembly.process_many(
+            audio_files[1:], poll_interval=0.01, base_url=stand_in_server
+        )
+
+
+def test_process_many_poll_errors(stand_in_server, tmp_path: Path):
+    """Test that failed polls are retried without aborting the batch."""
+    audio_files = _recordings(tmp_path, ["flaky", "unreachable", "meeting"])
+
+    results = assembly.process_many(
+        audio_files,
+        poll_interval=0.01,
+        return_exceptions=True,
+        base_url=stand_in_server,
+    )
+    assert results[audio_files[0]]["segments"][0]["text"] == "flaky"
+    assert isinstance(results[audio_files[1]], Exception)
+    assert results[audio_files[2]]["segments"][0]["text"] == "meeting"
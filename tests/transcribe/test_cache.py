@@ -0,0 +1,42 @@
+from conversations.transcribe._cache import TranscriptionCache
+from pathlib import Path
+import os
+
+
+def test_cache_key_depends_on_settings():
+    key = TranscriptionCache.key("abc", "assembly", "nano", "en")
+    assert key == TranscriptionCache.key("abc", "assembly", "nano", "en")
+    assert key != TranscriptionCache.key("abd", "assembly", "nano", "en")
+    assert key != TranscriptionCache.key("abc", "whisper", "nano", "en")
+    assert key != TranscriptionCache.key("abc", "assembly", "nano", "en", "prompt")
+    assert key != TranscriptionCache.key(
+        "abc", "assembly", "nano", "en", custom_terms=["Alice"]
+    )
+
+
+def test_cache_round_trip(tmp_path: Path):
+    cache = TranscriptionCache(tmp_path, max_bytes=10_000_000)
+    transcript = {"segments": [{"start": 0.0, "end": 1.0, "text": "Hello"}]}
+
+    assert cache.get("missing") is None
+    cache.put("key", transcript)
+    assert cache.get("key") == transcript
+
+    cache.clear()
+    assert cache.get("key") is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path):
+    transcript = {"segments": [{"text": "x" * 1000}]}
+    cache = TranscriptionCache(tmp_path, max_bytes=2500)
+
+    cache.put("old", transcript)
+    cache.put("used", transcript)
+    os.utime(tmp_path / "old.pkl", (1, 1))
+    os.utime(tmp_path / "used.pkl", (2, 2))
+    cache.get("used")
+    cache.put("new", transcript)
+
+    assert cache.get("old") is None
+    assert cache.get("used") == transcript
+    assert cache.get("new") == transcript
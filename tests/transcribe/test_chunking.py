@@ -0,0 +1,58 @@
+from conversations.transcribe._chunking import (
+    _find_silence_splits,
+    _stitch_transcripts,
+)
+import numpy as np
+
+
+def test_silence_splits_land_in_pauses():
+    """Test that window boundaries are moved to quiet sections of audio."""
+    sample_rate = 100
+    rng = np.random.default_rng(0)
+    audio = rng.normal(size=sample_rate * 300).astype(np.float32)
+    # Pauses slightly away from the equal length boundaries at 100 s and 200 s
+    audio[sample_rate * 104 : sample_rate * 105] = 0
+    audio[sample_rate * 195 : sample_rate * 196] = 0
+
+    splits = _find_silence_splits(audio, sample_rate, num_windows=3)
+
+    assert splits[0] == 0
+    assert splits[-1] == len(audio)
+    assert sample_rate * 104 <= splits[1] < sample_rate * 105
+    assert sample_rate * 195 <= splits[2] < sample_rate * 196
+
+
+def test_silence_splits_short_audio_is_not_split():
+    """Test that recordings shorter than the minimum window are kept whole."""
+    audio = np.ones(16000 * 30, dtype=np.float32)
+    assert _find_silence_splits(audio, 16000, num_windows=8) == [0, len(audio)]
+
+
+def test_stitch_transcripts_offsets_and_seams():
+    """Test that stitched segments use global times without seam duplicates."""
+    first = {
+        "language": "en",
+        "segments": [
+            {"id": 0, "start": 0.0, "end": 4.0, "text": " Hello there."},
+            {"id": 1, "start": 4.0, "end": 9.5, "text": " How are you?"},
+        ],
+    }
+    second = {
+        "segments": [
+            {"id": 0, "start": 0.0, "end": 0.4, "text": " How are you?"},
+            {"id": 1, "start": 0.5, "end": 3.0, "text": " I'm fine."},
+        ],
+    }
+
+    result = _stitch_transcripts([first, second], [0.0, 9.0])
+
+    assert [seg["text"] for seg in result["segments"]] == [
+        " Hello there.",
+        " How are you?",
+        " I'm fine.",
+    ]
+    assert [seg["id"] for seg in result["segments"]] == [0, 1, 2]
+    assert result["segments"][2]["start"] == 9.5
+    assert result["segments"][2]["end"] == 12.0
+    assert result["text"] == " Hello there. How are you? I'm fine."
+    assert result["language"] == "en"
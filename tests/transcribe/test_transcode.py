@@ -0,0 +1,40 @@
+from conversations import _audio
+from conversations.transcribe import _transcode
+from pathlib import Path
+import wave
+import numpy as np
+
+
+def _fake_decode(recording, wav_file, chunk_size=1 << 20):
+    rng = np.random.default_rng(0)
+    samples = (rng.normal(size=_audio.SAMPLE_RATE * 600) * 3000).astype("<i2")
+    with wave.open(str(wav_file), "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(_audio.SAMPLE_RATE)
+        out.writeframes(samples.tobytes())
+
+
+def test_split_for_upload_respects_size_limit(tmp_path: Path, monkeypatch):
+    calls = []
+
+    def fake_transcode(audio_file, output_file, bitrate_kbps, start, duration):
+        calls.append((start, duration))
+        return output_file
+
+    monkeypatch.setattr(_audio, "_decode_to_wav", _fake_decode)
+    monkeypatch.setattr(_transcode, "transcode_for_upload", fake_transcode)
+    recording = tmp_path / "meeting.m4a"
+    recording.write_bytes(b"recording contents")
+
+    # 32 kbps for 10 minutes is 2.4 MB, so a 1 MB limit needs at least 3 pieces
+    pieces = _transcode.split_for_upload(
+        recording, tmp_path, max_bytes=1_000_000, bitrate_kbps=32
+    )
+
+    assert len(pieces) >= 3
+    assert pieces[0][1] == 0.0
+    assert [offset for _, offset in pieces] == [start for start, _ in calls]
+    for start, duration in calls:
+        assert duration * 32_000 / 8 < 1_000_000
+    assert abs(sum(duration for _, duration in calls) - 600) < 1e-6
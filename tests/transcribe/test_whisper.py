@@ -3,6 +3,8 @@ from pathlib import Path
 from typing import Dict
 import pooch
 from openai.types.audio import Transcription
+from unittest.mock import patch
+from conversations.transcribe.whisper._model_cache import _ModelCache
 
 
 audio_file = pooch.retrieve(
@@ -53,3 +55,54 @@ def test_prompting():
     )
     assert "million" in local_result["segments"][0]["text"]
     assert "million" in cloud_result["segments"][0]["text"]
+
+
+class _FakeTensor:
+    def __init__(self, num_bytes):
+        self._num_bytes = num_bytes
+
+    def numel(self):
+        return self._num_bytes
+
+    def element_size(self):
+        return 1
+
+
+class _FakeModel:
+    def __init__(self, name, num_bytes=100):
+        self.name = name
+        self._params = [_FakeTensor(num_bytes)]
+
+    def parameters(self):
+        return self._params
+
+    def buffers(self):
+        return []
+
+
+@patch("whisper.load_model", side_effect=lambda name, device: _FakeModel(name))
+def test_model_cache_reuses_models(mock_load):
+    """Test that a cached model is only loaded once."""
+    cache = _ModelCache(max_bytes=1000)
+    first = cache.get("tiny.en")
+    second = cache.get("tiny.en")
+    assert first is second
+    assert mock_load.call_count == 1
+    cache.get("tiny.en", device="cuda")
+    assert mock_load.call_count == 2
+
+
+@patch("whisper.load_model", side_effect=lambda name, device: _FakeModel(name))
+def test_model_cache_evicts_least_recently_used(mock_load):
+    """Test that the cache evicts the least recently used model."""
+    cache = _ModelCache(max_bytes=250)
+    cache.get("tiny.en")
+    cache.get("base.en")
+    cache.get("tiny.en")
+    cache.get("small.en")
+    names = [m["model_name"] for m in cache.cached()]
+    assert names == ["tiny.en", "small.en"]
+    assert cache.total_bytes() == 200
+
+    cache.evict("tiny.en")
+    assert [m["model_name"] for m in cache.cached()] == ["small.en"]
@@ -0,0 +1,101 @@
+from conversations.transcribe.assembly import WordTable, set_word_data
+from conversations.transcribe.assembly._assembly import _to_whisper_format
+import pickle
+import pytest
+
+
+def _response():
+    words = [
+        {"text": "Hello", "start": 0, "end": 400, "confidence": 0.5, "speaker": "A"},
+        {
+            "text": "there.",
+            "start": 400,
+            "end": 900,
+            "confidence": 0.75,
+            "speaker": "A",
+        },
+        {"text": "Hi.", "start": 1000, "end": 1300, "confidence": 0.25, "speaker": "B"},
+    ]
+    return {
+        "text": "Hello there. Hi.",
+        "words": [dict(w) for w in words],
+        "utterances": [
+            {
+                "start": 0,
+                "end": 900,
+                "text": "Hello there.",
+                "speaker": "A",
+                "words": [dict(w) for w in words[:2]],
+            },
+            {
+                "start": 1000,
+                "end": 1300,
+                "text": "Hi.",
+                "speaker": "B",
+                "words": [dict(w) for w in words[2:]],
+            },
+        ],
+    }, words
+
+
+def test_compact_word_data():
+    response, words = _response()
+    result = _to_whisper_format(response, word_data="compact")
+
+    table = result["words"]
+    assert isinstance(table, WordTable)
+    assert len(table) == 3
+    assert table.word(1) == "there."
+    assert table.speakers == ["A", "B"]
+    assert [seg["word_range"] for seg in result["segments"]] == [(0, 2), (2, 3)]
+    assert all("words" not in seg for seg in result["segments"])
+    assert table.to_dicts() == words
+
+    restored = pickle.loads(pickle.dumps(result))
+    word_range = restored["segments"][1]["word_range"]
+    assert restored["words"].to_dicts(*word_range) == words[2:]
+
+
+def test_full_and_no_word_data():
+    response, words = _response()
+    result = _to_whisper_format(response)
+
+    # Word dictionaries are kept as they are by default
+    assert result["words"] == words
+    assert result["segments"][0]["words"] == words[:2]
+
+    response, _ = _response()
+    response["words"][0].update(confidence=0.98765, channel="1")
+    response_words = response["words"]
+    result = _to_whisper_format(response)
+    assert result["words"] is response_words
+    assert result["words"][0]["confidence"] == 0.98765
+    assert result["words"][0]["channel"] == "1"
+
+    # Confidences are kept exactly in a word table
+    set_word_data(result, "compact")
+    assert result["words"].to_dicts()[0]["confidence"] == 0.98765
+
+    result = _to_whisper_format(_response()[0])
+
+    set_word_data(result, "compact")
+    set_word_data(result, "full")
+    assert result["words"] == words
+    assert result["segments"][0]["words"] == words[:2]
+    assert "word_range" not in result["segments"][0]
+
+    set_word_data(result, "none")
+    assert "words" not in result
+    assert all("words" not in seg for seg in result["segments"])
+
+    with pytest.raises(ValueError):
+        set_word_data(result, "sparse")
+
+
+def test_compact_from_segment_words():
+    response, words = _response()
+    result = _to_whisper_format(response, word_data="full")
+    del result["words"]
+
+    set_word_data(result, "compact")
+    assert result["words"].to_dicts() == words